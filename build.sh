@@ -16,4 +16,10 @@ python manage.py collectstatic --noinput
 # 3) Aplicar migraciones a la base de datos
 #    (PostgreSQL vía DATABASE_URL)
 # =====================================
-python manage.py migrate --noinput
\ No newline at end of file
+python manage.py migrate --noinput
+
+# =====================================
+# 4) Tabla de la caché compartida
+#    (solo si REM_CACHE_BACKEND=bd; si no, no hace nada)
+# =====================================
+python manage.py createcachetable
\ No newline at end of file
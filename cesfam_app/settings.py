@@ -123,6 +123,41 @@ DATABASES = {
 }
 
 
+# ============================================================
+# CACHÉ (rem/cache.py)
+# ============================================================
+# REM_CACHE_BACKEND:
+# - "memoria" (por defecto, desarrollo): una caché por proceso
+# - "archivo": directorio REM_CACHE_DIR, compartido por los workers del nodo
+# - "bd": tabla REM_CACHE_TABLA, compartida por todos los nodos. La crea
+#   `python manage.py createcachetable` (build.sh lo corre en cada build;
+#   con los otros backends no hace nada)
+REM_CACHE_BACKEND = os.environ.get("REM_CACHE_BACKEND") or "memoria"
+
+_CACHE_BACKENDS = {
+    "memoria": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "rem",
+    },
+    "archivo": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("REM_CACHE_DIR") or str(BASE_DIR / "cache"),
+    },
+    "bd": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": os.environ.get("REM_CACHE_TABLA") or "rem_cache",
+    },
+}
+
+CACHES = {
+    "default": {
+        **_CACHE_BACKENDS[REM_CACHE_BACKEND],
+        "TIMEOUT": int(os.environ.get("REM_CACHE_SEGUNDOS") or 6 * 60 * 60),
+        "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("REM_CACHE_ENTRADAS") or 5000)},
+    }
+}
+
+
 # ============================================================
 # VALIDACIÓN DE CONTRASEÑAS
 # ============================================================
@@ -162,6 +197,54 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 
+# ============================================================
+# PROCESAMIENTO REM (COLA EN BD)
+# ============================================================
+# False (por defecto) → se procesa dentro del request.
+# True → la vista encola y `python manage.py rem_worker` procesa. Activarlo
+#        solo si el despliegue tiene ese worker corriendo (ej: un
+#        "Background Worker" de Render con el mismo build y
+#        `python manage.py rem_worker` como comando); sin worker las
+#        tareas quedan pendientes para siempre.
+REM_PROCESAMIENTO_EN_COLA = (
+    os.environ.get("REM_PROCESAMIENTO_EN_COLA") or "False"
+) == "True"
+
+# Validación al subir (rem/validacion.py): hojas que deben existir y,
+# opcionalmente, textos que deben aparecer en el libro (ej: "SECCIÓN A").
+REM_HOJAS_REQUERIDAS = ["A01"]
+REM_MARCADORES_REQUERIDOS = []
+
+# Tamaño máximo por archivo en el formulario de subida. Los archivos más
+# grandes se envían por partes (rem/cargas_parciales.py), con su propio
+# límite; los bloques quedan en REM_CARGAS_PARCIALES_DIR hasta finalizar.
+REM_TAMANO_MAXIMO_MB = int(os.environ.get("REM_TAMANO_MAXIMO_MB") or 20)
+REM_CARGA_PARCIAL_TAMANO_MAXIMO_MB = int(os.environ.get("REM_CARGA_PARCIAL_TAMANO_MAXIMO_MB") or 300)
+REM_CARGA_PARCIAL_BLOQUE_MB = 5
+REM_CARGA_PARCIAL_HORAS = 24
+REM_CARGAS_PARCIALES_DIR = os.environ.get("REM_CARGAS_PARCIALES_DIR") or BASE_DIR / "cargas_parciales"
+
+# Hilos para validar/guardar en paralelo una carga de varios archivos
+REM_CARGA_HILOS = int(os.environ.get("REM_CARGA_HILOS") or 4)
+
+# Forma parte del ETag de reportes y detalle (rem/versiones.py): cambiarlo
+# en cada despliegue invalida las páginas que los navegadores ya tienen.
+REM_ETAG_DESPLIEGUE = os.environ.get("REM_ETAG_DESPLIEGUE", "")
+
+# Caché en disco de exportaciones Excel / PDF y libros completos por
+# período (rem/exportaciones.py): una por versión de datos del período,
+# con desalojo LRU al superar REM_EXPORTACIONES_MAX_MB.
+REM_EXPORTACIONES_DIR = os.environ.get("REM_EXPORTACIONES_DIR") or BASE_DIR / "exportaciones"
+REM_EXPORTACIONES_MAX_MB = int(os.environ.get("REM_EXPORTACIONES_MAX_MB") or 500)
+
+# Mismos handlers de Django, pero calculando el SHA-256 de cada archivo
+# mientras se recibe (rem/contenido.py)
+FILE_UPLOAD_HANDLERS = [
+    "rem.contenido.HashMemoryFileUploadHandler",
+    "rem.contenido.HashTemporaryFileUploadHandler",
+]
+
+
 # ============================================================
 # AUTENTICACIÓN Y REDIRECCIONES
 # ============================================================
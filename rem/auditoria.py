@@ -25,3 +25,36 @@ def registrar_auditoria(request, accion, descripcion):
         ip=ip,
         user_agent=user_agent,
     )
+
+
+def registrar_auditoria_sistema(usuario, accion, descripcion):
+    """
+    Igual que registrar_auditoria, pero para acciones que ocurren fuera de
+    un request (ej: worker de la cola). Sin IP ni user agent.
+    """
+    AuditLog.objects.create(
+        usuario=usuario,
+        accion=accion,
+        descripcion=descripcion,
+    )
+
+
+def registrar_auditoria_lote(request, accion, descripciones):
+    """
+    Igual que registrar_auditoria, pero para varias acciones del mismo
+    request (ej: subida de varios archivos): un solo INSERT.
+    """
+    usuario = request.user if request.user.is_authenticated else None
+    ip = _obtener_ip(request)
+    user_agent = request.META.get("HTTP_USER_AGENT", "")
+
+    AuditLog.objects.bulk_create([
+        AuditLog(
+            usuario=usuario,
+            accion=accion,
+            descripcion=descripcion,
+            ip=ip,
+            user_agent=user_agent,
+        )
+        for descripcion in descripciones
+    ])
@@ -0,0 +1,139 @@
+# rem/cache.py
+"""
+Caché compartida de REM sobre el framework de caché de Django.
+
+El backend se elige en settings (REM_CACHE_BACKEND): memoria local en
+desarrollo; archivo o base de datos en producción, para que los
+distintos workers compartan lo calculado.
+
+Claves:
+- clave_periodo / clave_periodos: llevan la versión de datos de cada
+  período (rem/versiones.py). Al cambiar un período sus claves cambian
+  y las entradas viejas vencen solas (TIMEOUT / MAX_ENTRIES).
+- clave_global: para resultados que dependen de todos los períodos
+  (ej: estado de consolidación). Lleva la "generación" de los datos,
+  que se lee de la BD (generacion_datos, rem/versiones.py) y cambia con
+  cualquier escritura de ArchivoREM / RegistroREM / DimPeriodo. No se
+  guarda en la caché: el backend puede descartarla (MAX_ENTRIES), y
+  volver a una generación vieja serviría resultados viejos.
+
+obtener() cuenta aciertos y fallos por espacio en memoria, en cada
+proceso: contarlos en la caché costaría una lectura y una escritura más
+por llamada, y en los backends de archivo y BD incr() no es atómico (se
+pierden conteos). estadisticas() muestra los del proceso que responde.
+"""
+import hashlib
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .versiones import generacion_datos, version_periodo, versiones_periodos
+
+# Espacios de claves (uno por tipo de resultado); también son las filas
+# de estadisticas()
+ESPACIOS = (
+    "columnas",
+    "reporte_seccion",
+    "serie",
+    "pivote",
+    "datos_periodo",
+    "reportes_home",
+    "reporte_a01_a",
+    "rems_periodo",
+)
+
+_FALTA = object()
+
+_aciertos = Counter()
+_fallos = Counter()
+_contadores_lock = threading.Lock()
+
+
+def _firma(partes) -> str:
+    """Partes de la clave como texto corto y sin espacios (apto para cualquier backend)."""
+    texto = ":".join(str(p) for p in partes)
+    if len(texto) > 120 or any(c.isspace() for c in texto):
+        return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+    return texto
+
+
+def clave_periodo(espacio, periodo_id, *partes) -> str:
+    version, _ = version_periodo(periodo_id)
+    return f"rem:{espacio}:p{periodo_id}:v{version}:{_firma(partes)}"
+
+
+def clave_periodos(espacio, periodo_ids, *partes) -> str:
+    versiones = versiones_periodos(periodo_ids)
+    periodos = ",".join(f"{p}.{versiones[p]}" for p in periodo_ids)
+    return f"rem:{espacio}:{_firma((periodos,) + partes)}"
+
+
+def clave_global(espacio, *partes) -> str:
+    return f"rem:{espacio}:g{generacion_datos()}:{_firma(partes)}"
+
+
+# ============================================================
+# LECTURA CON CÁLCULO
+# ============================================================
+def _contar(espacio, acierto):
+    with _contadores_lock:
+        (_aciertos if acierto else _fallos)[espacio] += 1
+
+
+def obtener(espacio, clave, calcular, timeout=None):
+    """
+    Valor guardado en 'clave' o, si no está, calcular() (se guarda).
+    timeout None usa el TIMEOUT de settings.CACHES.
+    """
+    valor = cache.get(clave, _FALTA)
+    if valor is not _FALTA:
+        _contar(espacio, True)
+        return valor
+
+    _contar(espacio, False)
+    valor = calcular()
+    if timeout is None:
+        cache.set(clave, valor)
+    else:
+        cache.set(clave, valor, timeout)
+    return valor
+
+
+# ============================================================
+# ESTADÍSTICAS
+# ============================================================
+def estadisticas() -> dict:
+    """
+    {espacio: {"aciertos", "fallos", "tasa_aciertos"}} de este proceso,
+    el backend en uso y la generación actual de los datos.
+    """
+    with _contadores_lock:
+        aciertos_por_espacio = dict(_aciertos)
+        fallos_por_espacio = dict(_fallos)
+
+    espacios = {}
+    for espacio in ESPACIOS:
+        aciertos = aciertos_por_espacio.get(espacio, 0)
+        fallos = fallos_por_espacio.get(espacio, 0)
+        total = aciertos + fallos
+        espacios[espacio] = {
+            "aciertos": aciertos,
+            "fallos": fallos,
+            "tasa_aciertos": round(aciertos / total, 3) if total else None,
+        }
+
+    return {
+        "backend": settings.CACHES["default"]["BACKEND"],
+        "proceso": os.getpid(),
+        "generacion": generacion_datos(),
+        "espacios": espacios,
+    }
+
+
+def reiniciar_estadisticas():
+    with _contadores_lock:
+        _aciertos.clear()
+        _fallos.clear()
@@ -0,0 +1,226 @@
+# rem/cargas.py
+"""
+Carga de varios archivos REM en un solo POST (vista subir_excel).
+
+Antes cada archivo se validaba, guardaba y auditaba en secuencia, con una
+consulta de duplicados y un INSERT de auditoría por archivo. Ahora:
+
+1) Duplicados por nombre de TODO el lote con una sola consulta.
+2) Validación (extensión, tamaño, estructura) y SHA-256 en paralelo con
+   un ThreadPoolExecutor. Los hilos no tocan la BD.
+3) Duplicados por contenido (SHA-256) con una sola consulta: el mismo
+   Excel renombrado no se vuelve a cargar en el mismo período.
+4) Escritura al storage por contenido (rem/contenido.py), también en
+   paralelo: si ese contenido ya estaba guardado, se reutiliza.
+5) ArchivoREM y AuditLog se insertan con bulk_create en una transacción.
+   Si el mismo contenido ya fue procesado (en otro período) y quien sube
+   es administrador, se copian sus registros y hechos en vez de volver a
+   leer el Excel (queda procesado, como con procesar_archivo_generico).
+6) Opcional: se encola el procesamiento de los archivos restantes.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+from .auditoria import registrar_auditoria_lote
+from .cola import encolar_procesamiento_lote
+from .contenido import calcular_sha256, guardar_por_contenido
+from .decorators import is_admin_user
+from .ingesta import copiar_resultados_archivo
+from .models import ArchivoREM, AuditLog
+from .validacion import validar_estructura_rem
+from .versiones import incrementar_version
+
+MB = 1024 * 1024
+
+
+def hilos_carga() -> int:
+    return int(getattr(settings, "REM_CARGA_HILOS", 4))
+
+
+def tamano_maximo_formulario() -> int:
+    """Límite por archivo en el formulario normal (el resto va por partes)."""
+    return int(getattr(settings, "REM_TAMANO_MAXIMO_MB", 20)) * MB
+
+
+def validar_archivo(archivo, tamano_maximo=None):
+    """
+    Validaciones de un archivo subido. Retorna None si es válido o el
+    mensaje de advertencia para el usuario.
+    """
+    if tamano_maximo is None:
+        tamano_maximo = tamano_maximo_formulario()
+
+    extension = os.path.splitext(archivo.name)[1].lower()
+    if extension != ".xlsx":
+        return f"El archivo '{archivo.name}' fue ignorado: formato no válido."
+
+    if archivo.size > tamano_maximo:
+        return f"El archivo '{archivo.name}' fue ignorado: supera el tamaño máximo permitido."
+
+    error = validar_estructura_rem(archivo)
+    if error:
+        return f"El archivo '{archivo.name}' {error}"
+
+    return None
+
+
+def _validar_y_hashear(archivo, tamano_maximo=None):
+    """Corre en un hilo del pool. Retorna (aviso, sha256)."""
+    aviso = validar_archivo(archivo, tamano_maximo)
+    if aviso:
+        return aviso, None
+    return None, calcular_sha256(archivo)
+
+
+def _en_paralelo(funcion, elementos):
+    hilos = max(1, min(hilos_carga(), len(elementos)))
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        return list(pool.map(funcion, elementos))
+
+
+def _origenes_por_hash(hashes) -> dict:
+    """
+    Para cada SHA-256 ya conocido: archivos existentes con ese contenido
+    (una sola consulta), ordenados del más recientemente procesado.
+    """
+    existentes = {}
+    consulta = (
+        ArchivoREM.objects
+        .filter(sha256__in=hashes)
+        .order_by("-procesado", "-fecha_proceso", "-id_archivo")
+    )
+    for archivo_rem in consulta:
+        existentes.setdefault(archivo_rem.sha256, []).append(archivo_rem)
+    return existentes
+
+
+def cargar_archivos(request, archivos, periodo, encolar=False, tamano_maximo=None) -> dict:
+    """
+    Valida y guarda un lote de archivos subidos para un período.
+    - tamano_maximo: bytes por archivo (por defecto el del formulario;
+      la carga por partes usa uno mayor).
+
+    Retorna:
+      {"guardados": [ArchivoREM...], "reutilizados": [ArchivoREM...],
+       "avisos": [str...], "tareas": [TareaREM...]}
+    - reutilizados: subconjunto de guardados que quedó procesado copiando
+      los resultados de un archivo idéntico (solo administradores:
+      procesar es una acción de administrador).
+    Los avisos respetan el orden en que vienen los archivos.
+    """
+    avisos_por_indice = {}
+
+    # 1) Duplicados por nombre: dentro del mismo POST y contra la BD
+    nombres = [a.name for a in archivos]
+    ya_cargados = set(
+        ArchivoREM.objects
+        .filter(periodo=periodo, nombre_original__in=nombres)
+        .values_list("nombre_original", flat=True)
+    )
+
+    candidatos = []
+    vistos = set()
+    for i, archivo in enumerate(archivos):
+        if archivo.name in ya_cargados or archivo.name in vistos:
+            avisos_por_indice[i] = (
+                f"El archivo '{archivo.name}' ya fue cargado previamente en este período."
+            )
+            continue
+        vistos.add(archivo.name)
+        candidatos.append((i, archivo))
+
+    # 2) Validación + SHA-256 en paralelo
+    resultados = _en_paralelo(
+        lambda par: _validar_y_hashear(par[1], tamano_maximo), candidatos
+    )
+
+    validos = []
+    for (i, archivo), (aviso, sha256) in zip(candidatos, resultados):
+        if aviso:
+            avisos_por_indice[i] = aviso
+        else:
+            validos.append((i, archivo, sha256))
+
+    # 3) Duplicados por contenido (mismo Excel con otro nombre)
+    existentes = _origenes_por_hash({sha256 for _, _, sha256 in validos})
+    puede_procesar = is_admin_user(request.user)
+
+    por_guardar = []
+    nombres_lote = {}
+    for i, archivo, sha256 in validos:
+        mismo_periodo = next(
+            (a for a in existentes.get(sha256, [])
+             if a.periodo_id == periodo.pk and a.activo),
+            None,
+        )
+        if mismo_periodo or sha256 in nombres_lote:
+            original = mismo_periodo.nombre_original if mismo_periodo else nombres_lote[sha256]
+            avisos_por_indice[i] = (
+                f"El archivo '{archivo.name}' tiene el mismo contenido que "
+                f"'{original}', ya cargado en este período."
+            )
+            continue
+        nombres_lote[sha256] = archivo.name
+        por_guardar.append((archivo, sha256))
+
+    # 4) Escritura al storage por contenido, en paralelo
+    storage = ArchivoREM._meta.get_field("archivo").storage
+    guardados_storage = _en_paralelo(
+        lambda par: guardar_por_contenido(par[0], par[1], storage), por_guardar
+    )
+    escritos = [ruta for ruta, escrito in guardados_storage if escrito]
+
+    nuevos = [
+        ArchivoREM(nombre_original=archivo.name, archivo=ruta, periodo=periodo, sha256=sha256)
+        for (archivo, sha256), (ruta, _escrito) in zip(por_guardar, guardados_storage)
+    ]
+
+    # 5) Inserción en lote (si falla, no quedan archivos huérfanos en disco)
+    reutilizados = []
+    tareas = []
+    try:
+        with transaction.atomic():
+            guardados = ArchivoREM.objects.bulk_create(nuevos)
+            if guardados:
+                # bulk_create no emite post_save (rem/signals.py)
+                incrementar_version(periodo.pk)
+
+            registrar_auditoria_lote(
+                request,
+                AuditLog.ACCION_UPLOAD,
+                [
+                    f"Subió archivo REM '{a.nombre_original}' "
+                    f"para el período {periodo.anio}-{periodo.mes:02d}."
+                    for a in guardados
+                ],
+            )
+
+            pendientes = []
+            for archivo_rem in guardados:
+                origen = puede_procesar and next(
+                    (a for a in existentes.get(archivo_rem.sha256, []) if a.procesado),
+                    None,
+                )
+                if origen:
+                    copiar_resultados_archivo(origen, archivo_rem)
+                    reutilizados.append(archivo_rem)
+                else:
+                    pendientes.append(archivo_rem)
+
+            # 6) Encolar procesamiento de los que no se pudieron reutilizar
+            if encolar and pendientes:
+                tareas = encolar_procesamiento_lote(pendientes, request.user)
+    except Exception:
+        for ruta in escritos:
+            storage.delete(ruta)
+        raise
+
+    return {
+        "guardados": guardados,
+        "reutilizados": reutilizados,
+        "avisos": [avisos_por_indice[i] for i in sorted(avisos_por_indice)],
+        "tareas": tareas,
+    }
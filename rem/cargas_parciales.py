@@ -0,0 +1,312 @@
+# rem/cargas_parciales.py
+"""
+Carga por partes (reanudable) de archivos REM grandes.
+
+Flujo (endpoints en rem/views.py):
+1) POST   /cargas/                      → iniciar (nombre, tamaño, período)
+2) PUT    /cargas/<id>/?offset=N        → bloque de bytes a partir de N
+   GET    /cargas/<id>/                 → cuántos bytes se recibieron
+                                          (para reanudar tras un corte)
+3) POST   /cargas/<id>/finalizar/       → validar y crear el ArchivoREM
+   DELETE /cargas/<id>/                 → cancelar
+
+Los bloques se agregan a un archivo temporal en REM_CARGAS_PARCIALES_DIR
+leyendo el cuerpo del PUT en trozos (memoria constante); la fila de la
+carga se bloquea solo para el paso final, no durante la lectura. El SHA-256 se
+va calculando bloque a bloque; si el bloque siguiente llega a otro
+proceso (o tras un reinicio) se recalcula desde el disco.
+
+Al finalizar, el archivo armado pasa por cargar_archivos (rem/cargas.py):
+misma validación, deduplicación, storage por contenido y auditoría que
+una subida normal.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.utils import timezone
+
+from .cargas import cargar_archivos
+from .contenido import TAMANO_BLOQUE
+from .models import CargaParcial
+
+MB = 1024 * 1024
+
+# Lectura del cuerpo del PUT
+TAMANO_LECTURA = 64 * 1024
+
+# Hash incremental por carga, solo dentro de este proceso:
+# {id_carga: (bytes_hasheados, hasher)}
+_HASHERS = {}
+_HASHERS_LOCK = threading.Lock()
+
+
+class ErrorCargaParcial(Exception):
+    """Error de la API de carga por partes (se responde como JSON)."""
+
+    def __init__(self, mensaje, status=400, **datos):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.status = status
+        self.datos = datos
+
+
+# ============================================================
+# CONFIGURACIÓN
+# ============================================================
+def carpeta_cargas() -> Path:
+    carpeta = Path(getattr(settings, "REM_CARGAS_PARCIALES_DIR", settings.BASE_DIR / "cargas_parciales"))
+    carpeta.mkdir(parents=True, exist_ok=True)
+    return carpeta
+
+
+def tamano_maximo() -> int:
+    return int(getattr(settings, "REM_CARGA_PARCIAL_TAMANO_MAXIMO_MB", 300)) * MB
+
+
+def tamano_bloque() -> int:
+    return int(getattr(settings, "REM_CARGA_PARCIAL_BLOQUE_MB", 5)) * MB
+
+
+def ruta_temporal(carga: CargaParcial) -> Path:
+    return carpeta_cargas() / f"{carga.pk}.part"
+
+
+def carga_a_dict(carga: CargaParcial) -> dict:
+    return {
+        "id": str(carga.pk),
+        "nombre": carga.nombre_original,
+        "tamano_total": carga.tamano_total,
+        "recibido": carga.recibido,
+        "estado": carga.estado,
+        "tamano_bloque": tamano_bloque(),
+        "archivo_id": carga.archivo_id,
+    }
+
+
+# ============================================================
+# HASH INCREMENTAL
+# ============================================================
+def _hasher_hasta(carga: CargaParcial, offset: int):
+    """
+    Hasher con los primeros 'offset' bytes ya procesados.
+    Si este proceso no lo tiene en memoria, se recalcula leyendo el disco.
+    """
+    with _HASHERS_LOCK:
+        entrada = _HASHERS.pop(carga.pk, None)
+    if entrada and entrada[0] == offset:
+        return entrada[1]
+
+    h = hashlib.sha256()
+    pendiente = offset
+    with open(ruta_temporal(carga), "rb") as f:
+        while pendiente > 0:
+            bloque = f.read(min(TAMANO_BLOQUE, pendiente))
+            if not bloque:
+                break
+            h.update(bloque)
+            pendiente -= len(bloque)
+    return h
+
+
+def _guardar_hasher(carga: CargaParcial, offset: int, hasher):
+    with _HASHERS_LOCK:
+        _HASHERS[carga.pk] = (offset, hasher)
+
+
+def _olvidar_hasher(carga: CargaParcial):
+    with _HASHERS_LOCK:
+        _HASHERS.pop(carga.pk, None)
+
+
+# ============================================================
+# OPERACIONES
+# ============================================================
+def iniciar_carga(usuario, periodo, nombre, tamano, encolar=False) -> CargaParcial:
+    nombre = os.path.basename(nombre or "")
+    if os.path.splitext(nombre)[1].lower() != ".xlsx":
+        raise ErrorCargaParcial(f"El archivo '{nombre}' fue ignorado: formato no válido.")
+
+    if tamano <= 0:
+        raise ErrorCargaParcial("El tamaño del archivo no es válido.")
+
+    if tamano > tamano_maximo():
+        raise ErrorCargaParcial(
+            f"El archivo '{nombre}' fue ignorado: supera el tamaño máximo permitido.",
+            status=413,
+        )
+
+    limpiar_cargas_vencidas()
+
+    carga = CargaParcial.objects.create(
+        usuario=usuario,
+        periodo=periodo,
+        nombre_original=nombre,
+        tamano_total=tamano,
+        encolar=encolar,
+    )
+    ruta_temporal(carga).touch()
+    return carga
+
+
+def _validar_bloque(carga: CargaParcial, offset: int, largo: int):
+    if carga.estado != CargaParcial.ESTADO_EN_CURSO:
+        raise ErrorCargaParcial("La carga ya no está en curso.", status=409, recibido=carga.recibido)
+
+    if offset != carga.recibido:
+        raise ErrorCargaParcial(
+            "El offset no coincide con lo recibido.", status=409, recibido=carga.recibido
+        )
+
+    if largo > tamano_bloque():
+        raise ErrorCargaParcial("El bloque supera el tamaño permitido.", status=413)
+
+    if offset + largo > carga.tamano_total:
+        raise ErrorCargaParcial("El bloque excede el tamaño declarado del archivo.")
+
+
+def recibir_bloque(carga: CargaParcial, offset: int, flujo, largo: int) -> CargaParcial:
+    """
+    Escribe 'largo' bytes leídos de 'flujo' (el cuerpo del PUT) a partir
+    de 'offset'. Si la conexión se corta a mitad, se conserva lo recibido:
+    el cliente consulta el estado y reanuda desde ahí.
+
+    El cuerpo (hasta 5 MB por la red) se lee primero a un temporal, sin
+    bloqueo; la fila de CargaParcial se bloquea solo para revalidar el
+    offset y pasar el temporal (en disco local) al archivo de la carga.
+    """
+    _validar_bloque(carga, offset, largo)
+
+    with tempfile.TemporaryFile(dir=carpeta_cargas()) as temporal:
+        leidos = 0
+        while leidos < largo:
+            trozo = flujo.read(min(TAMANO_LECTURA, largo - leidos))
+            if not trozo:
+                break
+            temporal.write(trozo)
+            leidos += len(trozo)
+        temporal.seek(0)
+
+        with transaction.atomic():
+            carga = CargaParcial.objects.select_for_update().get(pk=carga.pk)
+            _validar_bloque(carga, offset, largo)
+
+            hasher = _hasher_hasta(carga, offset)
+            with open(ruta_temporal(carga), "r+b") as destino:
+                # Descarta restos de un intento anterior que no se confirmó
+                destino.seek(offset)
+                destino.truncate()
+
+                while True:
+                    trozo = temporal.read(TAMANO_BLOQUE)
+                    if not trozo:
+                        break
+                    destino.write(trozo)
+                    hasher.update(trozo)
+
+            carga.recibido = offset + leidos
+            carga.save(update_fields=["recibido", "actualizado_en"])
+            _guardar_hasher(carga, carga.recibido, hasher)
+
+    return carga
+
+
+def _bloquear_en_curso(carga: CargaParcial) -> CargaParcial:
+    """
+    La fila de la carga bloqueada (dentro de transaction.atomic), solo si
+    sigue EN_CURSO: dos finalizar o cancelar a la vez (doble clic,
+    reintento del cliente) se ordenan y el segundo recibe 409.
+    """
+    carga = CargaParcial.objects.select_for_update().get(pk=carga.pk)
+    if carga.estado != CargaParcial.ESTADO_EN_CURSO:
+        raise ErrorCargaParcial("La carga ya no está en curso.", status=409, estado=carga.estado)
+    return carga
+
+
+def finalizar_carga(request, carga: CargaParcial) -> dict:
+    """
+    Valida el archivo armado y crea el ArchivoREM con cargar_archivos.
+    Retorna el mismo dict que cargar_archivos; 'carga' queda actualizada.
+
+    Todo ocurre con la fila de la carga bloqueada y pasa a COMPLETADA en
+    la misma transacción: un segundo finalizar espera y recibe 409, en vez
+    de crear otro ArchivoREM (la deduplicación por nombre/hash no ve lo
+    que el primero aún no confirma).
+    """
+    with transaction.atomic():
+        bloqueada = _bloquear_en_curso(carga)
+
+        if bloqueada.recibido != bloqueada.tamano_total:
+            raise ErrorCargaParcial(
+                "Faltan bytes por recibir.", status=409, recibido=bloqueada.recibido
+            )
+
+        ruta = ruta_temporal(bloqueada)
+        sha256 = _hasher_hasta(bloqueada, bloqueada.recibido).hexdigest()
+
+        with open(ruta, "rb") as f:
+            archivo = UploadedFile(
+                file=f,
+                name=bloqueada.nombre_original,
+                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                size=bloqueada.tamano_total,
+            )
+            archivo.sha256 = sha256
+            resultado = cargar_archivos(
+                request,
+                [archivo],
+                bloqueada.periodo,
+                encolar=bloqueada.encolar,
+                tamano_maximo=tamano_maximo(),
+            )
+
+        bloqueada.estado = CargaParcial.ESTADO_COMPLETADA
+        bloqueada.archivo = resultado["guardados"][0] if resultado["guardados"] else None
+        bloqueada.save(update_fields=["estado", "archivo", "actualizado_en"])
+
+    # El temporal se borra recién confirmada la transacción
+    _olvidar_hasher(bloqueada)
+    ruta.unlink(missing_ok=True)
+
+    carga.estado = bloqueada.estado
+    carga.archivo = bloqueada.archivo
+    carga.actualizado_en = bloqueada.actualizado_en
+    return resultado
+
+
+def cancelar_carga(carga: CargaParcial):
+    """Solo una carga EN_CURSO se puede cancelar (ErrorCargaParcial 409 si no)."""
+    with transaction.atomic():
+        bloqueada = _bloquear_en_curso(carga)
+        bloqueada.estado = CargaParcial.ESTADO_CANCELADA
+        bloqueada.save(update_fields=["estado", "actualizado_en"])
+
+    _olvidar_hasher(bloqueada)
+    ruta_temporal(bloqueada).unlink(missing_ok=True)
+    carga.estado = bloqueada.estado
+    carga.actualizado_en = bloqueada.actualizado_en
+
+
+def limpiar_cargas_vencidas() -> int:
+    """Cancela cargas sin actividad en REM_CARGA_PARCIAL_HORAS (24 h)."""
+    horas = int(getattr(settings, "REM_CARGA_PARCIAL_HORAS", 24))
+    limite = timezone.now() - timedelta(hours=horas)
+
+    vencidas = CargaParcial.objects.filter(
+        estado=CargaParcial.ESTADO_EN_CURSO,
+        actualizado_en__lt=limite,
+    )
+    cantidad = 0
+    for carga in vencidas:
+        try:
+            cancelar_carga(carga)
+        except ErrorCargaParcial:
+            continue  # se finalizó o canceló entre medio
+        cantidad += 1
+    return cantidad
@@ -0,0 +1,315 @@
+# rem/cola.py
+"""
+Cola de tareas respaldada en la base de datos (tabla tarea_rem).
+
+- La vista encola (encolar_procesamiento) y redirige a una página de estado.
+- Uno o varios workers (`python manage.py rem_worker`) toman tareas con
+  SELECT ... FOR UPDATE SKIP LOCKED: dos workers nunca toman la misma.
+- Cada tarea tiene reintentos con backoff y un timeout; si un worker muere
+  a mitad de camino, la tarea vencida vuelve a la cola (o queda FALLIDA).
+- Mientras ejecuta, el worker actualiza latido_en cada LATIDO_SEGUNDOS
+  desde un hilo aparte. Una tarea vencida cuyo worker sigue latiendo no
+  se reencola: otro worker la procesaría a la vez (ej: el timeout por
+  SIGALRM no alcanza a cortar un COPY largo).
+"""
+import os
+import signal
+import socket
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .auditoria import registrar_auditoria_sistema
+from .consolidados import refrescar_consolidados_periodo
+from .ingesta import procesar_archivo_rem
+from .libro_periodo import generar_libro_periodo
+from .models import AuditLog, ProgresoREM, TareaREM
+from .progreso import clave_archivo
+
+# Backoff entre reintentos: 30s, 60s, 120s, ...
+BACKOFF_BASE_SEGUNDOS = 30
+
+# Latido del worker durante una tarea; sin latido por LATIDO_VENCIDO_SEGUNDOS
+# se considera que el worker murió
+LATIDO_SEGUNDOS = 30
+LATIDO_VENCIDO_SEGUNDOS = 3 * LATIDO_SEGUNDOS
+
+
+class TiempoAgotado(Exception):
+    """La tarea superó su timeout_segundos."""
+
+
+def nombre_worker() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# ============================================================
+# ENCOLAR
+# ============================================================
+def encolar_procesamiento(archivo_rem, usuario=None) -> TareaREM:
+    """
+    Encola el procesamiento de un ArchivoREM.
+    Si ya hay una tarea pendiente o en proceso para ese archivo, se reutiliza
+    (evita procesar dos veces por doble clic).
+    """
+    activa = (
+        TareaREM.objects
+        .filter(
+            tipo=TareaREM.TIPO_PROCESAR_ARCHIVO,
+            archivo=archivo_rem,
+            estado__in=[TareaREM.ESTADO_PENDIENTE, TareaREM.ESTADO_EN_PROCESO],
+        )
+        .order_by("-creado_en")
+        .first()
+    )
+    if activa:
+        return activa
+
+    # El progreso de una corrida anterior no debe mostrarse como actual
+    ProgresoREM.objects.filter(clave=clave_archivo(archivo_rem.pk)).delete()
+
+    return TareaREM.objects.create(
+        tipo=TareaREM.TIPO_PROCESAR_ARCHIVO,
+        archivo=archivo_rem,
+        solicitado_por=usuario if (usuario and usuario.is_authenticated) else None,
+    )
+
+
+def encolar_procesamiento_lote(archivos_rem, usuario=None) -> list:
+    """
+    Encola el procesamiento de varios ArchivoREM recién creados con un
+    solo INSERT (carga múltiple en subir_excel). Al ser archivos nuevos
+    no hay tareas activas ni progreso previo que revisar.
+    """
+    solicitado_por = usuario if (usuario and usuario.is_authenticated) else None
+    return TareaREM.objects.bulk_create([
+        TareaREM(
+            tipo=TareaREM.TIPO_PROCESAR_ARCHIVO,
+            archivo=archivo_rem,
+            solicitado_por=solicitado_por,
+        )
+        for archivo_rem in archivos_rem
+    ])
+
+
+def encolar_libro_periodo(periodo, usuario=None, tipo=TareaREM.TIPO_LIBRO_PERIODO) -> TareaREM:
+    """
+    Encola la generación del libro completo del período, Excel
+    (LIBRO_PERIODO) o PDF (PDF_PERIODO); ver rem/libro_periodo.py.
+    Reutiliza una tarea activa del mismo tipo y período.
+    """
+    activa = (
+        TareaREM.objects
+        .filter(
+            tipo=tipo,
+            periodo=periodo,
+            estado__in=[TareaREM.ESTADO_PENDIENTE, TareaREM.ESTADO_EN_PROCESO],
+        )
+        .order_by("-creado_en")
+        .first()
+    )
+    if activa:
+        return activa
+
+    return TareaREM.objects.create(
+        tipo=tipo,
+        periodo=periodo,
+        solicitado_por=usuario if (usuario and usuario.is_authenticated) else None,
+    )
+
+
+# ============================================================
+# TOMAR / RECUPERAR
+# ============================================================
+def tomar_siguiente_tarea(worker: str):
+    """
+    Reclama la tarea pendiente más antigua disponible.
+    SKIP LOCKED hace que cada worker salte las filas que otro ya bloqueó.
+    Retorna la TareaREM (ya marcada EN_PROCESO) o None.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        tarea = (
+            TareaREM.objects
+            .select_for_update(skip_locked=True)
+            .filter(estado=TareaREM.ESTADO_PENDIENTE, disponible_desde__lte=ahora)
+            .order_by("disponible_desde", "id_tarea")
+            .first()
+        )
+        if tarea is None:
+            return None
+
+        tarea.estado = TareaREM.ESTADO_EN_PROCESO
+        tarea.intentos += 1
+        tarea.iniciado_en = ahora
+        tarea.latido_en = ahora
+        tarea.worker = worker
+        tarea.save(update_fields=["estado", "intentos", "iniciado_en", "latido_en", "worker"])
+
+    return tarea
+
+
+def recuperar_tareas_vencidas() -> int:
+    """
+    Tareas EN_PROCESO que superaron su timeout y cuyo worker dejó de latir
+    (caído): vuelven a PENDIENTE si quedan intentos, o pasan a FALLIDA.
+    Si el worker sigue latiendo, la tarea es suya hasta que termine.
+    """
+    ahora = timezone.now()
+    latido_minimo = ahora - timedelta(seconds=LATIDO_VENCIDO_SEGUNDOS)
+    recuperadas = 0
+
+    with transaction.atomic():
+        en_proceso = (
+            TareaREM.objects
+            .select_for_update(skip_locked=True)
+            .filter(estado=TareaREM.ESTADO_EN_PROCESO)
+        )
+        for tarea in en_proceso:
+            limite = tarea.iniciado_en + timedelta(seconds=tarea.timeout_segundos)
+            if limite > ahora:
+                continue
+            if tarea.latido_en and tarea.latido_en > latido_minimo:
+                continue
+            _registrar_fallo(tarea, f"Tiempo agotado ({tarea.timeout_segundos}s) en {tarea.worker}.")
+            recuperadas += 1
+
+    return recuperadas
+
+
+# ============================================================
+# EJECUTAR
+# ============================================================
+@contextmanager
+def _limite_tiempo(segundos: int):
+    """
+    Corta la ejecución con SIGALRM si supera 'segundos'.
+    Solo funciona en el hilo principal de un sistema POSIX; en otro caso
+    el timeout lo aplica recuperar_tareas_vencidas().
+    """
+    if not hasattr(signal, "SIGALRM"):
+        yield
+        return
+
+    def _alarma(signum, frame):
+        raise TiempoAgotado(f"Tiempo agotado ({segundos}s).")
+
+    try:
+        anterior = signal.signal(signal.SIGALRM, _alarma)
+    except ValueError:
+        # no estamos en el hilo principal
+        yield
+        return
+
+    signal.alarm(segundos)
+    try:
+        yield
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, anterior)
+
+
+class Latido:
+    """
+    Hilo que actualiza tarea.latido_en cada LATIDO_SEGUNDOS hasta detener().
+    Usa su propia conexión a la BD (la cierra al terminar).
+    """
+
+    def __init__(self, tarea: TareaREM, intervalo=LATIDO_SEGUNDOS):
+        self.tarea = tarea
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._hilo = threading.Thread(target=self._latir, daemon=True)
+
+    def _latir(self):
+        try:
+            while not self._parar.wait(self.intervalo):
+                TareaREM.objects.filter(
+                    pk=self.tarea.pk,
+                    estado=TareaREM.ESTADO_EN_PROCESO,
+                    worker=self.tarea.worker,
+                ).update(latido_en=timezone.now())
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._hilo.join()
+
+
+def _registrar_fallo(tarea: TareaREM, error: str):
+    if tarea.intentos < tarea.max_intentos:
+        espera = BACKOFF_BASE_SEGUNDOS * (2 ** max(tarea.intentos - 1, 0))
+        tarea.estado = TareaREM.ESTADO_PENDIENTE
+        tarea.disponible_desde = timezone.now() + timedelta(seconds=espera)
+    else:
+        tarea.estado = TareaREM.ESTADO_FALLIDA
+        tarea.finalizado_en = timezone.now()
+
+    tarea.error = error
+    tarea.save(update_fields=["estado", "disponible_desde", "finalizado_en", "error"])
+
+
+def _ejecutar_procesar_archivo(tarea: TareaREM) -> dict:
+    archivo_rem = tarea.archivo
+    resumen = procesar_archivo_rem(archivo_rem)
+
+    # Los consolidados multi-mes que incluyen el período recalculan solo este mes
+    refrescar_consolidados_periodo(archivo_rem.periodo_id)
+
+    registrar_auditoria_sistema(
+        tarea.solicitado_por,
+        AuditLog.ACCION_PROCESAR,
+        f"Procesó archivo REM '{archivo_rem.nombre_original}' "
+        f"({resumen['total_registros']} registros guardados en RegistroREM, tarea {tarea.id_tarea}).",
+    )
+    return resumen
+
+
+def _ejecutar_libro_periodo(tarea: TareaREM) -> dict:
+    return generar_libro_periodo(tarea.periodo)
+
+
+def _ejecutar_pdf_periodo(tarea: TareaREM) -> dict:
+    return generar_libro_periodo(tarea.periodo, "libro_pdf")
+
+
+EJECUTORES = {
+    TareaREM.TIPO_PROCESAR_ARCHIVO: _ejecutar_procesar_archivo,
+    TareaREM.TIPO_LIBRO_PERIODO: _ejecutar_libro_periodo,
+    TareaREM.TIPO_PDF_PERIODO: _ejecutar_pdf_periodo,
+}
+
+
+def ejecutar_tarea(tarea: TareaREM) -> bool:
+    """
+    Ejecuta una tarea ya reclamada. Retorna True si terminó bien.
+    Los errores se guardan en la tarea (reintento o FALLIDA).
+    """
+    ejecutor = EJECUTORES.get(tarea.tipo)
+    if ejecutor is None:
+        tarea.intentos = tarea.max_intentos
+        _registrar_fallo(tarea, f"Tipo de tarea desconocido: {tarea.tipo}")
+        return False
+
+    try:
+        with Latido(tarea), _limite_tiempo(tarea.timeout_segundos):
+            resultado = ejecutor(tarea)
+    except Exception as e:
+        _registrar_fallo(tarea, f"{e}\n\n{traceback.format_exc()}")
+        return False
+
+    tarea.estado = TareaREM.ESTADO_COMPLETADA
+    tarea.resultado = resultado
+    tarea.error = ""
+    tarea.finalizado_en = timezone.now()
+    tarea.save(update_fields=["estado", "resultado", "error", "finalizado_en"])
+    return True
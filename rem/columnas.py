@@ -0,0 +1,136 @@
+# rem/columnas.py
+"""
+Columnas a mostrar para una hoja/sección.
+
+- Si la sección está en REM_STRUCTURES se usan esas columnas tal cual.
+- Si no, se "descubren" desde RegistroREM.datos: columnas descriptivas
+  primero y numéricas después, en el orden en que aparecen por primera
+  vez (por id_registro). Un campo cuenta como numérico si su primer
+  valor no nulo es número (o booleano, igual que isinstance(v, int)).
+
+En PostgreSQL el descubrimiento se hace en SQL (jsonb_each + jsonb_typeof)
+y devuelve una fila por clave, sin traer los registros a Python. En otros
+motores se recorre solo la columna datos, con sets para la pertenencia.
+
+El resultado se guarda en la caché compartida (rem/cache.py) por
+(archivo o período, hoja, sección). La clave lleva la versión de datos
+del período (clave_periodo), que sube con cualquier cambio de sus
+ArchivoREM / RegistroREM (rem/versiones.py): procesar, copiar, ingresar
+registros a mano o anular un archivo invalida las columnas en todos los
+procesos, sin contadores guardados en la propia caché.
+"""
+from decimal import Decimal
+
+from django.db import connection
+
+from .cache import clave_periodo, obtener
+
+try:
+    from .rem_structures import REM_STRUCTURES
+except ImportError:
+    REM_STRUCTURES = {}
+
+CACHE_SEGUNDOS = 6 * 60 * 60
+
+TIPOS_NUMERICOS_JSONB = ("number", "boolean")
+
+
+# ============================================================
+# CACHÉ
+# ============================================================
+def alcance_archivo(archivo) -> tuple:
+    """Alcance de un ArchivoREM: (período para la versión, nombre en la clave)."""
+    return archivo.periodo_id, f"archivo-{archivo.pk}"
+
+
+def alcance_periodo(periodo_id, solo_activos=False) -> tuple:
+    """
+    solo_activos=True para consultas restringidas a archivos activos
+    (exportaciones): un archivo anulado puede aportar columnas que el
+    detalle muestra y la exportación no, así que van con otra clave.
+    """
+    return periodo_id, "periodo-activos" if solo_activos else "periodo"
+
+
+def _clave_columnas(alcance, hoja: str, seccion: str):
+    periodo_id, nombre = alcance
+    if not periodo_id:
+        return None  # archivo sin período: sin versión con qué invalidar
+    return clave_periodo("columnas", periodo_id, nombre, hoja, seccion)
+
+
+# ============================================================
+# DESCUBRIMIENTO
+# ============================================================
+def _descubrir_sql(qs):
+    """Una fila por clave: (clave, tipo del primer valor no nulo)."""
+    sub_sql, params = qs.order_by().values("id_registro", "datos").query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT e.key,
+                   (array_agg(jsonb_typeof(e.value) ORDER BY r.id_registro, e.orden))[1] AS tipo
+            FROM ({sub_sql}) AS r
+            CROSS JOIN LATERAL jsonb_each(r.datos) WITH ORDINALITY AS e(key, value, orden)
+            WHERE jsonb_typeof(e.value) <> 'null'
+            GROUP BY e.key
+            ORDER BY min(r.id_registro),
+                     (array_agg(e.orden ORDER BY r.id_registro))[1]
+        """, params)
+        filas = cursor.fetchall()
+
+    columnas_dim = [clave for clave, tipo in filas if tipo not in TIPOS_NUMERICOS_JSONB]
+    columnas_num = [clave for clave, tipo in filas if tipo in TIPOS_NUMERICOS_JSONB]
+    return columnas_dim, columnas_num
+
+
+def _descubrir_python(qs):
+    columnas_dim = []
+    columnas_num = []
+    vistas = set()
+
+    for datos in qs.order_by("id_registro").values_list("datos", flat=True).iterator(chunk_size=2000):
+        for key, value in (datos or {}).items():
+            if key in vistas or value is None:
+                continue
+            vistas.add(key)
+
+            # Heurística: numérico vs descriptivo
+            if isinstance(value, (int, float, Decimal)):
+                columnas_num.append(key)
+            else:
+                columnas_dim.append(key)
+
+    return columnas_dim, columnas_num
+
+
+def descubrir_columnas(qs):
+    """Retorna (columnas_dim, columnas_num) de un queryset de RegistroREM."""
+    if connection.vendor == "postgresql":
+        return _descubrir_sql(qs)
+    return _descubrir_python(qs)
+
+
+def columnas_seccion(qs, alcance: tuple, hoja: str, seccion: str):
+    """
+    Columnas para mostrar una hoja/sección.
+    - qs: RegistroREM ya filtrados por alcance + hoja + sección.
+    - alcance: alcance_archivo(archivo) o alcance_periodo(id) (clave de caché).
+
+    Retorna (columnas, num_desc_cols, usa_estructura_fija).
+    """
+    estructura_hoja = REM_STRUCTURES.get((hoja or "").strip().upper()) or {}
+    estructura = estructura_hoja.get((seccion or "").strip().upper()) or {}
+
+    columnas_config = estructura.get("columnas")
+    if columnas_config:
+        return list(columnas_config), estructura.get("num_desc_cols") or 0, True
+
+    clave = _clave_columnas(alcance, hoja, seccion)
+    if clave is None:
+        encontrado = descubrir_columnas(qs)
+    else:
+        encontrado = obtener("columnas", clave, lambda: descubrir_columnas(qs), CACHE_SEGUNDOS)
+
+    columnas_dim, columnas_num = encontrado
+    return list(columnas_dim) + list(columnas_num), len(columnas_dim), False
@@ -0,0 +1,231 @@
+# rem/consolidados.py
+"""
+Consolidados multi-mes (ENE-FEB, semestral, anual) de una hoja/sección.
+
+MINSAL pide REM que suman fila a fila los REM mensuales. Un consolidado
+suma una sección sobre un conjunto de períodos, alineando las filas por
+su clave descriptiva (DimFilaDescriptiva.clave = sha1 de tipo_de_control,
+profesional, ...), con UN GROUP BY sobre hecho_rem por período.
+
+El resultado queda materializado (ConsolidadoREM / AporteConsolidadoREM):
+- Cada período aporta sus sumas junto con la versión de datos con que se
+  calcularon (rem/versiones.py).
+- Al refrescar solo se recalculan los períodos cuya versión cambió
+  (reprocesamiento, anulación, ingreso manual) y se vuelve a sumar.
+
+El worker refresca al terminar de procesar un archivo; las vistas y
+exportaciones refrescan antes de leer (si nada cambió es una consulta).
+"""
+
+from django.db import transaction
+from django.db.models import Min, Sum
+from django.utils import timezone
+
+from .definiciones import definicion_reporte
+from .estrella import hechos_activos
+from .models import AporteConsolidadoREM, ConsolidadoREM, DimFilaDescriptiva, DimSeccion
+from .reportes import a_numero
+from .versiones import versiones_periodos
+
+# Un consolidado anual son 12 meses; se deja margen para 2 años
+MAXIMO_PERIODOS = 24
+
+
+class ErrorConsolidado(Exception):
+    """Definición de consolidado inválida (se muestra al usuario)."""
+
+
+# ============================================================
+# CREAR
+# ============================================================
+def crear_consolidado(nombre, hoja, seccion, periodos, usuario=None) -> ConsolidadoREM:
+    """Crea el consolidado y materializa sus filas."""
+    nombre = (nombre or "").strip()
+    hoja = (hoja or "").strip().upper()
+    seccion = (seccion or "").strip().upper()
+    periodos = list(periodos)
+
+    if not nombre:
+        raise ErrorConsolidado("Debe indicar un nombre (ej: ENE-FEB 2025).")
+    if definicion_reporte(hoja, seccion) is None:
+        raise ErrorConsolidado(f"REM {hoja} sección {seccion} no tiene estructura definida.")
+    if len(periodos) < 2:
+        raise ErrorConsolidado("Seleccione al menos dos períodos.")
+    if len(periodos) > MAXIMO_PERIODOS:
+        raise ErrorConsolidado(f"Un consolidado admite hasta {MAXIMO_PERIODOS} períodos.")
+
+    with transaction.atomic():
+        consolidado = ConsolidadoREM.objects.create(
+            nombre=nombre,
+            hoja=hoja,
+            seccion=seccion,
+            creado_por=usuario if (usuario and usuario.is_authenticated) else None,
+        )
+        consolidado.periodos.set(periodos)
+
+    refrescar_consolidado(consolidado)
+    return consolidado
+
+
+# ============================================================
+# APORTE DE UN PERÍODO (GROUP BY sobre hecho_rem)
+# ============================================================
+def sumar_periodo(periodo_id, hoja, seccion) -> list:
+    """
+    Sumas de UN período por fila descriptiva y columna:
+      [{"clave", "orden", "descriptivos", "valores"}, ...]
+    "orden" es la primera fila del Excel donde aparece la clave.
+    """
+    dim_seccion = DimSeccion.objects.filter(rem__codigo=hoja, codigo=seccion).only("pk").first()
+    if dim_seccion is None:
+        return []
+
+    sumas = (
+        hechos_activos()
+        .filter(periodo_id=periodo_id, seccion=dim_seccion)
+        .values("fila_descriptiva_id", "columna__nombre")
+        .annotate(total=Sum("valor"), orden=Min("fila"))
+        .order_by()
+    )
+
+    filas = {}
+    for suma in sumas:
+        fila = filas.setdefault(suma["fila_descriptiva_id"], {"orden": suma["orden"], "valores": {}})
+        fila["orden"] = min(fila["orden"], suma["orden"])
+        fila["valores"][suma["columna__nombre"]] = a_numero(suma["total"])
+
+    descriptivas = {
+        d["pk"]: d
+        for d in DimFilaDescriptiva.objects
+        .filter(pk__in=[pk for pk in filas if pk is not None])
+        .values("pk", "clave", "valores")
+    }
+
+    resultado = []
+    for pk, fila in filas.items():
+        dim = descriptivas.get(pk) or {"clave": "", "valores": {}}
+        resultado.append({
+            "clave": dim["clave"],
+            "orden": fila["orden"],
+            "descriptivos": dim["valores"],
+            "valores": fila["valores"],
+        })
+    resultado.sort(key=lambda f: (f["orden"], f["clave"]))
+    return resultado
+
+
+def _sumar_aportes(aportes) -> list:
+    """
+    Suma fila a fila los aportes (ordenados por período). Una clave queda
+    en la posición de su primer período y, dentro de él, de su fila.
+    """
+    filas = {}
+    for posicion, aporte in enumerate(aportes):
+        for fila in aporte.filas:
+            actual = filas.get(fila["clave"])
+            if actual is None:
+                filas[fila["clave"]] = {
+                    "clave": fila["clave"],
+                    "descriptivos": fila["descriptivos"],
+                    "valores": dict(fila["valores"]),
+                    "_orden": (posicion, fila["orden"]),
+                }
+                continue
+            for columna, valor in fila["valores"].items():
+                actual["valores"][columna] = actual["valores"].get(columna, 0) + valor
+
+    ordenadas = sorted(filas.values(), key=lambda f: f["_orden"] + (f["clave"],))
+    for fila in ordenadas:
+        fila.pop("_orden")
+    return ordenadas
+
+
+# ============================================================
+# REFRESCO INCREMENTAL
+# ============================================================
+def refrescar_consolidado(consolidado, forzar=False) -> int:
+    """
+    Recalcula los aportes de los períodos cuya versión de datos cambió
+    (o todos con forzar=True) y vuelve a sumar. Retorna cuántos períodos
+    se recalcularon (0 = el consolidado ya estaba al día).
+    """
+    periodos = list(consolidado.periodos.order_by("anio", "mes").values_list("pk", flat=True))
+    versiones = versiones_periodos(periodos)
+    actuales = {str(p): v for p, v in versiones.items()}
+    if not forzar and consolidado.versiones == actuales:
+        return 0
+
+    with transaction.atomic():
+        # Dos workers que refrescan a la vez: el segundo espera y ve el trabajo hecho
+        consolidado = ConsolidadoREM.objects.select_for_update().get(pk=consolidado.pk)
+        consolidado.aportes.exclude(periodo_id__in=periodos).delete()
+
+        existentes = {a.periodo_id: a for a in consolidado.aportes.all()}
+        recalculados = 0
+        for periodo_id in periodos:
+            aporte = existentes.get(periodo_id)
+            if aporte is not None and aporte.version == versiones[periodo_id] and not forzar:
+                continue
+
+            if aporte is None:
+                aporte = AporteConsolidadoREM(consolidado=consolidado, periodo_id=periodo_id)
+            aporte.version = versiones[periodo_id]
+            aporte.filas = sumar_periodo(periodo_id, consolidado.hoja, consolidado.seccion)
+            aporte.calculado_en = timezone.now()
+            aporte.save()
+            existentes[periodo_id] = aporte
+            recalculados += 1
+
+        consolidado.filas = _sumar_aportes([existentes[p] for p in periodos])
+        consolidado.versiones = actuales
+        consolidado.actualizado_en = timezone.now()
+        consolidado.save(update_fields=["filas", "versiones", "actualizado_en"])
+
+    return recalculados
+
+
+def refrescar_consolidados_periodo(periodo_id) -> int:
+    """Refresca los consolidados que incluyen el período (lo llama el worker)."""
+    if not periodo_id:
+        return 0
+    total = 0
+    for consolidado in ConsolidadoREM.objects.filter(periodos=periodo_id):
+        total += refrescar_consolidado(consolidado)
+    return total
+
+
+# ============================================================
+# LECTURA (vista / Excel / PDF)
+# ============================================================
+def filas_consolidado(consolidado) -> list:
+    """
+    Filas como dicts "datos" (igual que RegistroREM.datos): columnas
+    descriptivas + medidas sumadas. Así pasan por los mismos
+    exportadores Excel / PDF que un período.
+    """
+    return [{**fila["descriptivos"], **fila["valores"]} for fila in consolidado.filas]
+
+
+def tabla_consolidado(consolidado) -> dict:
+    """
+    {"descriptivas", "medidas", "filas": [[...]], "totales": [...]}
+    con las columnas en el orden de REM_STRUCTURES.
+    """
+    definicion = definicion_reporte(consolidado.hoja, consolidado.seccion)
+    descriptivas = definicion.descriptivas if definicion else []
+    medidas = definicion.medidas if definicion else []
+
+    filas = []
+    totales = [0] * len(medidas)
+    for datos in filas_consolidado(consolidado):
+        valores = [datos.get(m, 0) for m in medidas]
+        for i, valor in enumerate(valores):
+            totales[i] += valor
+        filas.append([datos.get(d, "") for d in descriptivas] + valores)
+
+    return {
+        "descriptivas": descriptivas,
+        "medidas": medidas,
+        "filas": filas,
+        "totales": totales,
+    }
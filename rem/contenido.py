@@ -0,0 +1,87 @@
+# rem/contenido.py
+"""
+Almacenamiento de archivos REM direccionado por contenido (SHA-256).
+
+- Los upload handlers calculan el SHA-256 MIENTRAS Django escribe el
+  archivo (memoria o archivo temporal): no hay una segunda lectura.
+  Queda disponible como `archivo_subido.sha256`.
+- El archivo se guarda en rem_uploads/sha256/ab/<hash>.xlsx. Si ese
+  contenido ya existe en el storage, no se vuelve a escribir.
+- ArchivoREM.sha256 permite detectar el mismo Excel aunque venga con otro
+  nombre o para otro período (ver rem/cargas.py).
+"""
+import hashlib
+
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+
+CARPETA_CONTENIDO = "rem_uploads/sha256"
+TAMANO_BLOQUE = 1024 * 1024
+
+
+def ruta_contenido(sha256: str, extension: str = ".xlsx") -> str:
+    return f"{CARPETA_CONTENIDO}/{sha256[:2]}/{sha256}{extension}"
+
+
+def calcular_sha256(archivo) -> str:
+    """
+    SHA-256 de un archivo (UploadedFile o FieldFile).
+    Usa el hash calculado por los upload handlers si está disponible.
+    """
+    ya_calculado = getattr(archivo, "sha256", None)
+    if ya_calculado:
+        return ya_calculado
+
+    h = hashlib.sha256()
+    archivo.seek(0)
+    for bloque in archivo.chunks(TAMANO_BLOQUE):
+        h.update(bloque)
+    archivo.seek(0)
+    return h.hexdigest()
+
+
+def guardar_por_contenido(archivo, sha256: str, storage, extension: str = ".xlsx"):
+    """
+    Escribe el archivo en su ruta por contenido si aún no existe.
+    Retorna (ruta, escrito): escrito=False si se reutilizó el existente.
+    """
+    ruta = ruta_contenido(sha256, extension)
+    if storage.exists(ruta):
+        return ruta, False
+
+    archivo.seek(0)
+    return storage.save(ruta, archivo), True
+
+
+# ============================================================
+# UPLOAD HANDLERS (settings.FILE_UPLOAD_HANDLERS)
+# ============================================================
+class _HashMixin:
+    """Actualiza un SHA-256 con cada bloque que recibe el handler."""
+
+    def new_file(self, *args, **kwargs):
+        self._sha256 = hashlib.sha256()
+        return super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # El handler en memoria solo se activa para archivos pequeños;
+        # si no está activo, el bloque lo hashea el handler siguiente.
+        if getattr(self, "activated", True):
+            self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        archivo = super().file_complete(file_size)
+        if archivo is not None:
+            archivo.sha256 = self._sha256.hexdigest()
+        return archivo
+
+
+class HashMemoryFileUploadHandler(_HashMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashTemporaryFileUploadHandler(_HashMixin, TemporaryFileUploadHandler):
+    pass
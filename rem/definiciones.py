@@ -0,0 +1,130 @@
+# rem/definiciones.py
+"""
+Definiciones declarativas de reporte para cada hoja/sección REM.
+
+Se derivan de REM_STRUCTURES (rem_structures.json), sin código por
+sección:
+- descriptivas : primeras num_desc_cols columnas (tipo_de_control, ...)
+- medidas      : el resto (columnas numéricas)
+- columna_total: "total" si la sección la tiene
+- grupos       : medidas agrupadas con grupo_de_columna
+                 (Rango etario, Sexo, Identificación de género)
+- reglas       : consistencia TOTAL = suma del grupo, para los grupos
+                 que reparten el total (rango etario, sexo)
+
+El motor que las calcula sobre hecho_rem está en rem/reportes.py.
+"""
+import re
+from functools import lru_cache
+
+from .rem_structures import REM_STRUCTURES, grupo_de_columna, pretty_col_name
+
+COLUMNA_TOTAL = "total"
+
+# Grupos cuyas columnas, sumadas, deben dar el TOTAL de la fila
+GRUPOS_QUE_SUMAN_TOTAL = ("Rango etario", "Sexo")
+
+# Prefijo que se quita al rotular una columna dentro de su grupo
+PREFIJOS_GRUPO = {
+    "Rango etario": "rango_etario_",
+    "Sexo": "sexo_",
+    "Identificación de género": "identificacion_de_genero_",
+}
+
+
+def etiqueta_en_grupo(grupo: str, columna: str) -> str:
+    """'rango_etario_5_9_anos' → '5 - 9 años' (rótulo dentro de su grupo)."""
+    prefijo = PREFIJOS_GRUPO.get(grupo, "")
+    resto = columna[len(prefijo):] if prefijo and columna.startswith(prefijo) else columna
+    texto = re.sub(r"(\d+)_(\d+)", r"\1 - \2", resto)
+    texto = re.sub(r"\bmas\b", "más", texto.replace("_", " "))
+    texto = texto.replace("anos", "años")
+    return texto[:1].upper() + texto[1:]
+
+
+class ReglaConsistencia:
+    """La suma de 'columnas' debe ser igual a 'columna_total' en cada fila."""
+
+    def __init__(self, nombre, columna_total, columnas):
+        self.nombre = nombre
+        self.columna_total = columna_total
+        self.columnas = list(columnas)
+
+    def mensaje(self, filas: int) -> str:
+        return (
+            f"Se detectaron {filas} fila(s) donde el TOTAL no coincide con la suma "
+            f"de {self.nombre.lower()}."
+        )
+
+
+class DefinicionReporte:
+    def __init__(self, hoja, seccion, columnas, num_desc_cols):
+        self.hoja = hoja
+        self.seccion = seccion
+        self.columnas = list(columnas)
+        self.descriptivas = self.columnas[:num_desc_cols]
+        self.medidas = self.columnas[num_desc_cols:]
+
+        self.columna_total = COLUMNA_TOTAL if COLUMNA_TOTAL in self.medidas else None
+
+        self.grupos = {}
+        for columna in self.medidas:
+            grupo = grupo_de_columna(columna)
+            if grupo:
+                self.grupos.setdefault(grupo, []).append(columna)
+
+        self.reglas = []
+        if self.columna_total:
+            for grupo in GRUPOS_QUE_SUMAN_TOTAL:
+                if len(self.grupos.get(grupo, [])) > 1:
+                    self.reglas.append(ReglaConsistencia(grupo, self.columna_total, self.grupos[grupo]))
+
+        self.etiquetas = {columna: pretty_col_name(columna) for columna in self.columnas}
+        for grupo, columnas in self.grupos.items():
+            for columna in columnas:
+                self.etiquetas[columna] = etiqueta_en_grupo(grupo, columna)
+
+    @property
+    def medidas_principales(self) -> list:
+        """
+        Medida que se reparte en los gráficos por columna descriptiva:
+        el TOTAL; si no hay, el primer grupo que suma total; si no, todas.
+        """
+        if self.columna_total:
+            return [self.columna_total]
+        for grupo in GRUPOS_QUE_SUMAN_TOTAL:
+            if self.grupos.get(grupo):
+                return list(self.grupos[grupo])
+        return list(self.medidas)
+
+    def __repr__(self):
+        return f"<DefinicionReporte {self.hoja}-{self.seccion}>"
+
+
+def _buscar(diccionario: dict, clave: str):
+    return diccionario.get(clave) or diccionario.get(clave.lower()) or diccionario.get(clave.upper())
+
+
+@lru_cache(maxsize=None)
+def definicion_reporte(hoja: str, seccion: str):
+    """DefinicionReporte de una hoja/sección, o None si no está en REM_STRUCTURES."""
+    hoja = (hoja or "").strip().upper()
+    seccion = (seccion or "").strip().upper()
+
+    estructura = _buscar(_buscar(REM_STRUCTURES, hoja) or {}, seccion) or {}
+    columnas = estructura.get("columnas")
+    if not columnas:
+        return None
+
+    return DefinicionReporte(hoja, seccion, columnas, estructura.get("num_desc_cols") or 0)
+
+
+def definiciones_reporte() -> list:
+    """Todas las secciones reportables, ordenadas por hoja y sección."""
+    definiciones = []
+    for hoja, secciones in REM_STRUCTURES.items():
+        for seccion in secciones:
+            definicion = definicion_reporte(hoja, seccion)
+            if definicion:
+                definiciones.append(definicion)
+    return sorted(definiciones, key=lambda d: (d.hoja, d.seccion))
@@ -0,0 +1,244 @@
+# rem/estrella.py
+"""
+Carga del esquema estrella (cesfam_core) desde el stream del ETL.
+
+Cada fila de RegistroREM se "despliega" en hechos en formato largo:
+una fila de HechoREM por cada columna numérica con valor.
+Las columnas de texto (tipo_de_control, profesional, ...) se guardan una
+sola vez en DimFilaDescriptiva y cada hecho apunta a ella.
+
+Así las preguntas entre períodos o entre secciones se responden con un
+GROUP BY indexado sobre hecho_rem, sin recorrer JSON en Python.
+"""
+import hashlib
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Sum
+
+from .models import DimRem, DimSeccion, DimColumna, DimFilaDescriptiva, HechoREM
+from .rem_structures import REM_STRUCTURES, grupo_de_columna
+
+# Tamaño de lote para bulk_create de hechos
+BATCH_HECHOS = 5000
+
+# Rango de HechoREM.valor: DecimalField(max_digits=20, decimal_places=4)
+_CAMPO_VALOR = HechoREM._meta.get_field("valor")
+LIMITE_VALOR = Decimal(10) ** (_CAMPO_VALOR.max_digits - _CAMPO_VALOR.decimal_places)
+EXPONENTE_VALOR = Decimal(1).scaleb(-_CAMPO_VALOR.decimal_places)
+
+
+def _estructura(hoja: str, seccion: str) -> dict:
+    estructura_hoja = REM_STRUCTURES.get(hoja) or REM_STRUCTURES.get(hoja.lower()) or {}
+    return estructura_hoja.get(seccion) or estructura_hoja.get(seccion.lower()) or {}
+
+
+def _a_decimal(valor):
+    """
+    Devuelve Decimal si 'valor' es numérico (int/float/Decimal) y None si no.
+    Los textos se consideran descriptivos (misma heurística que usan las
+    vistas para "descubrir" columnas dim vs num). NaN / infinito y los
+    valores que no caben en hecho_rem.valor (numeric(20, 4)) también son
+    None: uno solo haría fallar el COPY de todo el archivo.
+    """
+    if valor is None or isinstance(valor, bool):
+        return None
+    if isinstance(valor, Decimal):
+        numero = valor
+    elif isinstance(valor, (int, float)):
+        try:
+            numero = Decimal(str(valor))
+        except InvalidOperation:
+            return None
+    else:
+        return None
+
+    if not numero.is_finite() or abs(numero) >= LIMITE_VALOR:
+        return None
+    # Redondeo de la BD a 4 decimales (9999999999999999.99999 → 1E+16)
+    numero = numero.quantize(EXPONENTE_VALOR)
+    return numero if abs(numero) < LIMITE_VALOR else None
+
+
+class CargadorHechos:
+    """
+    Resuelve dimensiones con cache en memoria durante una carga,
+    para no hacer un get_or_create por cada celda.
+    """
+
+    def __init__(self):
+        self._rems = {}
+        self._secciones = {}
+        self._columnas = {}
+        self._filas = {}
+
+    def rem(self, hoja: str) -> DimRem:
+        if hoja not in self._rems:
+            self._rems[hoja], _ = DimRem.objects.get_or_create(codigo=hoja)
+        return self._rems[hoja]
+
+    def seccion(self, hoja: str, seccion: str) -> DimSeccion:
+        clave = (hoja, seccion)
+        if clave not in self._secciones:
+            self._secciones[clave], _ = DimSeccion.objects.get_or_create(
+                rem=self.rem(hoja),
+                codigo=seccion,
+            )
+        return self._secciones[clave]
+
+    def columna(self, dim_seccion: DimSeccion, orden_cols: dict, nombre: str) -> DimColumna:
+        clave = (dim_seccion.pk, nombre)
+        if clave not in self._columnas:
+            self._columnas[clave], _ = DimColumna.objects.get_or_create(
+                seccion=dim_seccion,
+                nombre=nombre,
+                defaults={
+                    # columnas fuera de REM_STRUCTURES quedan al final
+                    "orden": orden_cols.get(nombre, 1000),
+                    "grupo": grupo_de_columna(nombre),
+                },
+            )
+        return self._columnas[clave]
+
+    def fila_descriptiva(self, dim_seccion: DimSeccion, valores: dict):
+        if not valores:
+            return None
+
+        texto = json.dumps(valores, sort_keys=True, ensure_ascii=False)
+        clave_hash = hashlib.sha1(texto.encode("utf-8")).hexdigest()
+        clave = (dim_seccion.pk, clave_hash)
+
+        if clave not in self._filas:
+            self._filas[clave], _ = DimFilaDescriptiva.objects.get_or_create(
+                seccion=dim_seccion,
+                clave=clave_hash,
+                defaults={
+                    "etiqueta": " · ".join(str(v) for v in valores.values()),
+                    "valores": valores,
+                },
+            )
+        return self._filas[clave]
+
+    def hechos_de_registro(self, archivo_rem, hoja, seccion, fila, datos) -> list:
+        """
+        Convierte UNA fila del ETL (dict de datos) en N objetos HechoREM
+        (uno por columna numérica con valor).
+        """
+        datos = datos or {}
+        dim_seccion = self.seccion(hoja, seccion)
+
+        columnas_estructura = _estructura(hoja, seccion).get("columnas") or []
+        orden_cols = {nombre: idx for idx, nombre in enumerate(columnas_estructura)}
+
+        descriptivos = {}
+        medidas = []
+        for key, value in datos.items():
+            valor = _a_decimal(value)
+            if valor is not None:
+                medidas.append((key, valor))
+            elif isinstance(value, str) and value.strip():
+                descriptivos[key] = value.strip()
+
+        if not medidas:
+            return []
+
+        dim_fila = self.fila_descriptiva(dim_seccion, descriptivos)
+
+        return [
+            HechoREM(
+                periodo_id=archivo_rem.periodo_id,
+                archivo=archivo_rem,
+                rem_id=dim_seccion.rem_id,
+                seccion=dim_seccion,
+                columna=self.columna(dim_seccion, orden_cols, nombre),
+                fila_descriptiva=dim_fila,
+                fila=fila,
+                valor=valor,
+            )
+            for nombre, valor in medidas
+        ]
+
+
+def cargar_hechos_archivo(archivo_rem, registros, reemplazar=True) -> int:
+    """
+    Llena hecho_rem para un ArchivoREM.
+
+    - registros: iterable de objetos con hoja / seccion / fila / datos
+      (normalmente los RegistroREM recién creados por el ETL).
+    - reemplazar=True borra antes los hechos previos del archivo
+      (reprocesamiento). Para ingresos manuales se usa False (se agregan).
+
+    Debe llamarse dentro de la misma transacción que guarda RegistroREM.
+    Retorna la cantidad de hechos insertados.
+    """
+    if reemplazar:
+        HechoREM.objects.filter(archivo=archivo_rem).delete()
+
+    cargador = CargadorHechos()
+    lote = []
+    total = 0
+
+    for reg in registros:
+        lote.extend(
+            cargador.hechos_de_registro(
+                archivo_rem, reg.hoja, reg.seccion, reg.fila, reg.datos
+            )
+        )
+        if len(lote) >= BATCH_HECHOS:
+            HechoREM.objects.bulk_create(lote, batch_size=BATCH_HECHOS)
+            total += len(lote)
+            lote = []
+
+    if lote:
+        HechoREM.objects.bulk_create(lote, batch_size=BATCH_HECHOS)
+        total += len(lote)
+
+    return total
+
+
+# ============================================================
+# CONSULTAS ANALÍTICAS (GROUP BY sobre hecho_rem)
+# ============================================================
+def hechos_activos():
+    """Hechos de archivos activos (los anulados no cuentan en reportes)."""
+    return HechoREM.objects.filter(archivo__activo=True)
+
+
+def totales_por_periodo(hoja: str, seccion: str, columnas=None, periodos=None):
+    """
+    SUM(valor) por (período, columna) para una hoja/sección.
+    Usa el índice (seccion, columna, periodo) de hecho_rem.
+
+    Retorna un queryset de dicts:
+      {"periodo_id", "columna__nombre", "total"}
+    """
+    qs = hechos_activos().filter(
+        rem__codigo=(hoja or "").strip().upper(),
+        seccion__codigo=(seccion or "").strip().upper(),
+    )
+    if columnas:
+        qs = qs.filter(columna__nombre__in=columnas)
+    if periodos is not None:
+        qs = qs.filter(periodo__in=periodos)
+
+    return (
+        qs.values("periodo_id", "columna__nombre")
+        .annotate(total=Sum("valor"))
+        .order_by("periodo_id", "columna__nombre")
+    )
+
+
+def totales_por_seccion(periodo, hoja=None):
+    """
+    SUM(valor) por (hoja, sección) dentro de un período.
+    Útil para comparar secciones sin abrir el JSON de cada registro.
+    """
+    qs = hechos_activos().filter(periodo=periodo)
+    if hoja:
+        qs = qs.filter(rem__codigo=hoja.strip().upper())
+
+    return (
+        qs.values("rem__codigo", "seccion__codigo")
+        .annotate(total=Sum("valor"))
+        .order_by("rem__codigo", "seccion__codigo")
+    )
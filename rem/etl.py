@@ -198,11 +198,20 @@ def extraer_tabla_de_seccion(ws, fila_titulo, fila_fin_seccion):
 # FUNCIÓN PRINCIPAL
 # ==========================
 
-def procesar_archivo_con_mapeo(ruta_excel):
+def procesar_archivo_con_mapeo(ruta_excel, progreso=None):
+    """
+    Lee el Excel consolidado y devuelve una lista de dicts (una fila REM cada uno).
+
+    - progreso: ReporteProgreso opcional (rem/progreso.py). Se informa el total
+      de secciones al inicio y el avance al terminar cada sección.
+    """
     mapeo = get_mapeo()
     wb = load_workbook(ruta_excel, data_only=True)
     registros = []
 
+    # 1) Hojas REM y sus secciones (se calculan una sola vez, también
+    #    sirven para conocer el total de secciones antes de empezar)
+    hojas = []
     for ws in wb.worksheets:
         titulo = ws.title.strip().upper()
 
@@ -215,66 +224,90 @@ def procesar_archivo_con_mapeo(ruta_excel):
         if not secciones:
             continue
 
+        hojas.append((ws, hoja_codigo, secciones))
+
+    if progreso:
+        progreso.iniciar(sum(len(secciones) for _, _, secciones in hojas))
+
+    # 2) Extraer filas sección por sección
+    for ws, hoja_codigo, secciones in hojas:
+        if progreso:
+            progreso.hoja(hoja_codigo)
+
         for i, sec in enumerate(secciones):
             fila_titulo = sec["fila_titulo"]
             id_seccion = normalizar_seccion(sec["id_seccion"])
+            filas_antes = len(registros)
 
             if i + 1 < len(secciones):
                 fila_fin = secciones[i + 1]["fila_titulo"] - 1
             else:
                 fila_fin = ws.max_row
 
-            fila_h1, header1, header2, filas_datos = extraer_tabla_de_seccion(
-                ws, fila_titulo, fila_fin
+            _extraer_registros_seccion(
+                ws, mapeo, hoja_codigo, id_seccion, fila_titulo, fila_fin, registros
             )
-            if not filas_datos:
-                continue
 
-            max_len = max(len(header1), len(header2))
+            if progreso:
+                progreso.seccion_terminada(hoja_codigo, len(registros) - filas_antes)
 
-            columnas_utiles = []
-            for col_idx in range(1, max_len + 1):
-                col_letter = get_column_letter(col_idx).upper()
-                clave = (hoja_codigo, id_seccion, col_letter)
-                cfg = mapeo.get(clave)
-                if not cfg:
-                    continue
+    return registros
 
-                campo_destino = cfg["campo_destino"].strip()
-                if not campo_destino or campo_destino == "0":
-                    continue
 
-                columnas_utiles.append((col_idx, cfg))
+def _extraer_registros_seccion(ws, mapeo, hoja_codigo, id_seccion, fila_titulo, fila_fin, registros):
+    """
+    Agrega a 'registros' las filas de UNA sección, aplicando el mapeo
+    (columna Excel → campo_destino / tipo_dato).
+    """
+    fila_h1, header1, header2, filas_datos = extraer_tabla_de_seccion(
+        ws, fila_titulo, fila_fin
+    )
+    if not filas_datos:
+        return
 
-            if not columnas_utiles:
-                continue
+    max_len = max(len(header1), len(header2))
 
-            for idx_local, fila in enumerate(filas_datos, start=1):
-                reg = {
-                    "hoja": hoja_codigo,
-                    "seccion": id_seccion,
-                    "fila": idx_local,
-                }
-                for col_idx, cfg in columnas_utiles:
-                    idx0 = col_idx - 1
-                    valor = fila[idx0] if idx0 < len(fila) else None
-                    tipo = cfg["tipo_dato"]
-                    campo = cfg["campo_destino"].strip()
-
-                    if valor is None:
-                        reg[campo] = None
-                    else:
-                        if tipo == "entero":
-                            try:
-                                reg[campo] = int(valor)
-                            except Exception:
-                                try:
-                                    reg[campo] = int(float(valor))
-                                except Exception:
-                                    reg[campo] = None
-                        else:
-                            reg[campo] = str(valor).strip()
-
-                registros.append(reg)
+    columnas_utiles = []
+    for col_idx in range(1, max_len + 1):
+        col_letter = get_column_letter(col_idx).upper()
+        clave = (hoja_codigo, id_seccion, col_letter)
+        cfg = mapeo.get(clave)
+        if not cfg:
+            continue
 
-    return registros
+        campo_destino = cfg["campo_destino"].strip()
+        if not campo_destino or campo_destino == "0":
+            continue
+
+        columnas_utiles.append((col_idx, cfg))
+
+    if not columnas_utiles:
+        return
+
+    for idx_local, fila in enumerate(filas_datos, start=1):
+        reg = {
+            "hoja": hoja_codigo,
+            "seccion": id_seccion,
+            "fila": idx_local,
+        }
+        for col_idx, cfg in columnas_utiles:
+            idx0 = col_idx - 1
+            valor = fila[idx0] if idx0 < len(fila) else None
+            tipo = cfg["tipo_dato"]
+            campo = cfg["campo_destino"].strip()
+
+            if valor is None:
+                reg[campo] = None
+            else:
+                if tipo == "entero":
+                    try:
+                        reg[campo] = int(valor)
+                    except Exception:
+                        try:
+                            reg[campo] = int(float(valor))
+                        except Exception:
+                            reg[campo] = None
+                else:
+                    reg[campo] = str(valor).strip()
+
+        registros.append(reg)
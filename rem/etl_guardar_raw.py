@@ -24,6 +24,16 @@ django.setup()
 # ================================
 
 from rem.services import procesar_y_guardar
+from rem.progreso import ReporteProgreso, clave_cli
+
+
+def imprimir_progreso(p):
+    eta = f"{p['eta_segundos']:.0f}s" if p["eta_segundos"] is not None else "--"
+    print(
+        f"  [{p['porcentaje']:3d}%] {p['etapa']:<9} hoja {p['hoja_actual'] or '-':<5} "
+        f"secciones {p['secciones_hechas']}/{p['secciones_total']} · "
+        f"filas {p['filas_escritas']} · {p['transcurrido_segundos']:.0f}s · ETA {eta}"
+    )
 
 
 if __name__ == "__main__":
@@ -39,7 +49,13 @@ if __name__ == "__main__":
 
     # OJO: procesar_y_guardar asume que el archivo está en MEDIA_ROOT/rem_uploads
     # y recibe solo el nombre, no la ruta completa
-    registros, resumen = procesar_y_guardar(nombre_archivo)
+    # El avance queda en progreso_rem (clave cli-<archivo>) y se imprime aquí
+    progreso = ReporteProgreso(clave_cli(nombre_archivo), eco=imprimir_progreso, intervalo=2)
+    try:
+        registros, resumen = procesar_y_guardar(nombre_archivo, progreso=progreso)
+    except Exception as e:
+        progreso.fallar(str(e))
+        raise
 
     print("\n✔ Insertado en BD correctamente")
     print(f"Total filas procesadas: {len(registros)}")
@@ -0,0 +1,157 @@
+# rem/exportaciones.py
+"""
+Caché en disco de exportaciones (Excel, PDF, libro completo del período).
+
+Cada archivo se identifica por (formato, período, hoja, sección, versión
+de datos del período) y vive en REM_EXPORTACIONES_DIR:
+    <periodo>_<formato>_<hoja>_<seccion>_v<version>.<ext>
+
+- Acierto: se envía el archivo tal cual (sin openpyxl ni ReportLab) y se
+  actualiza su mtime, que hace de "último uso" para el LRU.
+- Fallo: se genera en un temporal del mismo directorio y se renombra.
+- Tamaño acotado (REM_EXPORTACIONES_MAX_MB): al guardar se borran los
+  archivos usados hace más tiempo hasta quedar bajo el límite.
+- Invalidación: al cambiar la versión de datos de un período (procesar,
+  anular, ingreso manual; ver rem/versiones.py) rem/signals.py borra sus
+  archivos. Aunque quedara alguno, la versión nueva nunca lo usaría.
+"""
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+from .versiones import version_periodo
+
+# formato → extensión del archivo
+EXTENSIONES = {
+    "excel": "xlsx",          # exportador genérico (rem/exportar.py)
+    "excel_a01a": "xlsx",     # cabecera fija REM A01 - Sección A
+    "pdf": "pdf",             # exportador genérico (rem/exportar_pdf.py)
+    "pdf_a01a": "pdf",        # REM A01 - Sección A (título y columnas propios)
+    "libro": "xlsx",          # libro completo del período (rem/libro_periodo.py)
+    "libro_pdf": "pdf",       # ídem, en PDF (rem/exportar_pdf.py)
+}
+
+MAXIMO_MB_POR_DEFECTO = 500
+
+
+def directorio() -> Path:
+    ruta = Path(
+        getattr(settings, "REM_EXPORTACIONES_DIR", None)
+        or Path(settings.BASE_DIR) / "exportaciones"
+    )
+    ruta.mkdir(parents=True, exist_ok=True)
+    return ruta
+
+
+def _limpio(texto) -> str:
+    return re.sub(r"[^A-Za-z0-9.]+", "-", str(texto or "")) or "-"
+
+
+def ruta_exportacion(formato, periodo_id, hoja, seccion, version) -> Path:
+    nombre = f"{periodo_id}_{formato}_{_limpio(hoja)}_{_limpio(seccion)}_v{version}.{EXTENSIONES[formato]}"
+    return directorio() / nombre
+
+
+def _es_exportacion(ruta: Path) -> bool:
+    return ruta.suffix in (".xlsx", ".pdf") and not ruta.name.startswith(".")
+
+
+# ============================================================
+# BUSCAR / GUARDAR
+# ============================================================
+def buscar(formato, periodo_id, hoja="", seccion="", version=None):
+    """Ruta del archivo de la versión (actual, si no se indica) o None."""
+    if version is None:
+        version, _ = version_periodo(periodo_id)
+    ruta = ruta_exportacion(formato, periodo_id, hoja, seccion, version)
+    try:
+        os.utime(ruta)          # último uso (LRU)
+    except FileNotFoundError:
+        return None
+    return ruta
+
+
+def guardar(formato, periodo_id, hoja, seccion, version, escribir) -> Path:
+    """
+    escribir(archivo) escribe el contenido en un archivo binario abierto.
+    Se escribe a un temporal y se renombra: nadie ve un archivo a medias.
+    """
+    destino = ruta_exportacion(formato, periodo_id, hoja, seccion, version)
+    temporal = tempfile.NamedTemporaryFile(
+        dir=destino.parent, prefix="." + destino.stem + ".", suffix=".tmp", delete=False
+    )
+    try:
+        with temporal:
+            escribir(temporal)
+        os.replace(temporal.name, destino)
+    except BaseException:
+        Path(temporal.name).unlink(missing_ok=True)
+        raise
+
+    recortar(conservar=destino)
+    return destino
+
+
+def exportacion(formato, periodo_id, hoja, seccion, escribir):
+    """
+    Archivo abierto (rb) de la exportación en su versión actual,
+    generándolo con escribir(archivo) si no está en caché.
+    """
+    version, _ = version_periodo(periodo_id)
+    for _intento in range(2):
+        ruta = buscar(formato, periodo_id, hoja, seccion, version)
+        if ruta is None:
+            ruta = guardar(formato, periodo_id, hoja, seccion, version, escribir)
+        try:
+            return open(ruta, "rb")
+        except FileNotFoundError:
+            continue            # otro proceso lo desalojó entre medio
+    raise FileNotFoundError(ruta)
+
+
+# ============================================================
+# INVALIDACIÓN / LRU
+# ============================================================
+def invalidar_periodo(periodo_id) -> int:
+    """Borra las exportaciones del período. Retorna cuántos archivos."""
+    borrados = 0
+    for ruta in directorio().glob(f"{periodo_id}_*"):
+        if _es_exportacion(ruta):
+            ruta.unlink(missing_ok=True)
+            borrados += 1
+    return borrados
+
+
+def recortar(maximo_bytes=None, conservar=None) -> int:
+    """
+    Borra las exportaciones usadas hace más tiempo (mtime) hasta que el
+    directorio quede bajo el límite. Retorna cuántos archivos borró.
+    """
+    if maximo_bytes is None:
+        maximo_mb = getattr(settings, "REM_EXPORTACIONES_MAX_MB", MAXIMO_MB_POR_DEFECTO)
+        maximo_bytes = maximo_mb * 1024 * 1024
+
+    archivos = []
+    for ruta in directorio().iterdir():
+        if not _es_exportacion(ruta):
+            continue
+        try:
+            estado = ruta.stat()
+        except FileNotFoundError:
+            continue
+        archivos.append((estado.st_mtime, estado.st_size, ruta))
+
+    total = sum(tamano for _, tamano, _ in archivos)
+    borrados = 0
+    for _, tamano, ruta in sorted(archivos, key=lambda a: a[0]):
+        if total <= maximo_bytes:
+            break
+        if ruta == conservar:
+            continue
+        ruta.unlink(missing_ok=True)
+        total -= tamano
+        borrados += 1
+    return borrados
@@ -0,0 +1,202 @@
+# rem/exportar.py
+"""
+Exportación a Excel de cualquier hoja/sección REM, en modo streaming.
+
+- Cabecera de dos filas desde REM_STRUCTURES: las columnas de un grupo
+  (Rango etario, Sexo, Identificación de género) quedan bajo un título
+  combinado, con los mismos bloques que la tabla de ver_registros
+  (bloques_header); el resto de las columnas ocupa las dos filas.
+- openpyxl en modo write-only: cada fila va al archivo apenas se agrega.
+  Los estilos son NamedStyle registrados una vez en el libro; las celdas
+  solo los nombran (no se crea un Alignment / Border por celda).
+- El libro se guarda en un archivo temporal y se envía por bloques con
+  StreamingHttpResponse: la memoria no crece con la cantidad de filas.
+"""
+import tempfile
+
+from django.http import StreamingHttpResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
+from openpyxl.utils import get_column_letter
+
+from .definiciones import etiqueta_en_grupo
+from .rem_structures import bloques_header, grupo_de_columna, pretty_col_name
+from .reportes import a_entero
+
+CONTENT_TYPE_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Bytes por bloque al enviar el archivo temporal
+BLOQUE_RESPUESTA = 64 * 1024
+
+ANCHO_DESCRIPTIVA = 28
+ANCHO_MEDIDA = 12
+
+ESTILO_TITULO = "rem_titulo"
+ESTILO_CABECERA = "rem_cabecera"
+ESTILO_TEXTO = "rem_texto"
+ESTILO_NUMERO = "rem_numero"
+
+
+def _estilos() -> list:
+    """Un juego nuevo por libro (un NamedStyle queda ligado a su Workbook)."""
+    thin = Side(border_style="thin", color="000000")
+    borde = Border(top=thin, left=thin, right=thin, bottom=thin)
+    return [
+        NamedStyle(name=ESTILO_TITULO, font=Font(bold=True, size=12)),
+        NamedStyle(
+            name=ESTILO_CABECERA,
+            font=Font(bold=True),
+            border=borde,
+            alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+        ),
+        NamedStyle(name=ESTILO_TEXTO, border=borde, alignment=Alignment(vertical="center")),
+        NamedStyle(
+            name=ESTILO_NUMERO,
+            border=borde,
+            alignment=Alignment(horizontal="center", vertical="center"),
+        ),
+    ]
+
+
+class HojaExcel:
+    """
+    Hoja write-only. Lleva la cuenta de filas escritas para poder combinar
+    celdas (en write-only no hay acceso a celdas ya escritas).
+    Los anchos de columna se fijan al crearla: deben ir antes de la
+    primera fila.
+    """
+
+    def __init__(self, ws, num_desc_cols=0, num_columnas=0):
+        self.ws = ws
+        self.fila = 0
+        for idx in range(1, num_columnas + 1):
+            ancho = ANCHO_DESCRIPTIVA if idx <= num_desc_cols else ANCHO_MEDIDA
+            self.ws.column_dimensions[get_column_letter(idx)].width = ancho
+
+    def _celda(self, valor, estilo):
+        celda = WriteOnlyCell(self.ws, value=valor)
+        celda.style = estilo
+        return celda
+
+    def _agregar(self, celdas):
+        self.ws.append(celdas)
+        self.fila += 1
+
+    def _combinar(self, col_desde, fila_desde, col_hasta, fila_hasta):
+        if (col_desde, fila_desde) != (col_hasta, fila_hasta):
+            self.ws.merged_cells.add(
+                f"{get_column_letter(col_desde)}{fila_desde}:{get_column_letter(col_hasta)}{fila_hasta}"
+            )
+
+    def en_blanco(self):
+        self._agregar([])
+
+    def titulo(self, texto):
+        self._agregar([self._celda(texto, ESTILO_TITULO)])
+
+    def cabecera(self, columnas):
+        """Una fila si la sección no tiene grupos; dos (con merges) si tiene."""
+        grupos = [grupo_de_columna(c) for c in columnas]
+        if not any(grupos):
+            self._agregar([self._celda(pretty_col_name(c), ESTILO_CABECERA) for c in columnas])
+            return
+
+        primera = self.fila + 1
+        fila_grupo, fila_columna = [], []
+        col = 1
+        for bloque in bloques_header(columnas):
+            span = bloque["span"]
+            if bloque["nombre"]:
+                fila_grupo += [bloque["nombre"]] + [None] * (span - 1)
+                fila_columna += [
+                    etiqueta_en_grupo(bloque["nombre"], c) for c in columnas[col - 1:col - 1 + span]
+                ]
+                self._combinar(col, primera, col + span - 1, primera)
+            else:
+                for idx in range(span):
+                    fila_grupo.append(pretty_col_name(columnas[col - 1 + idx]))
+                    fila_columna.append(None)
+                    self._combinar(col + idx, primera, col + idx, primera + 1)
+            col += span
+
+        self._agregar([self._celda(v, ESTILO_CABECERA) for v in fila_grupo])
+        self._agregar([self._celda(v, ESTILO_CABECERA) for v in fila_columna])
+
+    def filas(self, columnas, num_desc_cols, filas) -> int:
+        """
+        Escribe dicts "datos" (RegistroREM.datos o equivalentes):
+        descriptivas como texto y el resto como entero. Retorna cuántas.
+        """
+        total = 0
+        for datos in filas:
+            datos = datos or {}
+            self._agregar([
+                self._celda(datos.get(c), ESTILO_TEXTO) if idx < num_desc_cols
+                else self._celda(a_entero(datos.get(c)), ESTILO_NUMERO)
+                for idx, c in enumerate(columnas)
+            ])
+            total += 1
+        return total
+
+    def seccion(self, columnas, num_desc_cols, filas) -> int:
+        self.cabecera(columnas)
+        return self.filas(columnas, num_desc_cols, filas)
+
+
+class LibroExcel:
+    """Workbook write-only con los estilos compartidos ya registrados."""
+
+    def __init__(self):
+        self.wb = Workbook(write_only=True)
+        for estilo in _estilos():
+            self.wb.add_named_style(estilo)
+
+    def hoja(self, titulo, num_desc_cols=0, num_columnas=0) -> HojaExcel:
+        # Excel no admite más de 31 caracteres ni []:*?/\ en el nombre
+        for caracter in "[]:*?/\\":
+            titulo = titulo.replace(caracter, "-")
+        return HojaExcel(self.wb.create_sheet(titulo[:31]), num_desc_cols, num_columnas)
+
+    def guardar(self, destino=None):
+        """Guarda en 'destino' (archivo abierto) o en un temporal; lo deja al inicio."""
+        archivo = destino or tempfile.TemporaryFile(suffix=".xlsx")
+        self.wb.save(archivo)
+        archivo.seek(0)
+        return archivo
+
+
+def libro_seccion(titulo, columnas, num_desc_cols, filas, destino=None):
+    """Libro (.xlsx) con una hoja: cabecera agrupada + filas. Ver LibroExcel.guardar."""
+    libro = LibroExcel()
+    libro.hoja(titulo, num_desc_cols, len(columnas)).seccion(columnas, num_desc_cols, filas)
+    return libro.guardar(destino)
+
+
+# ============================================================
+# RESPUESTA HTTP DESDE ARCHIVO TEMPORAL
+# ============================================================
+def _leer_en_bloques(archivo, tamano=BLOQUE_RESPUESTA):
+    try:
+        while True:
+            bloque = archivo.read(tamano)
+            if not bloque:
+                break
+            yield bloque
+    finally:
+        archivo.close()
+
+
+def respuesta_archivo(archivo, filename, content_type):
+    """
+    StreamingHttpResponse que envía 'archivo' (abierto, al inicio) por
+    bloques y lo cierra al terminar (un TemporaryFile se borra solo).
+    """
+    archivo.seek(0, 2)
+    tamano = archivo.tell()
+    archivo.seek(0)
+
+    response = StreamingHttpResponse(_leer_en_bloques(archivo), content_type=content_type)
+    response["Content-Length"] = str(tamano)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
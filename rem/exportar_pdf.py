@@ -0,0 +1,192 @@
+# rem/exportar_pdf.py
+"""
+Exportación a PDF (ReportLab) de cualquier hoja/sección REM, por páginas.
+
+- Anchos de columna y alto de la cabecera se calculan una sola vez por
+  sección, desde las columnas de REM_STRUCTURES (descriptivas y TOTAL más
+  anchas, el resto se reparte el ancho de la página).
+- Con alto de fila fijo se sabe cuántas filas caben por página: las filas
+  se agrupan en tablas de ese tamaño, cada una con su cabecera, y se
+  dibujan directo en el canvas. Nunca existe una Table con todas las
+  filas (su layout crece más que linealmente con ellas).
+- El PDF se escribe en un SpooledTemporaryFile (pasa a disco si crece) y
+  se envía por bloques con respuesta_archivo (rem/exportar.py).
+"""
+import tempfile
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph, Table, TableStyle
+
+from .rem_structures import pretty_col_name
+from .reportes import a_entero
+
+CONTENT_TYPE_PDF = "application/pdf"
+
+PAGINA = landscape(A4)
+MARGEN_X = 15
+MARGEN_Y = 20
+
+TAMANO_FUENTE = 6
+ALTO_FILA = 10
+ALTO_TITULO = 16
+
+ANCHO_PRIMERA_DESCRIPTIVA = 110
+ANCHO_DESCRIPTIVA = 70
+ANCHO_TOTAL = 45
+ANCHO_MINIMO = 20
+
+# Sobre este tamaño el temporal pasa de memoria a disco
+MAXIMO_EN_MEMORIA = 8 * 1024 * 1024
+
+ESTILO_CABECERA = ParagraphStyle(
+    "rem_pdf_cabecera",
+    fontName="Helvetica-Bold",
+    fontSize=TAMANO_FUENTE,
+    leading=TAMANO_FUENTE + 1,
+    alignment=1,  # centrado
+)
+
+
+def anchos_columnas(columnas, num_desc_cols, ancho_disponible) -> list:
+    """
+    Primera descriptiva, demás descriptivas y TOTAL con ancho fijo; el
+    resto se reparte lo que queda (mínimo ANCHO_MINIMO). Si aun así no
+    caben, todas se escalan al ancho disponible.
+    """
+    fijos = []
+    for idx, col in enumerate(columnas):
+        if idx == 0 and num_desc_cols:
+            fijos.append(ANCHO_PRIMERA_DESCRIPTIVA)
+        elif idx < num_desc_cols:
+            fijos.append(ANCHO_DESCRIPTIVA)
+        elif col == "total":
+            fijos.append(ANCHO_TOTAL)
+        else:
+            fijos.append(None)
+
+    restante = ancho_disponible - sum(a for a in fijos if a)
+    num_restantes = max(fijos.count(None), 1)
+    ancho_otros = max(restante / num_restantes, ANCHO_MINIMO)
+    anchos = [a or ancho_otros for a in fijos]
+
+    total = sum(anchos)
+    if total > ancho_disponible:
+        anchos = [a * ancho_disponible / total for a in anchos]
+    return anchos
+
+
+def _estilo_tabla(num_desc_cols) -> TableStyle:
+    return TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e5e7eb")),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), TAMANO_FUENTE),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("TOPPADDING", (0, 1), (-1, -1), 1),
+        ("BOTTOMPADDING", (0, 1), (-1, -1), 1),
+        ("ALIGN", (num_desc_cols, 1), (-1, -1), "RIGHT"),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#fffce8")]),
+    ])
+
+
+class PdfREM:
+    """
+    Documento PDF con una o más secciones; cada sección empieza en una
+    página nueva con su título.
+    """
+
+    def __init__(self, destino):
+        self.canvas = canvas.Canvas(destino, pagesize=PAGINA)
+        self.ancho_util = PAGINA[0] - 2 * MARGEN_X
+        self.alto_util = PAGINA[1] - 2 * MARGEN_Y
+        self.paginas = 0
+
+    def _pagina(self, titulo, tabla):
+        y = PAGINA[1] - MARGEN_Y
+        if titulo:
+            self.canvas.setFont("Helvetica-Bold", 9)
+            self.canvas.drawString(MARGEN_X, y - 10, titulo)
+            y -= ALTO_TITULO
+        _ancho, alto = tabla.wrapOn(self.canvas, self.ancho_util, y - MARGEN_Y)
+        tabla.drawOn(self.canvas, MARGEN_X, y - alto)
+        self.canvas.showPage()
+        self.paginas += 1
+
+    def seccion(self, titulo, columnas, num_desc_cols, filas, encabezados=None) -> int:
+        """
+        filas: dicts "datos" (RegistroREM.datos o equivalentes); se
+        consumen de a una página. encabezados: rótulos por columna
+        (por defecto pretty_col_name). Retorna cuántas filas escribió.
+        Sin columnas no hay tabla que dibujar: ValueError (las vistas
+        responden antes, ej: 404 si la sección no tiene datos).
+        """
+        if not columnas:
+            raise ValueError(f"La sección '{titulo}' no tiene columnas para exportar a PDF.")
+
+        anchos = anchos_columnas(columnas, num_desc_cols, self.ancho_util)
+        cabecera = [
+            Paragraph(escape(str(texto)), ESTILO_CABECERA)
+            for texto in (encabezados or [pretty_col_name(c) for c in columnas])
+        ]
+        alto_cabecera = max(p.wrap(a - 6, self.alto_util)[1] for p, a in zip(cabecera, anchos)) + 6
+        estilo = _estilo_tabla(num_desc_cols)
+
+        alto_filas = self.alto_util - (ALTO_TITULO if titulo else 0) - alto_cabecera
+        filas_por_pagina = max(int(alto_filas // ALTO_FILA), 1)
+
+        def dibujar(bloque):
+            tabla = Table(
+                [cabecera] + bloque,
+                colWidths=anchos,
+                rowHeights=[alto_cabecera] + [ALTO_FILA] * len(bloque),
+            )
+            tabla.setStyle(estilo)
+            self._pagina(titulo, tabla)
+
+        total = 0
+        bloque = []
+        for datos in filas:
+            datos = datos or {}
+            bloque.append([
+                (datos.get(c) or "") if idx < num_desc_cols else a_entero(datos.get(c))
+                for idx, c in enumerate(columnas)
+            ])
+            total += 1
+            if len(bloque) == filas_por_pagina:
+                dibujar(bloque)
+                bloque = []
+
+        if bloque:
+            dibujar(bloque)
+        elif not total:
+            dibujar([["Sin datos para este período"] + [""] * (len(columnas) - 1)])
+        return total
+
+    def nota(self, texto):
+        """Página con solo un texto (ej: período sin datos)."""
+        self.canvas.setFont("Helvetica", 10)
+        self.canvas.drawString(MARGEN_X, PAGINA[1] - MARGEN_Y - 10, texto)
+        self.canvas.showPage()
+        self.paginas += 1
+
+    def guardar(self):
+        self.canvas.save()
+
+
+def documento_pdf(destino=None):
+    """PdfREM sobre 'destino' (archivo abierto) o sobre un SpooledTemporaryFile."""
+    archivo = destino or tempfile.SpooledTemporaryFile(max_size=MAXIMO_EN_MEMORIA, suffix=".pdf")
+    return PdfREM(archivo), archivo
+
+
+def pdf_seccion(titulo, columnas, num_desc_cols, filas, encabezados=None, destino=None):
+    """PDF de una sección; retorna el archivo (destino o temporal) al inicio."""
+    documento, archivo = documento_pdf(destino)
+    documento.seccion(titulo, columnas, num_desc_cols, filas, encabezados)
+    documento.guardar()
+    archivo.seek(0)
+    return archivo
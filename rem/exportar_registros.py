@@ -0,0 +1,165 @@
+# rem/exportar_registros.py
+"""
+Volcado de RegistroREM en CSV o JSON Lines, para análisis externo (BI).
+
+- Alcance: uno o varios períodos, opcionalmente una sola hoja; solo
+  archivos activos.
+- Las filas se leen con .iterator(chunk_size) (cursor del lado del
+  servidor en PostgreSQL) y se convierten en texto de a una: la memoria
+  no depende de cuántos registros tenga el volcado.
+- CSV: columnas fijas de metadatos + las de REM_STRUCTURES de las hojas
+  del alcance (unión, en orden de la estructura). Las claves que no
+  estén en la estructura van juntas, como JSON, en la columna "otros".
+  Sin hoja, la cabecera es la de todas las hojas: el esquema no cambia
+  entre un volcado y otro.
+- JSONL: un objeto por registro, metadatos + datos (primero las columnas
+  de la estructura de su sección, después el resto).
+- Se envía por bloques; con gzip cada bloque se comprime y se vacía
+  (Z_SYNC_FLUSH), así el cliente recibe bytes desde la primera línea.
+"""
+import csv
+import json
+import zlib
+
+from .models import RegistroREM
+from .rem_structures import REM_STRUCTURES
+
+TAMANO_LOTE = 2000
+
+# Bytes de texto por bloque enviado
+BLOQUE = 64 * 1024
+
+FORMATOS = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+}
+CONTENT_TYPE_GZIP = "application/gzip"
+
+# (nombre en el volcado, campo de RegistroREM)
+COLUMNAS_META = [
+    ("anio", "archivo__periodo__anio"),
+    ("mes", "archivo__periodo__mes"),
+    ("id_archivo", "archivo_id"),
+    ("id_registro", "id_registro"),
+    ("hoja", "hoja"),
+    ("seccion", "seccion"),
+    ("fila", "fila"),
+]
+COLUMNA_OTROS = "otros"
+
+
+def registros_exportables(periodos, hoja=None):
+    """RegistroREM de archivos activos de los períodos (ids), por período y orden de carga."""
+    qs = RegistroREM.objects.filter(archivo__periodo_id__in=periodos, archivo__activo=True)
+    if hoja:
+        qs = qs.filter(hoja=hoja)
+    return qs.order_by("archivo__periodo__anio", "archivo__periodo__mes", "id_registro")
+
+
+def _columnas_estructura(hoja, seccion) -> list:
+    return list(((REM_STRUCTURES.get(hoja) or {}).get(seccion) or {}).get("columnas") or [])
+
+
+def columnas_planas(hoja=None) -> list:
+    """Columnas de datos del CSV: unión de las secciones de la hoja (o de todas)."""
+    hojas = [hoja] if hoja else list(REM_STRUCTURES)
+    columnas = {}
+    for nombre_hoja in hojas:
+        for seccion in REM_STRUCTURES.get(nombre_hoja) or {}:
+            for columna in _columnas_estructura(nombre_hoja, seccion):
+                columnas.setdefault(columna, None)
+    return list(columnas)
+
+
+def _filas(qs):
+    """(metadatos, datos) por registro, leyendo solo los campos necesarios."""
+    campos = [campo for _, campo in COLUMNAS_META] + ["datos"]
+    nombres = [nombre for nombre, _ in COLUMNAS_META]
+    for valores in qs.values_list(*campos).iterator(chunk_size=TAMANO_LOTE):
+        yield dict(zip(nombres, valores[:-1])), valores[-1] or {}
+
+
+# ============================================================
+# FORMATOS
+# ============================================================
+class _Linea:
+    """Destino de csv.writer que devuelve la línea en vez de guardarla."""
+
+    def write(self, texto):
+        return texto
+
+
+def lineas_csv(qs, hoja=None):
+    columnas = columnas_planas(hoja)
+    en_cabecera = set(columnas)
+    escritor = csv.writer(_Linea())
+
+    yield escritor.writerow([nombre for nombre, _ in COLUMNAS_META] + columnas + [COLUMNA_OTROS])
+    for meta, datos in _filas(qs):
+        otros = {k: v for k, v in datos.items() if k not in en_cabecera}
+        yield escritor.writerow(
+            list(meta.values())
+            + [datos.get(c) for c in columnas]
+            + [json.dumps(otros, ensure_ascii=False) if otros else ""]
+        )
+
+
+def lineas_jsonl(qs, hoja=None):
+    estructuras = {}
+    for meta, datos in _filas(qs):
+        clave = (meta["hoja"], meta["seccion"])
+        if clave not in estructuras:
+            estructuras[clave] = _columnas_estructura(*clave)
+        objeto = dict(meta)
+        objeto.update((c, datos[c]) for c in estructuras[clave] if c in datos)
+        objeto.update(datos)
+        yield json.dumps(objeto, ensure_ascii=False, default=str) + "\n"
+
+
+LINEAS = {
+    "csv": lineas_csv,
+    "jsonl": lineas_jsonl,
+}
+
+
+# ============================================================
+# BLOQUES / GZIP
+# ============================================================
+def en_bloques(lineas, tamano=BLOQUE):
+    """
+    Agrupa líneas de texto en bloques de bytes (UTF-8) de ~tamano.
+    La primera línea (cabecera del CSV) sale sola, antes de la consulta.
+    """
+    lineas = iter(lineas)
+    primera = next(lineas, None)
+    if primera is None:
+        return
+    yield primera.encode("utf-8")
+
+    pendientes, acumulado = [], 0
+    for linea in lineas:
+        pendientes.append(linea)
+        acumulado += len(linea)
+        if acumulado >= tamano:
+            yield "".join(pendientes).encode("utf-8")
+            pendientes, acumulado = [], 0
+    if pendientes:
+        yield "".join(pendientes).encode("utf-8")
+
+
+def comprimir(bloques):
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # formato gzip
+    for bloque in bloques:
+        yield compresor.compress(bloque) + compresor.flush(zlib.Z_SYNC_FLUSH)
+    yield compresor.flush()
+
+
+def volcado(formato, periodos, hoja=None, gzip=False):
+    """Generador de bytes del volcado (formato "csv" o "jsonl")."""
+    bloques = en_bloques(LINEAS[formato](registros_exportables(periodos, hoja), hoja))
+    return comprimir(bloques) if gzip else bloques
+
+
+def nombre_archivo(formato, sufijo, hoja=None, gzip=False) -> str:
+    partes = ["rem_registros", sufijo] + ([hoja] if hoja else [])
+    return "_".join(partes) + f".{formato}" + (".gz" if gzip else "")
@@ -0,0 +1,373 @@
+# rem/ingesta.py
+"""
+Escritura de registros REM en registro_rem.
+
+Reprocesar un archivo ya no es "borrar todo y volver a insertar":
+1) Las filas nuevas se cargan con COPY en una tabla temporal (staging).
+2) En UNA transacción corta se reemplazan las filas del archivo por las
+   de staging (DELETE + INSERT ... SELECT) y se actualizan los hechos.
+
+Si el contenido de staging es idéntico al que ya está en registro_rem,
+no se escribe nada (reprocesar el mismo Excel no genera tuplas muertas).
+
+La primera carga de un archivo (sin filas previas) va directo con COPY
+a registro_rem, sin pasar por staging.
+
+En bases de datos que no son PostgreSQL (ej: SQLite local) se usa el
+camino ORM de siempre (bulk_create), igualmente dentro de una transacción.
+"""
+import csv
+import json
+from collections import Counter
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .estrella import cargar_hechos_archivo
+from .etl import procesar_archivo_con_mapeo
+from .models import ArchivoREM, RegistroREM, HechoREM
+from .progreso import ReporteProgreso, clave_archivo
+
+STAGING_TABLA = "tmp_registro_rem_staging"
+
+# Lote usado en el camino ORM (bases no PostgreSQL)
+BATCH_ORM = 1000
+
+
+def _es_postgres() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def _crear_staging(cursor):
+    # Tabla temporal de sesión; se recrea en cada carga
+    cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLA}")
+    cursor.execute(f"""
+        CREATE TEMP TABLE {STAGING_TABLA} (
+            orden   BIGSERIAL,
+            hoja    VARCHAR(10) NOT NULL,
+            seccion VARCHAR(20) NOT NULL,
+            fila    INTEGER     NOT NULL,
+            datos   JSONB       NOT NULL
+        )
+    """)
+
+
+class _FlujoCSV:
+    """
+    Objeto tipo archivo (solo read) que genera el CSV de COPY a medida que
+    psycopg2 lo va pidiendo: memoria constante aunque sean cientos de
+    miles de filas. Cada fila se serializa a JSON una sola vez.
+    """
+
+    def __init__(self, filas):
+        self._filas = iter(filas)
+        self._pendiente = ""
+        self._linea = _LineaCSV()
+
+    def read(self, size=-1):
+        partes = [self._pendiente]
+        largo = len(self._pendiente)
+
+        while size < 0 or largo < size:
+            try:
+                fila = next(self._filas)
+            except StopIteration:
+                break
+            linea = self._linea.escribir(fila)
+            partes.append(linea)
+            largo += len(linea)
+
+        texto = "".join(partes)
+        if size < 0:
+            self._pendiente = ""
+            return texto
+
+        self._pendiente = texto[size:]
+        return texto[:size]
+
+
+class _LineaCSV:
+    """Escribe una fila como línea CSV reutilizando el mismo writer."""
+
+    def __init__(self):
+        self._texto = ""
+        self._writer = csv.writer(self, lineterminator="\n")
+
+    def write(self, texto):
+        self._texto = texto
+
+    def escribir(self, fila) -> str:
+        self._writer.writerow(fila)
+        return self._texto
+
+
+def _filas_registro(registros, archivo_id=None, fecha=None):
+    """
+    Genera tuplas listas para COPY desde objetos RegistroREM (sin guardar).
+    Si se indica archivo_id/fecha se agregan (carga directa a registro_rem).
+    """
+    for reg in registros:
+        datos_json = json.dumps(reg.datos)
+        if archivo_id is None:
+            yield (reg.hoja, reg.seccion, reg.fila, datos_json)
+        else:
+            yield (archivo_id, reg.hoja, reg.seccion, reg.fila, datos_json, fecha)
+
+
+def copiar_filas(cursor, tabla: str, columnas, filas):
+    """
+    COPY tabla (columnas) FROM STDIN en formato CSV, en streaming.
+    - filas: iterable de tuplas en el mismo orden que 'columnas'.
+      None se escribe como campo vacío (NULL en CSV).
+    """
+    columnas_sql = ", ".join(columnas)
+    cursor.copy_expert(
+        f"COPY {tabla} ({columnas_sql}) FROM STDIN WITH (FORMAT csv)",
+        _FlujoCSV(filas),
+    )
+
+
+def _copiar_a_staging(cursor, registros):
+    copiar_filas(
+        cursor,
+        STAGING_TABLA,
+        ["hoja", "seccion", "fila", "datos"],
+        _filas_registro(registros),
+    )
+
+
+def insertar_registros(archivo_rem, registros):
+    """
+    Inserta RegistroREM nuevos de un archivo usando el camino más rápido:
+    - PostgreSQL → COPY directo a registro_rem (streaming).
+    - Otros motores → bulk_create por lotes.
+
+    No borra nada: se usa para cargas iniciales o dentro de un swap.
+    Debe llamarse dentro de una transacción si se quiere atomicidad.
+    """
+    if not _es_postgres():
+        RegistroREM.objects.bulk_create(registros, batch_size=BATCH_ORM)
+        return
+
+    with connection.cursor() as cursor:
+        copiar_filas(
+            cursor,
+            RegistroREM._meta.db_table,
+            ["archivo_id", "hoja", "seccion", "fila", "datos", "fecha_registro"],
+            _filas_registro(registros, archivo_rem.pk, timezone.now().isoformat()),
+        )
+
+
+def _staging_igual_a_actual(cursor, archivo_id) -> bool:
+    """
+    True si staging y registro_rem (para este archivo) tienen exactamente
+    las mismas filas (comparación como multiconjunto con EXCEPT ALL).
+    """
+    cursor.execute(f"""
+        SELECT NOT EXISTS (
+            (SELECT hoja, seccion, fila, datos FROM {STAGING_TABLA}
+             EXCEPT ALL
+             SELECT hoja, seccion, fila, datos FROM registro_rem WHERE archivo_id = %s)
+            UNION ALL
+            (SELECT hoja, seccion, fila, datos FROM registro_rem WHERE archivo_id = %s
+             EXCEPT ALL
+             SELECT hoja, seccion, fila, datos FROM {STAGING_TABLA})
+        )
+    """, [archivo_id, archivo_id])
+    return cursor.fetchone()[0]
+
+
+def _swap_desde_staging(cursor, archivo_id):
+    cursor.execute("DELETE FROM registro_rem WHERE archivo_id = %s", [archivo_id])
+    cursor.execute(f"""
+        INSERT INTO registro_rem (archivo_id, hoja, seccion, fila, datos, fecha_registro)
+        SELECT %s, hoja, seccion, fila, datos, now()
+        FROM {STAGING_TABLA}
+        ORDER BY orden
+    """, [archivo_id])
+
+
+def _bloquear_archivo(archivo_rem):
+    """
+    SELECT ... FOR UPDATE sobre el ArchivoREM (dentro de una transacción):
+    dos procesamientos simultáneos del mismo archivo se ordenan aquí, y
+    el segundo ve los registros que dejó el primero.
+    """
+    ArchivoREM.objects.select_for_update().filter(pk=archivo_rem.pk).values_list("pk").first()
+
+
+def reemplazar_registros_archivo(archivo_rem, registros) -> bool:
+    """
+    Reemplaza de forma atómica los RegistroREM de un archivo.
+
+    - registros: lista de RegistroREM (sin guardar) generada por el ETL.
+    - Marca archivo_rem.procesado = True en la misma transacción.
+
+    Retorna True si hubo cambios en registro_rem, False si el contenido
+    era idéntico y no se reescribió nada.
+    """
+    if not _es_postgres():
+        with transaction.atomic():
+            RegistroREM.objects.filter(archivo=archivo_rem).delete()
+            if registros:
+                insertar_registros(archivo_rem, registros)
+            cargar_hechos_archivo(archivo_rem, registros)
+
+            archivo_rem.procesado = True
+            archivo_rem.save(update_fields=["procesado"])
+        return True
+
+    # Primera carga: no hay nada que reemplazar → COPY directo. La
+    # comprobación va con el archivo bloqueado: si no, dos corridas
+    # simultáneas podrían ver ambas "vacío" y copiar dos veces.
+    with transaction.atomic():
+        _bloquear_archivo(archivo_rem)
+        if not RegistroREM.objects.filter(archivo=archivo_rem).exists():
+            insertar_registros(archivo_rem, registros)
+            cargar_hechos_archivo(archivo_rem, registros)
+
+            archivo_rem.procesado = True
+            archivo_rem.save(update_fields=["procesado"])
+            return True
+
+    with connection.cursor() as cursor:
+        # 1) Carga lenta (COPY) fuera de la transacción del swap
+        _crear_staging(cursor)
+        try:
+            _copiar_a_staging(cursor, registros)
+
+            # 2) Swap corto y atómico (con el archivo bloqueado, igual que arriba)
+            with transaction.atomic():
+                _bloquear_archivo(archivo_rem)
+                cambio = not _staging_igual_a_actual(cursor, archivo_rem.pk)
+                if cambio:
+                    _swap_desde_staging(cursor, archivo_rem.pk)
+
+                if cambio or not HechoREM.objects.filter(archivo=archivo_rem).exists():
+                    cargar_hechos_archivo(archivo_rem, registros)
+
+                archivo_rem.procesado = True
+                archivo_rem.save(update_fields=["procesado"])
+        finally:
+            cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLA}")
+
+    return cambio
+
+
+# ============================================================
+# REUTILIZAR RESULTADOS (mismo contenido, ver rem/contenido.py)
+# ============================================================
+def copiar_resultados_archivo(origen, destino):
+    """
+    Copia a 'destino' los RegistroREM y HechoREM ya calculados para
+    'origen' (mismo SHA-256), sin volver a leer el Excel.
+    Los hechos quedan asociados al período de 'destino'.
+    Todo en SQL (INSERT ... SELECT), en una transacción.
+    """
+    qn = connection.ops.quote_name
+    tabla_registros = qn(RegistroREM._meta.db_table)
+    tabla_hechos = qn(HechoREM._meta.db_table)
+
+    # Columnas de hecho_rem que se copian tal cual (dimensiones, fila, valor)
+    columnas_hecho = [
+        f.column for f in HechoREM._meta.concrete_fields
+        if f.name not in ("id_hecho", "archivo", "periodo")
+    ]
+    columnas_sql = ", ".join(qn(c) for c in columnas_hecho)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        RegistroREM.objects.filter(archivo=destino).delete()
+        HechoREM.objects.filter(archivo=destino).delete()
+
+        cursor.execute(f"""
+            INSERT INTO {tabla_registros} (archivo_id, hoja, seccion, fila, datos, fecha_registro)
+            SELECT %s, hoja, seccion, fila, datos, %s
+            FROM {tabla_registros}
+            WHERE archivo_id = %s
+            ORDER BY id_registro
+        """, [destino.pk, timezone.now(), origen.pk])
+
+        cursor.execute(f"""
+            INSERT INTO {tabla_hechos} (archivo_id, periodo_id, {columnas_sql})
+            SELECT %s, %s, {columnas_sql}
+            FROM {tabla_hechos}
+            WHERE archivo_id = %s
+        """, [destino.pk, destino.periodo_id, origen.pk])
+
+        destino.procesado = True
+        destino.resumen_proceso = origen.resumen_proceso
+        destino.fecha_proceso = timezone.now()
+        destino.save(update_fields=["procesado", "resumen_proceso", "fecha_proceso"])
+
+
+# ============================================================
+# PROCESAMIENTO COMPLETO DE UN ARCHIVO (vista inline o worker)
+# ============================================================
+def procesar_archivo_rem(archivo_rem) -> dict:
+    """
+    Procesa un ArchivoREM completo:
+    1) Lee Excel con procesar_archivo_con_mapeo(ruta) -> lista de dicts
+    2) Convierte cada dict en un RegistroREM (sin guardar)
+    3) Reemplaza los registros previos de forma atómica
+       (ver reemplazar_registros_archivo)
+    4) Escribe el resumen en ArchivoREM (resumen_proceso / fecha_proceso)
+
+    El avance se publica en ProgresoREM con clave "archivo-<id>"
+    (lo consultan los endpoints de progreso JSON / SSE).
+
+    Retorna el resumen:
+      {"total_registros": N, "detalle": [{"hoja", "seccion", "cantidad"}, ...]}
+
+    Las excepciones se propagan: quien llama decide cómo informarlas.
+    """
+    progreso = ReporteProgreso(clave_archivo(archivo_rem.pk), archivo=archivo_rem)
+    try:
+        resumen = _procesar_archivo_rem(archivo_rem, progreso)
+    except Exception as e:
+        progreso.fallar(str(e))
+        raise
+
+    progreso.terminar(filas_escritas=resumen["total_registros"])
+    return resumen
+
+
+def _procesar_archivo_rem(archivo_rem, progreso) -> dict:
+    registros_dict = procesar_archivo_con_mapeo(archivo_rem.archivo.path, progreso=progreso)
+
+    objetos = []
+    resumen_hoja_seccion = Counter()
+
+    for reg in registros_dict:
+        # Claves de control (no van dentro de "datos")
+        hoja = reg.pop("hoja", "")
+        seccion = reg.pop("seccion", "")
+        fila = reg.pop("fila", 0)
+
+        objetos.append(
+            RegistroREM(
+                archivo=archivo_rem,
+                hoja=hoja,
+                seccion=seccion,
+                fila=fila,
+                datos=reg,
+            )
+        )
+
+        resumen_hoja_seccion[(hoja, seccion)] += 1
+
+    progreso.etapa("guardado")
+    reemplazar_registros_archivo(archivo_rem, objetos)
+
+    resumen = {
+        "total_registros": len(objetos),
+        "detalle": [
+            {"hoja": hoja, "seccion": seccion, "cantidad": cantidad}
+            for (hoja, seccion), cantidad in sorted(resumen_hoja_seccion.items())
+        ],
+    }
+
+    archivo_rem.resumen_proceso = resumen
+    archivo_rem.fecha_proceso = timezone.now()
+    archivo_rem.save(update_fields=["resumen_proceso", "fecha_proceso"])
+
+    return resumen
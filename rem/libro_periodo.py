@@ -0,0 +1,150 @@
+# rem/libro_periodo.py
+"""
+Libro Excel completo de un período: una hoja por REM (A01, A02, ...) y,
+dentro de cada una, todas sus secciones una bajo otra con su título.
+El mismo contenido en PDF: una sección tras otra, cada una desde una
+página nueva (formato "libro_pdf").
+
+Se genera en segundo plano (TareaREM tipo LIBRO_PERIODO / PDF_PERIODO,
+`rem_worker`) con los exportadores de rem/exportar.py (write-only) y
+rem/exportar_pdf.py (por páginas) y queda en disco como
+artefacto de la caché de exportaciones (rem/exportaciones.py),
+identificado por la versión de datos del período. Mientras el período
+no cambie, cada descarga se sirve directo desde ese archivo; al
+cambiar, se borra y la versión nueva genera otro libro.
+"""
+from .columnas import alcance_periodo, columnas_seccion
+from .exportaciones import buscar, guardar
+from .exportar import LibroExcel
+from .exportar_pdf import documento_pdf
+from .models import RegistroREM
+from .rem_structures import REM_STRUCTURES
+from .reportes import filas_proyectadas
+from .versiones import version_periodo
+
+
+def libro_disponible(periodo_id, formato="libro"):
+    """Ruta del libro de la versión actual del período, o None si aún no existe."""
+    return buscar(formato, periodo_id)
+
+
+def _registros(periodo, hoja=None, seccion=None):
+    qs = RegistroREM.objects.filter(archivo__periodo=periodo, archivo__activo=True)
+    if hoja:
+        qs = qs.filter(hoja=hoja, seccion=seccion)
+    return qs
+
+
+def secciones_con_datos(periodo) -> dict:
+    """
+    {hoja: [secciones]} con registros en archivos activos del período.
+    Secciones en el orden de REM_STRUCTURES; las no definidas, al final.
+    """
+    pares = set(_registros(periodo).values_list("hoja", "seccion").distinct().order_by())
+
+    def orden(par):
+        hoja, seccion = par
+        definidas = list(REM_STRUCTURES.get(hoja) or {})
+        posicion = definidas.index(seccion) if seccion in definidas else len(definidas)
+        return hoja, posicion, seccion
+
+    por_hoja = {}
+    for hoja, seccion in sorted(pares, key=orden):
+        por_hoja.setdefault(hoja, []).append(seccion)
+    return por_hoja
+
+
+def _estructuras(periodo):
+    """
+    (hoja, [(seccion, qs, columnas, num_desc_cols), ...]) por cada hoja
+    con secciones que tengan columnas.
+    """
+    alcance = alcance_periodo(periodo.pk, solo_activos=True)
+    for hoja, secciones in secciones_con_datos(periodo).items():
+        estructuras = []
+        for seccion in secciones:
+            qs = _registros(periodo, hoja, seccion)
+            columnas, num_desc_cols, _usa_estructura_fija = columnas_seccion(qs, alcance, hoja, seccion)
+            if columnas:
+                estructuras.append((seccion, qs, columnas, num_desc_cols))
+        if estructuras:
+            yield hoja, estructuras
+
+
+def _escribir_libro(periodo, destino) -> dict:
+    libro = LibroExcel()
+    resumen = {"hojas": 0, "secciones": 0, "filas": 0}
+
+    for hoja, estructuras in _estructuras(periodo):
+        # Los anchos van antes de la primera fila: se toman de la sección más ancha
+        hoja_excel = libro.hoja(
+            hoja,
+            num_desc_cols=max(e[3] for e in estructuras),
+            num_columnas=max(len(e[2]) for e in estructuras),
+        )
+        for seccion, qs, columnas, num_desc_cols in estructuras:
+            if hoja_excel.fila:
+                hoja_excel.en_blanco()
+            hoja_excel.titulo(f"REM {hoja} – SECCIÓN {seccion}")
+            resumen["filas"] += hoja_excel.seccion(
+                columnas, num_desc_cols, filas_proyectadas(qs, columnas, orden=("id_registro",))
+            )
+            resumen["secciones"] += 1
+        resumen["hojas"] += 1
+
+    if not resumen["hojas"]:
+        libro.hoja("Sin datos").titulo("El período no tiene registros en archivos activos.")
+
+    libro.guardar(destino)
+    return resumen
+
+
+def _escribir_pdf(periodo, destino) -> dict:
+    documento, _archivo = documento_pdf(destino)
+    resumen = {"hojas": 0, "secciones": 0, "filas": 0}
+
+    for hoja, estructuras in _estructuras(periodo):
+        for seccion, qs, columnas, num_desc_cols in estructuras:
+            resumen["filas"] += documento.seccion(
+                f"REM {hoja} – SECCIÓN {seccion} – {periodo.mes:02d}/{periodo.anio}",
+                columnas,
+                num_desc_cols,
+                filas_proyectadas(qs, columnas, orden=("id_registro",)),
+            )
+            resumen["secciones"] += 1
+        resumen["hojas"] += 1
+
+    if not resumen["hojas"]:
+        documento.nota("El período no tiene registros en archivos activos.")
+
+    documento.guardar()
+    resumen["paginas"] = documento.paginas
+    return resumen
+
+
+# formato de la caché de exportaciones → función que escribe el libro
+ESCRITORES = {
+    "libro": _escribir_libro,
+    "libro_pdf": _escribir_pdf,
+}
+
+
+def generar_libro_periodo(periodo, formato="libro") -> dict:
+    """
+    Genera (si no existe) el libro de la versión actual del período, en
+    Excel ("libro") o PDF ("libro_pdf").
+
+    Retorna {"archivo", "version", "hojas", "secciones", "filas"}.
+    """
+    version, _ = version_periodo(periodo.pk)
+    existente = buscar(formato, periodo.pk, version=version)
+    if existente:
+        return {"archivo": existente.name, "version": version, "reutilizado": True}
+
+    resumen = {}
+
+    def escribir(archivo):
+        resumen.update(ESCRITORES[formato](periodo, archivo))
+
+    destino = guardar(formato, periodo.pk, "", "", version, escribir)
+    return {"archivo": destino.name, "version": version, **resumen}
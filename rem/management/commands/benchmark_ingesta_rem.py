@@ -0,0 +1,82 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from rem.ingesta import insertar_registros
+from rem.models import ArchivoREM, RegistroREM
+from rem.rem_structures import REM_STRUCTURES
+
+
+class _Rollback(Exception):
+    """Se usa para deshacer la carga de prueba al terminar cada medición."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara filas/s al insertar RegistroREM con bulk_create (ORM) "
+        "versus COPY (PostgreSQL). No deja datos: cada medición hace rollback."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, default=50000, help="Filas sintéticas por medición")
+        parser.add_argument("--repeticiones", type=int, default=3)
+
+    def _registros_sinteticos(self, archivo, n):
+        # Forma real de REM A01 / Sección A (34 columnas)
+        columnas = REM_STRUCTURES.get("A01", {}).get("A", {}).get("columnas") or ["total"]
+        registros = []
+        for i in range(n):
+            datos = {col: (i % 17) for col in columnas}
+            datos["tipo_de_control"] = "Prenatal"
+            datos["profesional"] = "Matrona/ón"
+            registros.append(
+                RegistroREM(archivo=archivo, hoja="A01", seccion="A", fila=i + 1, datos=datos)
+            )
+        return registros
+
+    def _medir(self, n, insertar):
+        try:
+            with transaction.atomic():
+                archivo = ArchivoREM.objects.create(
+                    nombre_original="BENCHMARK INGESTA",
+                    archivo="rem_uploads/benchmark.xlsx",
+                )
+                registros = self._registros_sinteticos(archivo, n)
+
+                inicio = time.perf_counter()
+                insertar(archivo, registros)
+                segundos = time.perf_counter() - inicio
+
+                raise _Rollback()
+        except _Rollback:
+            pass
+        return segundos
+
+    def handle(self, *args, **options):
+        n = options["filas"]
+        repeticiones = options["repeticiones"]
+
+        if connection.vendor != "postgresql":
+            self.stdout.write(self.style.WARNING(
+                f"Motor '{connection.vendor}': COPY no está disponible, "
+                "ambas mediciones usan bulk_create."
+            ))
+
+        caminos = [
+            ("bulk_create", lambda a, regs: RegistroREM.objects.bulk_create(regs, batch_size=1000)),
+            ("COPY", insertar_registros),
+        ]
+
+        resultados = {}
+        for nombre, insertar in caminos:
+            tiempos = [self._medir(n, insertar) for _ in range(repeticiones)]
+            mejor = min(tiempos)
+            resultados[nombre] = n / mejor if mejor else 0
+            self.stdout.write(
+                f"  {nombre:<12} mejor {mejor:.3f}s  →  {resultados[nombre]:,.0f} filas/s"
+            )
+
+        if resultados.get("bulk_create"):
+            factor = resultados["COPY"] / resultados["bulk_create"]
+            self.stdout.write(self.style.SUCCESS(f"✔️ COPY es {factor:.1f}x respecto de bulk_create"))
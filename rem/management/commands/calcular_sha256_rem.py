@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from rem.contenido import calcular_sha256
+from rem.models import ArchivoREM
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula ArchivoREM.sha256 para archivos subidos antes de existir el "
+        "campo, para que la detección de contenido duplicado los considere"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--todos",
+            action="store_true",
+            help="Recalcula también los que ya tienen hash.",
+        )
+
+    def handle(self, *args, **options):
+        archivos = ArchivoREM.objects.exclude(archivo="").order_by("id_archivo")
+        if not options["todos"]:
+            archivos = archivos.filter(sha256="")
+
+        calculados = 0
+        for archivo in archivos:
+            try:
+                with archivo.archivo.open("rb") as f:
+                    archivo.sha256 = calcular_sha256(f)
+            except (FileNotFoundError, OSError):
+                self.stdout.write(self.style.WARNING(
+                    f"  {archivo.nombre_original}: archivo no encontrado, se omite"
+                ))
+                continue
+
+            archivo.save(update_fields=["sha256"])
+            calculados += 1
+            self.stdout.write(f"  {archivo.nombre_original}: {archivo.sha256}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✔️ Hashes calculados: {calculados}")
+        )
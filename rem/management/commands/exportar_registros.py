@@ -0,0 +1,68 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from rem.exportar_registros import FORMATOS, volcado
+from rem.models import DimPeriodo
+
+
+def _anio_mes(texto):
+    try:
+        anio, mes = texto.split("-")
+        return int(anio), int(mes)
+    except ValueError:
+        raise CommandError(f"Período inválido: '{texto}' (se espera AAAA-MM)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Vuelca los RegistroREM de uno o varios períodos (archivos activos) "
+        "en CSV o JSON Lines, en streaming (ver rem/exportar_registros.py)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--formato", choices=sorted(FORMATOS), default="csv")
+        parser.add_argument(
+            "--periodo",
+            type=int,
+            action="append",
+            help="ID de DimPeriodo (se puede repetir).",
+        )
+        parser.add_argument("--desde", help="Primer período, AAAA-MM.")
+        parser.add_argument("--hasta", help="Último período, AAAA-MM.")
+        parser.add_argument("--hoja", help="Solo una hoja (ej: A01).")
+        parser.add_argument("--gzip", action="store_true", help="Comprimir la salida (gzip).")
+        parser.add_argument(
+            "--salida",
+            help="Archivo de salida. Por defecto: salida estándar.",
+        )
+
+    def handle(self, *args, **options):
+        periodos = DimPeriodo.objects.order_by("anio", "mes")
+        if options.get("periodo"):
+            periodos = periodos.filter(id_periodo__in=options["periodo"])
+        if options.get("desde"):
+            anio, mes = _anio_mes(options["desde"])
+            periodos = periodos.filter(Q(anio__gt=anio) | Q(anio=anio, mes__gte=mes))
+        if options.get("hasta"):
+            anio, mes = _anio_mes(options["hasta"])
+            periodos = periodos.filter(Q(anio__lt=anio) | Q(anio=anio, mes__lte=mes))
+
+        ids = list(periodos.values_list("id_periodo", flat=True))
+        if not ids:
+            raise CommandError("Ningún período coincide con los filtros.")
+
+        hoja = (options.get("hoja") or "").strip().upper() or None
+        bloques = volcado(options["formato"], ids, hoja, gzip=options["gzip"])
+
+        if options.get("salida"):
+            with open(options["salida"], "wb") as salida:
+                total = sum(salida.write(bloque) for bloque in bloques)
+            self.stderr.write(
+                self.style.SUCCESS(f"✔️ {len(ids)} período(s) → {options['salida']} ({total} bytes)")
+            )
+        else:
+            for bloque in bloques:
+                sys.stdout.buffer.write(bloque)
+            sys.stdout.buffer.flush()
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from rem.estrella import cargar_hechos_archivo
+from rem.models import ArchivoREM
+
+
+class Command(BaseCommand):
+    help = (
+        "Puebla cesfam_core.hecho_rem (esquema estrella) desde registro_rem "
+        "para archivos ya procesados antes de existir la tabla de hechos"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--archivo",
+            type=int,
+            action="append",
+            help="ID de ArchivoREM a poblar (se puede repetir). Por defecto: todos los procesados.",
+        )
+
+    def handle(self, *args, **options):
+        archivos = ArchivoREM.objects.filter(procesado=True).order_by("id_archivo")
+        if options.get("archivo"):
+            archivos = archivos.filter(id_archivo__in=options["archivo"])
+
+        total_hechos = 0
+        for archivo in archivos:
+            registros = archivo.registros.order_by("id_registro").iterator(chunk_size=2000)
+
+            with transaction.atomic():
+                cantidad = cargar_hechos_archivo(archivo, registros)
+
+            total_hechos += cantidad
+            self.stdout.write(f"  {archivo.nombre_original}: {cantidad} hechos")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✔️ Hechos cargados: {total_hechos}")
+        )
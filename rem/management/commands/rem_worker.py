@@ -0,0 +1,67 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from rem.cola import (
+    ejecutar_tarea,
+    nombre_worker,
+    recuperar_tareas_vencidas,
+    tomar_siguiente_tarea,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker de la cola de procesamiento REM (tabla tarea_rem). "
+        "Se pueden lanzar varios en paralelo: cada tarea se reclama con "
+        "SELECT ... FOR UPDATE SKIP LOCKED."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--intervalo", type=float, default=2.0,
+                            help="Segundos de espera cuando no hay tareas")
+        parser.add_argument("--una-vez", action="store_true",
+                            help="Procesa las tareas disponibles y termina")
+        parser.add_argument("--nombre", default="",
+                            help="Identificador del worker (por defecto host:pid)")
+
+    def handle(self, *args, **options):
+        worker = options["nombre"] or nombre_worker()
+        self._detener = False
+
+        def _salir(signum, frame):
+            self.stdout.write("Deteniendo worker al terminar la tarea actual...")
+            self._detener = True
+
+        signal.signal(signal.SIGINT, _salir)
+        signal.signal(signal.SIGTERM, _salir)
+
+        self.stdout.write(self.style.SUCCESS(f"✔️ Worker {worker} iniciado"))
+
+        while not self._detener:
+            close_old_connections()
+
+            recuperadas = recuperar_tareas_vencidas()
+            if recuperadas:
+                self.stdout.write(f"  {recuperadas} tarea(s) vencida(s) devueltas a la cola")
+
+            tarea = tomar_siguiente_tarea(worker)
+            if tarea is None:
+                if options["una_vez"]:
+                    break
+                time.sleep(options["intervalo"])
+                continue
+
+            self.stdout.write(f"→ Tarea {tarea.id_tarea} ({tarea.tipo}, intento {tarea.intentos})")
+            inicio = time.monotonic()
+            ok = ejecutar_tarea(tarea)
+            segundos = time.monotonic() - inicio
+
+            if ok:
+                self.stdout.write(self.style.SUCCESS(f"  completada en {segundos:.1f}s"))
+            else:
+                self.stdout.write(self.style.ERROR(f"  {tarea.estado}: {tarea.error.splitlines()[0] if tarea.error else ''}"))
+
+        self.stdout.write(f"Worker {worker} detenido")
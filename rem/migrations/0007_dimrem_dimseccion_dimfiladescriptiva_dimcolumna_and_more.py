@@ -0,0 +1,92 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def crear_esquema_core(apps, schema_editor):
+    # dim_periodo ya vive en cesfam_core, pero en una BD nueva el esquema
+    # podría no existir todavía.
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("CREATE SCHEMA IF NOT EXISTS cesfam_core")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rem', '0006_backuplog'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_esquema_core, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='DimRem',
+            fields=[
+                ('id_rem', models.AutoField(primary_key=True, serialize=False)),
+                ('codigo', models.CharField(max_length=10, unique=True)),
+                ('nombre', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'cesfam_core"."dim_rem',
+            },
+        ),
+        migrations.CreateModel(
+            name='DimSeccion',
+            fields=[
+                ('id_seccion', models.AutoField(primary_key=True, serialize=False)),
+                ('codigo', models.CharField(max_length=20)),
+                ('titulo', models.TextField(blank=True, null=True)),
+                ('rem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='secciones', to='rem.dimrem')),
+            ],
+            options={
+                'db_table': 'cesfam_core"."dim_seccion',
+                'unique_together': {('rem', 'codigo')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DimFilaDescriptiva',
+            fields=[
+                ('id_fila_descriptiva', models.BigAutoField(primary_key=True, serialize=False)),
+                ('clave', models.CharField(max_length=40)),
+                ('etiqueta', models.TextField(blank=True, default='')),
+                ('valores', models.JSONField(default=dict)),
+                ('seccion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='filas_descriptivas', to='rem.dimseccion')),
+            ],
+            options={
+                'db_table': 'cesfam_core"."dim_fila_descriptiva',
+                'unique_together': {('seccion', 'clave')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DimColumna',
+            fields=[
+                ('id_columna', models.AutoField(primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=150)),
+                ('orden', models.IntegerField(default=0)),
+                ('grupo', models.CharField(blank=True, default='', max_length=50)),
+                ('seccion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='columnas', to='rem.dimseccion')),
+            ],
+            options={
+                'db_table': 'cesfam_core"."dim_columna',
+                'unique_together': {('seccion', 'nombre')},
+            },
+        ),
+        migrations.CreateModel(
+            name='HechoREM',
+            fields=[
+                ('id_hecho', models.BigAutoField(primary_key=True, serialize=False)),
+                ('fila', models.IntegerField(default=0)),
+                ('valor', models.DecimalField(decimal_places=4, max_digits=20)),
+                ('archivo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hechos', to='rem.archivorem')),
+                ('columna', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='rem.dimcolumna')),
+                ('fila_descriptiva', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='rem.dimfiladescriptiva')),
+                ('periodo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='hechos', to='rem.dimperiodo')),
+                ('rem', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='rem.dimrem')),
+                ('seccion', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='rem.dimseccion')),
+            ],
+            options={
+                'db_table': 'cesfam_core"."hecho_rem',
+                'indexes': [models.Index(fields=['periodo', 'seccion', 'columna'], name='hecho_rem_per_sec_col_idx'), models.Index(fields=['seccion', 'columna', 'periodo'], name='hecho_rem_sec_col_per_idx'), models.Index(fields=['archivo', 'seccion', 'fila'], name='hecho_rem_arch_sec_fila_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:34
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rem', '0007_dimrem_dimseccion_dimfiladescriptiva_dimcolumna_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivorem',
+            name='fecha_proceso',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivorem',
+            name='resumen_proceso',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='TareaREM',
+            fields=[
+                ('id_tarea', models.BigAutoField(primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('PROCESAR_ARCHIVO', 'Procesar archivo REM')], default='PROCESAR_ARCHIVO', max_length=30)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En proceso'), ('COMPLETADA', 'Completada'), ('FALLIDA', 'Fallida')], default='PENDIENTE', max_length=20)),
+                ('intentos', models.IntegerField(default=0)),
+                ('max_intentos', models.IntegerField(default=3)),
+                ('timeout_segundos', models.IntegerField(default=900)),
+                ('disponible_desde', models.DateTimeField(default=django.utils.timezone.now)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('iniciado_en', models.DateTimeField(blank=True, null=True)),
+                ('finalizado_en', models.DateTimeField(blank=True, null=True)),
+                ('worker', models.CharField(blank=True, default='', max_length=100)),
+                ('error', models.TextField(blank=True, default='')),
+                ('resultado', models.JSONField(blank=True, null=True)),
+                ('archivo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tareas', to='rem.archivorem')),
+                ('solicitado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'tarea_rem',
+                'ordering': ['-creado_en'],
+                'indexes': [models.Index(fields=['estado', 'disponible_desde'], name='tarea_rem_estado_disp_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:36
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rem', '0008_archivorem_fecha_proceso_archivorem_resumen_proceso_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgresoREM',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=150, unique=True)),
+                ('estado', models.CharField(choices=[('EN_CURSO', 'En curso'), ('TERMINADO', 'Terminado'), ('ERROR', 'Error')], default='EN_CURSO', max_length=20)),
+                ('etapa', models.CharField(blank=True, default='', max_length=50)),
+                ('hoja_actual', models.CharField(blank=True, default='', max_length=20)),
+                ('secciones_hechas', models.IntegerField(default=0)),
+                ('secciones_total', models.IntegerField(default=0)),
+                ('filas_escritas', models.IntegerField(default=0)),
+                ('mensaje', models.TextField(blank=True, default='')),
+                ('iniciado_en', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+                ('archivo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='progresos', to='rem.archivorem')),
+            ],
+            options={
+                'db_table': 'progreso_rem',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rem', '0009_progresorem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivorem',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+    ]
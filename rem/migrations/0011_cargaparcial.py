@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:44
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rem', '0010_archivorem_sha256'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CargaParcial',
+            fields=[
+                ('id_carga', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('nombre_original', models.CharField(max_length=255)),
+                ('tamano_total', models.BigIntegerField()),
+                ('recibido', models.BigIntegerField(default=0)),
+                ('encolar', models.BooleanField(default=False)),
+                ('estado', models.CharField(choices=[('EN_CURSO', 'En curso'), ('COMPLETADA', 'Completada'), ('CANCELADA', 'Cancelada')], default='EN_CURSO', max_length=20)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+                ('archivo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='rem.archivorem')),
+                ('periodo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='rem.dimperiodo')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cargas_parciales', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'carga_parcial',
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:51
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rem', '0011_cargaparcial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionDatosPeriodo',
+            fields=[
+                ('periodo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='version_datos', serialize=False, to='rem.dimperiodo')),
+                ('version', models.BigIntegerField(default=0)),
+                ('actualizado_en', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'version_datos_periodo',
+            },
+        ),
+    ]
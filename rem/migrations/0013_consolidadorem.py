@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rem', '0012_versiondatosperiodo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsolidadoREM',
+            fields=[
+                ('id_consolidado', models.BigAutoField(primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=150)),
+                ('hoja', models.CharField(max_length=10)),
+                ('seccion', models.CharField(max_length=20)),
+                ('filas', models.JSONField(default=list)),
+                ('versiones', models.JSONField(default=dict)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('actualizado_en', models.DateTimeField(blank=True, null=True)),
+                ('creado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('periodos', models.ManyToManyField(db_table='consolidado_rem_periodo', related_name='consolidados', to='rem.dimperiodo')),
+            ],
+            options={
+                'db_table': 'consolidado_rem',
+                'ordering': ['-creado_en'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AporteConsolidadoREM',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+                ('filas', models.JSONField(default=list)),
+                ('calculado_en', models.DateTimeField(default=django.utils.timezone.now)),
+                ('periodo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='rem.dimperiodo')),
+                ('consolidado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aportes', to='rem.consolidadorem')),
+            ],
+            options={
+                'db_table': 'aporte_consolidado_rem',
+                'unique_together': {('consolidado', 'periodo')},
+            },
+        ),
+    ]
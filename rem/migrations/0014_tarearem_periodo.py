@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rem', '0013_consolidadorem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tarearem',
+            name='periodo',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tareas', to='rem.dimperiodo'),
+        ),
+        migrations.AlterField(
+            model_name='tarearem',
+            name='tipo',
+            field=models.CharField(choices=[('PROCESAR_ARCHIVO', 'Procesar archivo REM'), ('LIBRO_PERIODO', 'Generar libro Excel del período')], default='PROCESAR_ARCHIVO', max_length=30),
+        ),
+    ]
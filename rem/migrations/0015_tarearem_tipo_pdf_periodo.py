@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rem', '0014_tarearem_periodo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tarearem',
+            name='tipo',
+            field=models.CharField(choices=[('PROCESAR_ARCHIVO', 'Procesar archivo REM'), ('LIBRO_PERIODO', 'Generar libro Excel del período'), ('PDF_PERIODO', 'Generar PDF completo del período')], default='PROCESAR_ARCHIVO', max_length=30),
+        ),
+    ]
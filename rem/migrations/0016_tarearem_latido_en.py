@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rem', '0015_tarearem_tipo_pdf_periodo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tarearem',
+            name='latido_en',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,5 +1,8 @@
+import uuid
+
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 # ===============================================================
@@ -44,6 +47,9 @@ class ArchivoREM(models.Model):
         related_name="archivos"
     )
 
+    # SHA-256 del contenido (mismo Excel con otro nombre / otro período)
+    sha256 = models.CharField(max_length=64, blank=True, default="", db_index=True)
+
     # fecha en que se subió el archivo
     fecha_carga = models.DateTimeField(auto_now_add=True)
 
@@ -53,6 +59,10 @@ class ArchivoREM(models.Model):
     # 👉 nuevo: para “eliminar” sin borrar físicamente
     activo = models.BooleanField(default=True)
 
+    # resultado del último procesamiento (lo escribe el worker de la cola)
+    fecha_proceso = models.DateTimeField(null=True, blank=True)
+    resumen_proceso = models.JSONField(null=True, blank=True)
+
     class Meta:
         db_table = 'archivo_rem'
 
@@ -124,6 +134,208 @@ class AuditLog(models.Model):
         u = self.usuario.username if self.usuario else "Anon"
         return f"[{self.fecha_hora}] {u} - {self.accion}"
 
+# ===============================================================
+# COLA DE TAREAS EN BD (procesamiento REM en segundo plano)
+# ===============================================================
+# La vista solo encola; el comando `manage.py rem_worker` toma tareas con
+# SELECT ... FOR UPDATE SKIP LOCKED, por lo que pueden correr varios
+# workers en paralelo (procesos o nodos distintos).
+class TareaREM(models.Model):
+    TIPO_PROCESAR_ARCHIVO = "PROCESAR_ARCHIVO"
+    TIPO_LIBRO_PERIODO = "LIBRO_PERIODO"
+    TIPO_PDF_PERIODO = "PDF_PERIODO"
+
+    TIPOS_CHOICES = [
+        (TIPO_PROCESAR_ARCHIVO, "Procesar archivo REM"),
+        (TIPO_LIBRO_PERIODO, "Generar libro Excel del período"),
+        (TIPO_PDF_PERIODO, "Generar PDF completo del período"),
+    ]
+
+    ESTADO_PENDIENTE = "PENDIENTE"
+    ESTADO_EN_PROCESO = "EN_PROCESO"
+    ESTADO_COMPLETADA = "COMPLETADA"
+    ESTADO_FALLIDA = "FALLIDA"
+
+    ESTADOS_CHOICES = [
+        (ESTADO_PENDIENTE, "Pendiente"),
+        (ESTADO_EN_PROCESO, "En proceso"),
+        (ESTADO_COMPLETADA, "Completada"),
+        (ESTADO_FALLIDA, "Fallida"),
+    ]
+
+    id_tarea = models.BigAutoField(primary_key=True)
+    tipo = models.CharField(max_length=30, choices=TIPOS_CHOICES, default=TIPO_PROCESAR_ARCHIVO)
+    archivo = models.ForeignKey(
+        ArchivoREM,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="tareas"
+    )
+    # Tareas sobre un período completo (ej: libro Excel con todas las hojas)
+    periodo = models.ForeignKey(
+        DimPeriodo,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="tareas"
+    )
+    estado = models.CharField(max_length=20, choices=ESTADOS_CHOICES, default=ESTADO_PENDIENTE)
+
+    # reintentos / timeout
+    intentos = models.IntegerField(default=0)
+    max_intentos = models.IntegerField(default=3)
+    timeout_segundos = models.IntegerField(default=900)
+    disponible_desde = models.DateTimeField(default=timezone.now)   # backoff entre reintentos
+
+    creado_en = models.DateTimeField(auto_now_add=True)
+    iniciado_en = models.DateTimeField(null=True, blank=True)
+    finalizado_en = models.DateTimeField(null=True, blank=True)
+
+    worker = models.CharField(max_length=100, blank=True, default="")
+    # El worker lo actualiza mientras ejecuta (rem/cola.py): solo se
+    # recupera una tarea vencida si además dejó de latir
+    latido_en = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    resultado = models.JSONField(null=True, blank=True)
+
+    solicitado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+
+    class Meta:
+        db_table = "tarea_rem"
+        ordering = ["-creado_en"]
+        indexes = [
+            models.Index(fields=["estado", "disponible_desde"], name="tarea_rem_estado_disp_idx"),
+        ]
+
+    @property
+    def terminada(self):
+        return self.estado in (self.ESTADO_COMPLETADA, self.ESTADO_FALLIDA)
+
+    def __str__(self):
+        return f"Tarea {self.id_tarea} {self.tipo} [{self.estado}]"
+
+
+# ===============================================================
+# PROGRESO EN VIVO DE UNA INGESTA (web o CLI)
+# ===============================================================
+# Una fila por proceso en curso, identificada por "clave":
+#   archivo-<id_archivo>  → procesamiento desde la web / worker
+#   cli-<nombre_archivo>  → rem/etl_guardar_raw.py
+class ProgresoREM(models.Model):
+    ESTADO_EN_CURSO = "EN_CURSO"
+    ESTADO_TERMINADO = "TERMINADO"
+    ESTADO_ERROR = "ERROR"
+
+    ESTADOS_CHOICES = [
+        (ESTADO_EN_CURSO, "En curso"),
+        (ESTADO_TERMINADO, "Terminado"),
+        (ESTADO_ERROR, "Error"),
+    ]
+
+    clave = models.CharField(max_length=150, unique=True)
+    archivo = models.ForeignKey(
+        ArchivoREM,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="progresos"
+    )
+    estado = models.CharField(max_length=20, choices=ESTADOS_CHOICES, default=ESTADO_EN_CURSO)
+    etapa = models.CharField(max_length=50, blank=True, default="")
+    hoja_actual = models.CharField(max_length=20, blank=True, default="")
+    secciones_hechas = models.IntegerField(default=0)
+    secciones_total = models.IntegerField(default=0)
+    filas_escritas = models.IntegerField(default=0)
+    mensaje = models.TextField(blank=True, default="")
+
+    iniciado_en = models.DateTimeField(default=timezone.now)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "progreso_rem"
+
+    def __str__(self):
+        return f"{self.clave} {self.secciones_hechas}/{self.secciones_total} [{self.estado}]"
+
+
+# ===============================================================
+# CARGA POR PARTES (archivos REM grandes, reanudable)
+# ===============================================================
+# El navegador inicia la carga, envía bloques con PUT indicando el offset
+# y al final la finaliza: el archivo armado pasa por la misma validación
+# y creación de ArchivoREM que subir_excel (ver rem/cargas_parciales.py).
+class CargaParcial(models.Model):
+    ESTADO_EN_CURSO = "EN_CURSO"
+    ESTADO_COMPLETADA = "COMPLETADA"
+    ESTADO_CANCELADA = "CANCELADA"
+
+    ESTADOS_CHOICES = [
+        (ESTADO_EN_CURSO, "En curso"),
+        (ESTADO_COMPLETADA, "Completada"),
+        (ESTADO_CANCELADA, "Cancelada"),
+    ]
+
+    id_carga = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="cargas_parciales"
+    )
+    periodo = models.ForeignKey(DimPeriodo, on_delete=models.CASCADE, related_name="+")
+    nombre_original = models.CharField(max_length=255)
+    tamano_total = models.BigIntegerField()
+    recibido = models.BigIntegerField(default=0)
+    encolar = models.BooleanField(default=False)
+    estado = models.CharField(max_length=20, choices=ESTADOS_CHOICES, default=ESTADO_EN_CURSO)
+
+    # ArchivoREM creado al finalizar (si el archivo resultó válido)
+    archivo = models.ForeignKey(
+        ArchivoREM,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+"
+    )
+
+    creado_en = models.DateTimeField(auto_now_add=True)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "carga_parcial"
+
+    def __str__(self):
+        return f"{self.nombre_original} {self.recibido}/{self.tamano_total} [{self.estado}]"
+
+
+# ===============================================================
+# VERSIÓN DE LOS DATOS DE UN PERÍODO (ETag / Last-Modified)
+# ===============================================================
+# Sube cada vez que cambian los ArchivoREM o RegistroREM del período
+# (ver rem/versiones.py). Las vistas de reportes y detalle responden
+# 304 comparando contra esta fila, sin consultar registro_rem.
+class VersionDatosPeriodo(models.Model):
+    periodo = models.OneToOneField(
+        DimPeriodo,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="version_datos"
+    )
+    version = models.BigIntegerField(default=0)
+    actualizado_en = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "version_datos_periodo"
+
+    def __str__(self):
+        return f"{self.periodo} v{self.version}"
+
+
 class BackupLog(models.Model):
     fecha = models.DateTimeField(auto_now_add=True)
     archivo = models.CharField(max_length=255)
@@ -135,4 +347,182 @@ class BackupLog(models.Model):
     )
 
     def __str__(self):
-        return f"{self.archivo} - {self.fecha}"
\ No newline at end of file
+        return f"{self.archivo} - {self.fecha}"
+
+# ===============================================================
+# ESQUEMA ESTRELLA (cesfam_core) → HECHOS EN FORMATO LARGO
+# ===============================================================
+# DimPeriodo ya vive en cesfam_core; aquí se agregan las dimensiones
+# REM / Sección / Columna / Fila descriptiva y una tabla de hechos con
+# UNA fila por (archivo, hoja, sección, fila, columna numérica).
+# Se llena desde el ETL al procesar un archivo (ver rem/estrella.py).
+class DimRem(models.Model):
+    id_rem = models.AutoField(primary_key=True)
+    codigo = models.CharField(max_length=10, unique=True)   # A01, A02, A11A...
+    nombre = models.TextField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'cesfam_core"."dim_rem'
+
+    def __str__(self):
+        return self.codigo
+
+
+class DimSeccion(models.Model):
+    id_seccion = models.AutoField(primary_key=True)
+    rem = models.ForeignKey(
+        DimRem,
+        on_delete=models.CASCADE,
+        related_name="secciones"
+    )
+    codigo = models.CharField(max_length=20)                # A, B, A.1, C.2...
+    titulo = models.TextField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'cesfam_core"."dim_seccion'
+        unique_together = [("rem", "codigo")]
+
+    def __str__(self):
+        return f"{self.rem.codigo}-{self.codigo}"
+
+
+class DimColumna(models.Model):
+    id_columna = models.AutoField(primary_key=True)
+    seccion = models.ForeignKey(
+        DimSeccion,
+        on_delete=models.CASCADE,
+        related_name="columnas"
+    )
+    nombre = models.CharField(max_length=150)               # campo_destino del mapeo
+    orden = models.IntegerField(default=0)                  # posición según REM_STRUCTURES
+    grupo = models.CharField(max_length=50, blank=True, default="")
+
+    class Meta:
+        db_table = 'cesfam_core"."dim_columna'
+        unique_together = [("seccion", "nombre")]
+
+    def __str__(self):
+        return f"{self.seccion} · {self.nombre}"
+
+
+class DimFilaDescriptiva(models.Model):
+    id_fila_descriptiva = models.BigAutoField(primary_key=True)
+    seccion = models.ForeignKey(
+        DimSeccion,
+        on_delete=models.CASCADE,
+        related_name="filas_descriptivas"
+    )
+    # sha1 de los valores descriptivos (ej: tipo_de_control + profesional)
+    clave = models.CharField(max_length=40)
+    etiqueta = models.TextField(blank=True, default="")
+    valores = models.JSONField(default=dict)
+
+    class Meta:
+        db_table = 'cesfam_core"."dim_fila_descriptiva'
+        unique_together = [("seccion", "clave")]
+
+    def __str__(self):
+        return self.etiqueta or self.clave
+
+
+class HechoREM(models.Model):
+    id_hecho = models.BigAutoField(primary_key=True)
+
+    # Período desnormalizado desde ArchivoREM (evita JOIN en reportes)
+    periodo = models.ForeignKey(
+        DimPeriodo,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="hechos"
+    )
+    archivo = models.ForeignKey(
+        ArchivoREM,
+        on_delete=models.CASCADE,
+        related_name="hechos"
+    )
+    rem = models.ForeignKey(DimRem, on_delete=models.PROTECT)
+    seccion = models.ForeignKey(DimSeccion, on_delete=models.PROTECT)
+    columna = models.ForeignKey(DimColumna, on_delete=models.PROTECT)
+    fila_descriptiva = models.ForeignKey(
+        DimFilaDescriptiva,
+        null=True,
+        blank=True,
+        on_delete=models.PROTECT
+    )
+    fila = models.IntegerField(default=0)                   # misma fila que RegistroREM
+    valor = models.DecimalField(max_digits=20, decimal_places=4)
+
+    class Meta:
+        db_table = 'cesfam_core"."hecho_rem'
+        indexes = [
+            models.Index(fields=["periodo", "seccion", "columna"], name="hecho_rem_per_sec_col_idx"),
+            models.Index(fields=["seccion", "columna", "periodo"], name="hecho_rem_sec_col_per_idx"),
+            models.Index(fields=["archivo", "seccion", "fila"], name="hecho_rem_arch_sec_fila_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.seccion} fila {self.fila} · {self.columna.nombre} = {self.valor}"
+
+
+# ===============================================================
+# CONSOLIDADOS MULTI-MES (ENE-FEB, SEMESTRAL, ANUAL)
+# ===============================================================
+# Suma fila a fila una hoja/sección sobre varios períodos, alineando por
+# la fila descriptiva (DimFilaDescriptiva.clave). Queda materializado:
+# - AporteConsolidadoREM: las sumas de UN período, con la versión de
+#   datos con que se calcularon (se recalcula solo el mes que cambió).
+# - ConsolidadoREM.filas: la suma de todos los aportes (lo que se muestra
+#   y exporta). Ver rem/consolidados.py.
+class ConsolidadoREM(models.Model):
+    id_consolidado = models.BigAutoField(primary_key=True)
+    nombre = models.CharField(max_length=150)              # "ENE-FEB 2025", "Anual 2025"...
+    hoja = models.CharField(max_length=10)
+    seccion = models.CharField(max_length=20)
+    periodos = models.ManyToManyField(
+        DimPeriodo,
+        related_name="consolidados",
+        db_table="consolidado_rem_periodo",
+    )
+
+    # [{"clave", "descriptivos": {...}, "valores": {columna: suma}}, ...]
+    filas = models.JSONField(default=list)
+    # {periodo_id: version} de los aportes sumados en "filas"
+    versiones = models.JSONField(default=dict)
+
+    creado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+    creado_en = models.DateTimeField(auto_now_add=True)
+    actualizado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "consolidado_rem"
+        ordering = ["-creado_en"]
+
+    def __str__(self):
+        return f"{self.nombre} [{self.hoja}-{self.seccion}]"
+
+
+class AporteConsolidadoREM(models.Model):
+    consolidado = models.ForeignKey(
+        ConsolidadoREM,
+        on_delete=models.CASCADE,
+        related_name="aportes"
+    )
+    periodo = models.ForeignKey(DimPeriodo, on_delete=models.CASCADE, related_name="+")
+    version = models.BigIntegerField(default=0)            # VersionDatosPeriodo.version usada
+
+    # [{"clave", "orden", "descriptivos": {...}, "valores": {columna: suma}}, ...]
+    filas = models.JSONField(default=list)
+    calculado_en = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "aporte_consolidado_rem"
+        unique_together = [("consolidado", "periodo")]
+
+    def __str__(self):
+        return f"{self.consolidado} · {self.periodo} v{self.version}"
@@ -0,0 +1,212 @@
+# rem/paginacion.py
+"""
+Paginación por clave (keyset / seek) para listados grandes.
+
+Django Paginator hace COUNT(*) en cada página y OFFSET N: la página 500
+obliga a la BD a recorrer y descartar 25.000 filas. Aquí cada página es
+
+    WHERE clave > <última clave vista> ORDER BY clave LIMIT n+1
+
+que usa el índice de la clave (PK) y cuesta lo mismo en la página 1 que
+en la 500. La posición viaja en un token firmado (django.core.signing)
+en el parámetro ?cursor=; un token alterado o vencido vuelve al inicio.
+
+El total de filas no se cuenta con COUNT(*): los registros de un archivo
+se toman del resumen que deja la ingesta en ArchivoREM.resumen_proceso
+(ver total_registros). Solo archivos sin resumen (ej: ingreso manual)
+se cuentan en la BD.
+"""
+import math
+
+from django.core import signing
+from django.db.models import Count, Q
+
+from .models import ArchivoREM, RegistroREM
+
+SALT = "rem.paginacion"
+
+DIR_SIGUIENTE = "sig"
+DIR_ANTERIOR = "ant"
+DIR_ULTIMA = "ult"
+
+
+class PaginaKeyset:
+    """Página resultante (interfaz parecida a django.core.paginator.Page)."""
+
+    def __init__(self, object_list, numero, total, por_pagina,
+                 has_previous, has_next, previous_token, next_token, last_token):
+        self.object_list = object_list
+        self.number = numero
+        self.total = total
+        self.num_pages = max(math.ceil(total / por_pagina), 1) if total is not None else None
+        self._has_previous = has_previous
+        self._has_next = has_next
+        self.previous_token = previous_token
+        self.next_token = next_token
+        self.last_token = last_token
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class PaginadorKeyset:
+    """
+    - queryset: sin ordenar; el orden lo define 'clave'.
+    - clave: campo único y ordenable (la PK). Con descendente=True se
+      recorre de mayor a menor (ej: archivos más recientes primero).
+    - total: cantidad de filas si se conoce (para "Página X de Y" y para
+      que la última página calce con las demás); None si no se conoce.
+    """
+
+    def __init__(self, queryset, clave, por_pagina=50, descendente=False, total=None):
+        self.queryset = queryset
+        self.clave = clave
+        self.por_pagina = por_pagina
+        self.descendente = descendente
+        self.total = total
+
+    # -------------------------------
+    def _token(self, direccion, valor, numero):
+        return signing.dumps({"d": direccion, "k": valor, "n": numero}, salt=SALT)
+
+    def _leer_token(self, token):
+        if not token:
+            return None
+        try:
+            datos = signing.loads(token, salt=SALT)
+        except signing.BadSignature:
+            return None
+        if datos.get("d") not in (DIR_SIGUIENTE, DIR_ANTERIOR, DIR_ULTIMA):
+            return None
+        if datos["d"] == DIR_ULTIMA and self.total is None:
+            return None
+        return datos
+
+    def _orden(self, invertido=False):
+        descendente = self.descendente != invertido
+        return f"-{self.clave}" if descendente else self.clave
+
+    def _despues_de(self, valor):
+        op = "lt" if self.descendente else "gt"
+        return Q(**{f"{self.clave}__{op}": valor})
+
+    def _antes_de(self, valor):
+        op = "gt" if self.descendente else "lt"
+        return Q(**{f"{self.clave}__{op}": valor})
+
+    # -------------------------------
+    def get_page(self, token=None) -> PaginaKeyset:
+        n = self.por_pagina
+        datos = self._leer_token(token)
+        direccion = datos["d"] if datos else None
+
+        if direccion == DIR_SIGUIENTE:
+            filas = list(
+                self.queryset.filter(self._despues_de(datos["k"])).order_by(self._orden())[:n + 1]
+            )
+            has_next = len(filas) > n
+            filas = filas[:n]
+            has_previous = True
+            numero = datos["n"]
+
+        elif direccion in (DIR_ANTERIOR, DIR_ULTIMA):
+            if direccion == DIR_ULTIMA:
+                qs = self.queryset
+                cantidad = self.total % n or n
+                numero = self.num_paginas()
+            else:
+                qs = self.queryset.filter(self._antes_de(datos["k"]))
+                cantidad = n
+                numero = max(datos["n"], 1)
+
+            filas = list(qs.order_by(self._orden(invertido=True))[:cantidad + 1])
+            has_previous = len(filas) > cantidad
+            filas = list(reversed(filas[:cantidad]))
+            has_next = direccion == DIR_ANTERIOR
+
+        else:
+            filas = list(self.queryset.order_by(self._orden())[:n + 1])
+            has_next = len(filas) > n
+            filas = filas[:n]
+            has_previous = False
+            numero = 1
+
+        if not filas:
+            # token que ya no apunta a nada (ej: datos reprocesados)
+            if direccion is not None:
+                return self.get_page(None)
+            has_next = has_previous = False
+
+        if not has_previous:
+            numero = 1
+
+        primera = getattr(filas[0], self.clave) if filas else None
+        ultima = getattr(filas[-1], self.clave) if filas else None
+
+        return PaginaKeyset(
+            object_list=filas,
+            numero=numero,
+            total=self.total,
+            por_pagina=n,
+            has_previous=has_previous,
+            has_next=has_next,
+            previous_token=self._token(DIR_ANTERIOR, primera, numero - 1) if has_previous else "",
+            next_token=self._token(DIR_SIGUIENTE, ultima, numero + 1) if has_next else "",
+            last_token=self._token(DIR_ULTIMA, None, 0) if (has_next and self.total is not None) else "",
+        )
+
+    def num_paginas(self):
+        if self.total is None:
+            return None
+        return max(math.ceil(self.total / self.por_pagina), 1)
+
+
+# ============================================================
+# TOTALES DESDE LA METADATA DE INGESTA
+# ============================================================
+def _cantidad_en_resumen(resumen, hoja="", seccion="") -> int:
+    return sum(
+        d.get("cantidad", 0)
+        for d in (resumen or {}).get("detalle", [])
+        if (not hoja or d.get("hoja") == hoja) and (not seccion or d.get("seccion") == seccion)
+    )
+
+
+def total_registros(archivos, hoja="", seccion="") -> int:
+    """
+    Cantidad de RegistroREM de uno o varios archivos (hoja/sección
+    opcionales) sin COUNT(*) sobre registro_rem para los archivos que
+    tienen resumen_proceso. Los demás se cuentan en una sola consulta.
+    """
+    if isinstance(archivos, ArchivoREM):
+        archivos = [archivos]
+
+    total = 0
+    sin_resumen = []
+    for archivo in archivos:
+        if archivo.resumen_proceso:
+            total += _cantidad_en_resumen(archivo.resumen_proceso, hoja, seccion)
+        else:
+            sin_resumen.append(archivo.pk)
+
+    if sin_resumen:
+        qs = RegistroREM.objects.filter(archivo_id__in=sin_resumen)
+        if hoja:
+            qs = qs.filter(hoja=hoja)
+        if seccion:
+            qs = qs.filter(seccion=seccion)
+        total += qs.aggregate(n=Count("id_registro"))["n"]
+
+    return total
@@ -0,0 +1,85 @@
+# rem/periodos.py
+"""
+Estado de consolidación de los períodos (reportes_home, lista_periodos,
+home).
+
+Antes se hacían dos COUNT por período (total y procesados): 2N+1
+consultas. Ahora es una sola consulta agrupada con conteos condicionales
+(COUNT ... FILTER en PostgreSQL, CASE en otros motores).
+
+Estados:
+- sin_archivos          : ningún archivo activo
+- cargado_no_procesado  : hay archivos, ninguno procesado
+- parcial               : algunos procesados
+- completo              : todos procesados
+"""
+from django.db.models import Count, Q
+
+from .models import DimPeriodo
+
+ESTADO_SIN_ARCHIVOS = "sin_archivos"
+ESTADO_CARGADO_NO_PROCESADO = "cargado_no_procesado"
+ESTADO_PARCIAL = "parcial"
+ESTADO_COMPLETO = "completo"
+
+ESTADOS = (
+    ESTADO_SIN_ARCHIVOS,
+    ESTADO_CARGADO_NO_PROCESADO,
+    ESTADO_PARCIAL,
+    ESTADO_COMPLETO,
+)
+
+
+def periodos_activos():
+    """Períodos sin la marca [INACTIVO] (borrado lógico), más recientes primero."""
+    return (
+        DimPeriodo.objects
+        .exclude(descripcion__icontains='[INACTIVO]')
+        .order_by("-anio", "-mes")
+    )
+
+
+def estado_segun_conteos(total_archivos: int, procesados: int):
+    """Retorna (estado, porcentaje)."""
+    if total_archivos == 0:
+        return ESTADO_SIN_ARCHIVOS, 0
+    if procesados == 0:
+        return ESTADO_CARGADO_NO_PROCESADO, 0
+    if procesados < total_archivos:
+        return ESTADO_PARCIAL, int((procesados / total_archivos) * 100)
+    return ESTADO_COMPLETO, 100
+
+
+def calcular_estado_periodos(periodos=None) -> list:
+    """
+    Estado de cada período del queryset (por defecto, los activos) en una
+    sola consulta. Retorna una lista en el mismo orden:
+      [{"periodo", "total_archivos", "procesados", "porcentaje", "estado"}, ...]
+    """
+    if periodos is None:
+        periodos = periodos_activos()
+
+    anotados = periodos.annotate(
+        total_archivos=Count("archivos", filter=Q(archivos__activo=True)),
+        procesados=Count("archivos", filter=Q(archivos__activo=True, archivos__procesado=True)),
+    )
+
+    resultado = []
+    for p in anotados:
+        estado, porcentaje = estado_segun_conteos(p.total_archivos, p.procesados)
+        resultado.append({
+            "periodo": p,
+            "total_archivos": p.total_archivos,
+            "procesados": p.procesados,
+            "porcentaje": porcentaje,
+            "estado": estado,
+        })
+    return resultado
+
+
+def resumen_estados(estado_periodos) -> dict:
+    """Cantidad de períodos por estado (las 4 claves siempre presentes)."""
+    resumen = dict.fromkeys(ESTADOS, 0)
+    for item in estado_periodos:
+        resumen[item["estado"]] += 1
+    return resumen
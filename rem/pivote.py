@@ -0,0 +1,311 @@
+# rem/pivote.py
+"""
+Tablas dinámicas (pivot / crosstab) sobre RegistroREM.
+
+El usuario elige, entre las columnas de la sección en REM_STRUCTURES:
+- filas    : columnas descriptivas (ej: tipo_de_control, profesional)
+- columnas : columnas descriptivas opcionales para el eje horizontal
+- medidas  : columnas numéricas o un grupo completo ("Rango etario")
+y los períodos a considerar (solo archivos activos, por defecto).
+
+En PostgreSQL se calcula en una consulta: los valores se extraen del
+jsonb (datos->>'clave') y GROUP BY GROUPING SETS arma de una vez las
+celdas, los subtotales por cada nivel de filas, los totales por fila y
+el total general. En otros motores se acumula en Python (mismo
+resultado).
+
+Límites: cantidad de períodos, dimensiones, filas y columnas resultantes
+(ErrorPivote si se exceden). Los resultados quedan en la caché
+compartida (rem/cache.py); la clave lleva la versión de datos de cada
+período, así que un período modificado invalida sus pivotes.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection
+
+from .cache import clave_periodos, obtener
+from .definiciones import definicion_reporte
+from .models import ArchivoREM, RegistroREM
+from .reportes import a_numero
+
+MAXIMO_PERIODOS = 36
+MAXIMO_DIMENSIONES = 3
+MAXIMO_MEDIDAS = 40
+MAXIMO_FILAS = 1000
+MAXIMO_COLUMNAS = 300
+# Tope de grupos que devuelve la BD (celdas + subtotales) antes de armar
+MAXIMO_GRUPOS = 100_000
+
+SIN_DATO = ""
+
+
+class ErrorPivote(Exception):
+    """Parámetros inválidos o resultado demasiado grande (400)."""
+
+
+# ============================================================
+# PARÁMETROS
+# ============================================================
+def _validar(definicion, filas, columnas, medidas, periodos):
+    if not filas:
+        raise ErrorPivote("Elija al menos una columna para las filas.")
+    if len(filas) > MAXIMO_DIMENSIONES or len(columnas) > MAXIMO_DIMENSIONES:
+        raise ErrorPivote(f"Máximo {MAXIMO_DIMENSIONES} columnas por eje.")
+    for dimension in filas + columnas:
+        if dimension not in definicion.descriptivas:
+            raise ErrorPivote(f"'{dimension}' no es una columna descriptiva de {definicion.hoja}-{definicion.seccion}.")
+    if len(set(filas + columnas)) != len(filas + columnas):
+        raise ErrorPivote("Una columna no puede repetirse en filas y columnas.")
+
+    expandidas = []
+    for medida in medidas or definicion.medidas_principales:
+        if medida in definicion.grupos:
+            expandidas.extend(definicion.grupos[medida])
+        elif medida in definicion.medidas:
+            expandidas.append(medida)
+        else:
+            raise ErrorPivote(f"'{medida}' no es una columna numérica ni un grupo de {definicion.hoja}-{definicion.seccion}.")
+    expandidas = list(dict.fromkeys(expandidas))
+    if len(expandidas) > MAXIMO_MEDIDAS:
+        raise ErrorPivote(f"Máximo {MAXIMO_MEDIDAS} medidas.")
+
+    if not periodos:
+        raise ErrorPivote("Elija al menos un período.")
+    if len(periodos) > MAXIMO_PERIODOS:
+        raise ErrorPivote(f"Máximo {MAXIMO_PERIODOS} períodos.")
+
+    return expandidas
+
+
+def _conjuntos(n_filas, n_columnas):
+    """
+    Grouping sets como (niveles de fila, con columnas?):
+    cada prefijo de las filas (rollup), con y sin las columnas.
+    """
+    conjuntos = []
+    for nivel in range(n_filas, -1, -1):
+        if n_columnas:
+            conjuntos.append((nivel, True))
+        conjuntos.append((nivel, False))
+    return conjuntos
+
+
+# ============================================================
+# CÁLCULO
+# ============================================================
+def _pivote_sql(hoja, seccion, filas, columnas, medidas, periodos, solo_activos):
+    """
+    Retorna {(nivel, con_columnas): {(clave_fila, clave_col): [sumas]}}
+    con una consulta GROUPING SETS.
+    """
+    qn = connection.ops.quote_name
+    dimensiones = filas + columnas
+    alias_dim = [f"d{i}" for i in range(len(dimensiones))]
+    alias_med = [f"m{i}" for i in range(len(medidas))]
+
+    select_dim = ", ".join(f"COALESCE(r.datos ->> %s, '') AS {a}" for a in alias_dim)
+    select_med = ", ".join(
+        f"CASE WHEN jsonb_typeof(r.datos -> %s) = 'number' "
+        f"THEN (r.datos ->> %s)::numeric ELSE 0 END AS {a}"
+        for a in alias_med
+    )
+    params = list(dimensiones)
+    for medida in medidas:
+        params.extend([medida, medida])
+
+    filtro_activo = "AND a.activo" if solo_activos else ""
+    params.extend([hoja, seccion, list(periodos)])
+
+    sets_sql = []
+    for nivel, con_columnas in _conjuntos(len(filas), len(columnas)):
+        grupo = alias_dim[:nivel] + (alias_dim[len(filas):] if con_columnas else [])
+        sets_sql.append("(" + ", ".join(grupo) + ")")
+
+    sql = f"""
+        SELECT {", ".join(alias_dim)},
+               GROUPING({", ".join(alias_dim)}) AS g,
+               {", ".join(f"SUM({a})" for a in alias_med)}
+        FROM (
+            SELECT {select_dim}, {select_med}
+            FROM {qn(RegistroREM._meta.db_table)} r
+            JOIN {qn(ArchivoREM._meta.db_table)} a ON a.id_archivo = r.archivo_id
+            WHERE r.hoja = %s AND r.seccion = %s
+              AND a.periodo_id = ANY(%s) {filtro_activo}
+        ) t
+        GROUP BY GROUPING SETS ({", ".join(sets_sql)})
+        LIMIT %s
+    """
+    params.append(MAXIMO_GRUPOS + 1)
+
+    n_dim = len(dimensiones)
+    resultados = {}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        filas_sql = cursor.fetchall()
+
+    if len(filas_sql) > MAXIMO_GRUPOS:
+        raise ErrorPivote("El resultado es demasiado grande. Agregue filtros o use menos dimensiones.")
+
+    for fila in filas_sql:
+        valores_dim = fila[:n_dim]
+        g = fila[n_dim]
+        sumas = [v or Decimal(0) for v in fila[n_dim + 1:]]
+
+        # bit en 1 = dimensión agregada (GROUPING: la primera es el bit más alto)
+        agregada = [(g >> (n_dim - 1 - i)) & 1 for i in range(n_dim)]
+        nivel = len(filas) - sum(agregada[:len(filas)])
+        con_columnas = bool(columnas) and not any(agregada[len(filas):])
+
+        clave_fila = tuple(valores_dim[:nivel])
+        clave_col = tuple(valores_dim[len(filas):]) if con_columnas else None
+        resultados.setdefault((nivel, con_columnas), {})[(clave_fila, clave_col)] = sumas
+    return resultados
+
+
+def _a_decimal(valor):
+    """Mismo criterio que jsonb_typeof = 'number' (booleanos no cuentan)."""
+    if valor is None or isinstance(valor, bool):
+        return Decimal(0)
+    if isinstance(valor, Decimal):
+        return valor
+    if isinstance(valor, (int, float)):
+        try:
+            return Decimal(str(valor))
+        except InvalidOperation:
+            return Decimal(0)
+    return Decimal(0)
+
+
+def _texto_dim(valor) -> str:
+    if valor is None:
+        return SIN_DATO
+    if isinstance(valor, bool):
+        return "true" if valor else "false"
+    return str(valor)
+
+
+def _pivote_python(hoja, seccion, filas, columnas, medidas, periodos, solo_activos):
+    qs = RegistroREM.objects.filter(hoja=hoja, seccion=seccion, archivo__periodo_id__in=periodos)
+    if solo_activos:
+        qs = qs.filter(archivo__activo=True)
+
+    conjuntos = _conjuntos(len(filas), len(columnas))
+    resultados = {conjunto: {} for conjunto in conjuntos}
+
+    for datos in qs.values_list("datos", flat=True).iterator(chunk_size=2000):
+        datos = datos or {}
+        valores_fila = [_texto_dim(datos.get(d)) for d in filas]
+        valores_col = tuple(_texto_dim(datos.get(d)) for d in columnas)
+        sumas = [_a_decimal(datos.get(m)) for m in medidas]
+
+        for nivel, con_columnas in conjuntos:
+            clave = (tuple(valores_fila[:nivel]), valores_col if con_columnas else None)
+            acumulado = resultados[(nivel, con_columnas)].setdefault(clave, [Decimal(0)] * len(medidas))
+            for i, valor in enumerate(sumas):
+                acumulado[i] += valor
+
+    return {conjunto: celdas for conjunto, celdas in resultados.items() if celdas}
+
+
+def _armar_tabla(definicion, filas, columnas, medidas, resultados):
+    """Ordena filas (con subtotales después de sus hijos) y columnas."""
+    n_filas = len(filas)
+    celdas_completas = resultados.get((n_filas, bool(columnas)), {})
+
+    claves_filas = sorted({clave_fila for clave_fila, _ in celdas_completas})
+    if len(claves_filas) > MAXIMO_FILAS:
+        raise ErrorPivote(f"El resultado tiene {len(claves_filas)} filas (máximo {MAXIMO_FILAS}). Agregue filtros.")
+
+    claves_cols = sorted({clave_col for _, clave_col in celdas_completas}) if columnas else []
+    n_columnas = (len(claves_cols) + 1) * len(medidas) if columnas else len(medidas)
+    if n_columnas > MAXIMO_COLUMNAS:
+        raise ErrorPivote(f"El resultado tiene {n_columnas} columnas (máximo {MAXIMO_COLUMNAS}). Agregue filtros.")
+
+    encabezados = []
+    for clave_col in claves_cols:
+        for medida in medidas:
+            encabezados.append({"clave": list(clave_col), "medida": medida, "etiqueta": definicion.etiquetas[medida]})
+    for medida in medidas:
+        etiqueta = definicion.etiquetas[medida]
+        encabezados.append({
+            "clave": None,
+            "medida": medida,
+            "etiqueta": f"Total {etiqueta}" if columnas else etiqueta,
+        })
+
+    cero = [Decimal(0)] * len(medidas)
+
+    def valores(nivel, clave_fila):
+        fila = []
+        for clave_col in claves_cols:
+            fila.extend(resultados.get((nivel, True), {}).get((clave_fila, clave_col), cero))
+        fila.extend(resultados.get((nivel, False), {}).get((clave_fila, None), cero))
+        return [a_numero(v) for v in fila]
+
+    # Todas las claves (detalle + subtotales por prefijo + total general)
+    todas = set()
+    for clave_fila in claves_filas:
+        for nivel in range(n_filas + 1):
+            todas.add(clave_fila[:nivel])
+
+    def orden(clave_fila):
+        return tuple((0, v) for v in clave_fila) + ((1, ""),) * (n_filas - len(clave_fila))
+
+    filas_tabla = [
+        {
+            "clave": list(clave_fila),
+            "nivel": len(clave_fila),
+            "subtotal": len(clave_fila) < n_filas,
+            "valores": valores(len(clave_fila), clave_fila),
+        }
+        for clave_fila in sorted(todas, key=orden)
+    ]
+
+    return {
+        "hoja": definicion.hoja,
+        "seccion": definicion.seccion,
+        "filas_dim": filas,
+        "columnas_dim": columnas,
+        "medidas": medidas,
+        "columnas": encabezados,
+        "filas": filas_tabla,
+    }
+
+
+def calcular_pivote(hoja, seccion, filas, columnas=(), medidas=(), periodos=(), solo_activos=True) -> dict:
+    """
+    Tabla dinámica de una hoja/sección.
+    - filas / columnas: columnas descriptivas (máx. 3 por eje)
+    - medidas: columnas numéricas o nombres de grupo ("Rango etario");
+      por defecto la medida principal de la sección
+    - periodos: ids de DimPeriodo
+
+    Retorna:
+      {"hoja", "seccion", "filas_dim", "columnas_dim", "medidas",
+       "columnas": [{"clave", "medida", "etiqueta"}],
+       "filas": [{"clave", "nivel", "subtotal", "valores"}]}
+    La última fila (nivel 0) es el total general; si hay columnas, las
+    últimas len(medidas) columnas son el total de cada fila.
+    """
+    definicion = definicion_reporte(hoja, seccion)
+    if definicion is None:
+        raise ErrorPivote(f"REM {hoja} sección {seccion} no tiene estructura definida.")
+
+    filas = list(filas)
+    columnas = list(columnas)
+    periodos = sorted({int(p) for p in periodos})
+    medidas = _validar(definicion, filas, columnas, list(medidas), periodos)
+
+    clave = clave_periodos(
+        "pivote", periodos, definicion.hoja, definicion.seccion,
+        ",".join(filas), ",".join(columnas), ",".join(medidas), bool(solo_activos),
+    )
+
+    def calcular():
+        calcular_grupos = _pivote_sql if connection.vendor == "postgresql" else _pivote_python
+        resultados = calcular_grupos(
+            definicion.hoja, definicion.seccion, filas, columnas, medidas, periodos, solo_activos
+        )
+        return _armar_tabla(definicion, filas, columnas, medidas, resultados)
+
+    return obtener("pivote", clave, calcular)
@@ -0,0 +1,137 @@
+# rem/progreso.py
+"""
+Progreso en vivo de una ingesta REM.
+
+El ETL llama a ReporteProgreso a medida que termina cada sección; el
+reporte se guarda en la tabla progreso_rem (como máximo cada
+INTERVALO_GUARDADO segundos, para no frenar la carga) y lo leen:
+- el endpoint JSON de polling,
+- el stream SSE que usa la página de estado,
+- o la consola, en el caso de rem/etl_guardar_raw.py.
+"""
+import time
+
+from django.utils import timezone
+
+from .models import ProgresoREM
+
+# Segundos mínimos entre dos escrituras a la BD
+INTERVALO_GUARDADO = 0.5
+
+
+def clave_archivo(archivo_id) -> str:
+    return f"archivo-{archivo_id}"
+
+
+def clave_cli(nombre_archivo: str) -> str:
+    return f"cli-{nombre_archivo}"[:150]
+
+
+class ReporteProgreso:
+    """
+    Acumula el avance y lo publica en ProgresoREM.
+
+    - eco: función opcional que recibe el dict de progreso en cada
+      publicación (la CLI la usa para imprimir en consola).
+    """
+
+    def __init__(self, clave, archivo=None, eco=None, intervalo=INTERVALO_GUARDADO):
+        self.clave = clave
+        self.archivo = archivo
+        self.eco = eco
+        self.intervalo = intervalo
+        self._ultimo_guardado = 0.0
+        self._inicio = time.monotonic()
+
+        self.progreso, _ = ProgresoREM.objects.update_or_create(
+            clave=clave,
+            defaults={
+                "archivo": archivo,
+                "estado": ProgresoREM.ESTADO_EN_CURSO,
+                "etapa": "lectura",
+                "hoja_actual": "",
+                "secciones_hechas": 0,
+                "secciones_total": 0,
+                "filas_escritas": 0,
+                "mensaje": "",
+                "iniciado_en": timezone.now(),
+            },
+        )
+
+    # -------------------------------
+    # Llamadas desde el ETL / ingesta
+    # -------------------------------
+    def iniciar(self, secciones_total: int):
+        self.progreso.secciones_total = secciones_total
+        self._publicar(forzar=True)
+
+    def hoja(self, hoja: str):
+        self.progreso.hoja_actual = hoja
+        self._publicar()
+
+    def seccion_terminada(self, hoja: str, filas: int):
+        self.progreso.hoja_actual = hoja
+        self.progreso.secciones_hechas += 1
+        self.progreso.filas_escritas += filas
+        self._publicar()
+
+    def etapa(self, nombre: str):
+        self.progreso.etapa = nombre
+        self._publicar(forzar=True)
+
+    def terminar(self, filas_escritas=None, mensaje=""):
+        if filas_escritas is not None:
+            self.progreso.filas_escritas = filas_escritas
+        self.progreso.secciones_hechas = self.progreso.secciones_total
+        self.progreso.estado = ProgresoREM.ESTADO_TERMINADO
+        self.progreso.etapa = "terminado"
+        self.progreso.mensaje = mensaje
+        self._publicar(forzar=True)
+
+    def fallar(self, mensaje: str):
+        self.progreso.estado = ProgresoREM.ESTADO_ERROR
+        self.progreso.mensaje = mensaje
+        self._publicar(forzar=True)
+
+    # -------------------------------
+    def _publicar(self, forzar=False):
+        ahora = time.monotonic()
+        if not forzar and ahora - self._ultimo_guardado < self.intervalo:
+            return
+        self._ultimo_guardado = ahora
+
+        self.progreso.save()
+        if self.eco:
+            self.eco(progreso_a_dict(self.progreso))
+
+
+def progreso_a_dict(progreso: ProgresoREM) -> dict:
+    """
+    Serializa el progreso para JSON/SSE, incluyendo transcurrido y ETA
+    (estimada linealmente por secciones).
+    """
+    fin = progreso.actualizado_en if progreso.estado != ProgresoREM.ESTADO_EN_CURSO else timezone.now()
+    transcurrido = max((fin - progreso.iniciado_en).total_seconds(), 0)
+
+    eta = None
+    hechas = progreso.secciones_hechas
+    total = progreso.secciones_total
+    if progreso.estado == ProgresoREM.ESTADO_EN_CURSO and hechas and total:
+        eta = round(transcurrido / hechas * (total - hechas), 1)
+
+    porcentaje = int(hechas * 100 / total) if total else 0
+
+    return {
+        "clave": progreso.clave,
+        "estado": progreso.estado,
+        "etapa": progreso.etapa,
+        "hoja_actual": progreso.hoja_actual,
+        "secciones_hechas": hechas,
+        "secciones_total": total,
+        "porcentaje": porcentaje,
+        "filas_escritas": progreso.filas_escritas,
+        "transcurrido_segundos": round(transcurrido, 1),
+        "eta_segundos": eta,
+        "mensaje": progreso.mensaje,
+        "actualizado_en": progreso.actualizado_en.isoformat() if progreso.actualizado_en else None,
+    }
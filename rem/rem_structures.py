@@ -92,3 +92,72 @@ else:
                 entrada["tabla_principal"] = tabla_principal
 
             REM_STRUCTURES.setdefault(hoja, {})[seccion] = entrada
+
+
+def grupo_de_columna(nombre_campo: str) -> str:
+    """
+    Grupo visual de una columna (para cabeceras agrupadas tipo Excel):
+    'Rango etario', 'Sexo', 'Identificación de género' o '' si no aplica.
+    """
+    n = (nombre_campo or "").lower()
+
+    if n.startswith("rango_etario_"):
+        return "Rango etario"
+    if n.startswith("sexo_"):
+        return "Sexo"
+    if n.startswith("identificacion_de_genero_"):
+        return "Identificación de género"
+    return ""
+
+
+def bloques_header(columnas, sin_grupos="Valores registrados") -> list:
+    """
+    Bloques de la primera fila de una cabecera agrupada tipo Excel:
+    columnas consecutivas del mismo grupo forman un bloque.
+      [{"nombre": "Rango etario", "span": 17}, {"nombre": "", "span": 1}, ...]
+    Si ninguna columna tiene grupo, un solo bloque 'sin_grupos'.
+    """
+    if not columnas:
+        return []
+
+    grupos_por_col = [grupo_de_columna(c) for c in columnas]
+    if not any(grupos_por_col):
+        return [{"nombre": sin_grupos, "span": len(columnas)}]
+
+    bloques = []
+    grupo_actual = grupos_por_col[0]
+    span = 1
+    for g in grupos_por_col[1:]:
+        if g == grupo_actual:
+            span += 1
+        else:
+            bloques.append({"nombre": grupo_actual, "span": span})
+            grupo_actual = g
+            span = 1
+    bloques.append({"nombre": grupo_actual, "span": span})
+    return bloques
+
+
+def pretty_col_name(col: str) -> str:
+    """
+    Convierte un nombre técnico (snake_case) a un label legible.
+
+    Caso especial:
+    - Si la columna sigue patrón "edad_X_anos_hombres/mujeres", lo transforma a:
+      "X años (Hombres/Mujeres)".
+    """
+    if col.startswith("edad_") and "anos_" in col:
+        resto = col[len("edad_"):]
+        partes = resto.split("_")
+        if "anos" in partes:
+            idx_anos = partes.index("anos")
+            rango = " ".join(partes[:idx_anos])
+            rango = rango.replace(" ", "–") if " " in rango and "y" not in rango else rango.replace(" ", " ")
+            sexo = partes[idx_anos + 1] if idx_anos + 1 < len(partes) else ""
+            texto = f"{rango} años ({sexo.capitalize()})"
+            texto = texto.replace("mas", "más")
+            return texto
+
+    texto = col.replace("_", " ")
+    texto = texto.replace("anos", "años")
+    return texto.capitalize()
@@ -0,0 +1,489 @@
+# rem/reportes.py
+"""
+Agregación de reportes en una sola pasada sobre RegistroREM.
+
+Antes reporte_a01_seccion_a recorría el queryset dos veces (resumen y
+gráficos): dos SELECT con el JSON completo de cada fila, instancias de
+modelo en memoria y _to_int repetido sobre los mismos valores.
+
+Ahora:
+- filas_proyectadas() trae solo las claves de 'datos' que se usan
+  (en PostgreSQL datos -> 'clave' en SQL) y recorre con .iterator(),
+  sin instanciar modelos ni cachear el queryset: memoria constante.
+- agregar_en_una_pasada() entrega cada fila a varios acumuladores; cada
+  uno calcula lo suyo (KPIs, contadores, validaciones, series).
+- AcumuladorA01SeccionA convierte cada valor una sola vez y arma todo
+  el reporte A01 - Sección A con esa única pasada.
+
+Para el resto de las hojas/secciones, calcular_reporte_seccion() arma
+KPIs, gráficos y validaciones desde una DefinicionReporte
+(rem/definiciones.py) con GROUP BY sobre hecho_rem, y el resultado se
+guarda en caché por versión de datos del período (rem/versiones.py).
+"""
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import F, Q, Sum, Value
+from django.db.models.fields.json import KeyTextTransform, KeyTransform
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .cache import clave_periodo, obtener
+from .definiciones import definicion_reporte
+from .estrella import hechos_activos
+from .models import DimSeccion
+
+# Filas por viaje a la BD en .iterator()
+TAMANO_LOTE = 2000
+
+# Reportes por sección: la clave incluye la versión del período, así que
+# un cambio de datos nunca sirve un resultado viejo
+CACHE_REPORTE_SEGUNDOS = 24 * 60 * 60
+
+# RANGOS etarios usados para reportes, export Excel y export PDF.
+RANGOS_A01_A = [
+    ("rango_etario_menos_de_4_anos", "Menos de 4 años"),
+    ("rango_etario_5_9_anos", "5 - 9 años"),
+    ("rango_etario_10_14_anos", "10 - 14 años"),
+    ("rango_etario_15_19_anos", "15 - 19 años"),
+    ("rango_etario_20_24_anos", "20 - 24 años"),
+    ("rango_etario_25_29_anos", "25 - 29 años"),
+    ("rango_etario_30_34_anos", "30 - 34 años"),
+    ("rango_etario_35_39_anos", "35 - 39 años"),
+    ("rango_etario_40_44_anos", "40 - 44 años"),
+    ("rango_etario_45_49_anos", "45 - 49 años"),
+    ("rango_etario_50_54_anos", "50 - 54 años"),
+    ("rango_etario_55_59_anos", "55 - 59 años"),
+    ("rango_etario_60_64_anos", "60 - 64 años"),
+    ("rango_etario_65_69_anos", "65 - 69 años"),
+    ("rango_etario_70_74_anos", "70 - 74 años"),
+    ("rango_etario_75_79_anos", "75 - 79 años"),
+    ("rango_etario_80_y_mas_anos", "80 y más años"),
+]
+
+# Dict rápido (key -> label) para resolver nombres de rangos etarios
+RANGOS_A01_A_DICT = {k: v for k, v in RANGOS_A01_A}
+
+
+# ============================================================
+# CONVERSIÓN
+# ============================================================
+def a_entero(valor):
+    """
+    Normaliza valores numéricos que pueden venir como:
+    - None
+    - int/float
+    - string ("", "-", "12", "12,0", "12.0")
+
+    Retorna siempre int (o 0 si no es convertible).
+    """
+    if valor is None:
+        return 0
+    if isinstance(valor, (int, float, Decimal)):
+        return int(valor)
+    if isinstance(valor, str):
+        valor = valor.strip()
+        if not valor or valor == "-":
+            return 0
+        try:
+            return int(valor)
+        except ValueError:
+            try:
+                return int(float(valor.replace(",", ".")))
+            except ValueError:
+                return 0
+    return 0
+
+
+def a_texto(valor) -> str:
+    return str(valor).strip() if valor is not None else ""
+
+
+def a_numero(valor):
+    """
+    Decimal de SUM(valor) → int si es entero, float si no (para mostrar y
+    serializable a JSON). None (SUM sin filas) → 0; int queda igual.
+    """
+    if valor is None:
+        return 0
+    if isinstance(valor, Decimal) and valor == valor.to_integral_value():
+        return int(valor)
+    return valor if isinstance(valor, int) else float(valor)
+
+
+# ============================================================
+# MOTOR: UNA PASADA, SOLO LAS CLAVES NECESARIAS
+# ============================================================
+def filas_proyectadas(qs, claves, tamano_lote=TAMANO_LOTE, orden=(), ventana=None, con_id=False):
+    """
+    Genera un dict {clave: valor} por RegistroREM con solo 'claves'.
+    En SQLite JSON_EXTRACT no distingue "0" de 0, así que ahí se lee la
+    columna datos (sin instanciar modelos) y se proyecta en Python.
+    'orden' (ej: ("id_registro",)) solo si importa el orden de las filas.
+    - ventana: (desde, hasta) para leer solo qs[desde:hasta]
+    - con_id: genera (id_registro, dict) en vez de solo el dict
+    """
+    claves = list(claves)
+    extra = ["id_registro"] if con_id else []
+
+    if connection.vendor == "postgresql":
+        proyeccion = {f"c{i}": KeyTransform(clave, "datos") for i, clave in enumerate(claves)}
+        filas = qs.order_by(*orden).annotate(**proyeccion).values_list(*extra, *proyeccion.keys())
+        if ventana:
+            filas = filas[ventana[0]:ventana[1]]
+        for fila in filas.iterator(chunk_size=tamano_lote):
+            proyectada = dict(zip(claves, fila[len(extra):]))
+            yield (fila[0], proyectada) if con_id else proyectada
+        return
+
+    filas = qs.order_by(*orden).values_list(*extra, "datos")
+    if ventana:
+        filas = filas[ventana[0]:ventana[1]]
+    for fila in filas.iterator(chunk_size=tamano_lote):
+        datos = fila[-1] or {}
+        proyectada = {clave: datos.get(clave) for clave in claves}
+        yield (fila[0], proyectada) if con_id else proyectada
+
+
+def agregar_en_una_pasada(qs, acumuladores, tamano_lote=TAMANO_LOTE) -> list:
+    """
+    Recorre qs una sola vez (solo las claves que piden los acumuladores)
+    y retorna la lista de resultados, en el mismo orden.
+
+    Un acumulador es cualquier objeto con:
+    - claves: claves de RegistroREM.datos que necesita
+    - agregar(fila): recibe cada fila ({clave: valor}, solo las claves
+      pedidas por todos los acumuladores)
+    - resultado(): lo acumulado, al terminar la pasada
+    """
+    claves = list(dict.fromkeys(c for acumulador in acumuladores for c in acumulador.claves))
+
+    for fila in filas_proyectadas(qs, claves, tamano_lote):
+        for acumulador in acumuladores:
+            acumulador.agregar(fila)
+
+    return [acumulador.resultado() for acumulador in acumuladores]
+
+
+def grafico_top(counter, etiquetas=None, max_items=6) -> list:
+    """Top N de un Counter con porcentajes: [{"nombre", "valor", "porcentaje"}]."""
+    items = [(k, v) for k, v in counter.items() if v > 0]
+    if not items:
+        return []
+
+    items.sort(key=lambda kv: kv[1], reverse=True)
+    items = items[:max_items]
+
+    total = sum(v for _, v in items) or 1
+    return [
+        {
+            "nombre": etiquetas.get(key, key) if etiquetas else key,
+            "valor": valor,
+            "porcentaje": round(valor * 100 / total),
+        }
+        for key, valor in items
+    ]
+
+
+# ============================================================
+# REM A01 - SECCIÓN A
+# ============================================================
+class AcumuladorA01SeccionA:
+    """
+    KPIs, validación TOTAL vs rangos y series de gráficos del A01-A.
+    - total_controles: suma del TOTAL declarado.
+    - Gráficos: usan la suma de rangos etarios (no confían en "total")
+      y solo filas con actividad.
+    """
+
+    claves = ("total", "tipo_de_control", "profesional") + tuple(k for k, _ in RANGOS_A01_A)
+
+    def __init__(self):
+        self.total_controles = 0
+        self.tipos_control = set()
+        self.profesionales = set()
+        self.totales_rangos = {key: 0 for key, _ in RANGOS_A01_A}
+        self.filas_con_inconsistencia = 0
+
+        self.tipos_counter = Counter()
+        self.prof_counter = Counter()
+        self.rangos_counter = Counter()
+
+    def agregar(self, fila):
+        total_fila = a_entero(fila["total"])
+        self.total_controles += total_fila
+
+        tipo = a_texto(fila["tipo_de_control"])
+        if tipo:
+            self.tipos_control.add(tipo)
+
+        profesional = a_texto(fila["profesional"])
+        if profesional:
+            self.profesionales.add(profesional)
+
+        valores_rangos = [(key, a_entero(fila[key])) for key, _ in RANGOS_A01_A]
+        suma_rangos_fila = 0
+        for key, v in valores_rangos:
+            self.totales_rangos[key] += v
+            suma_rangos_fila += v
+
+        # Si hay actividad, validar consistencia total vs suma rangos
+        if (total_fila > 0 or suma_rangos_fila > 0) and total_fila != suma_rangos_fila:
+            self.filas_con_inconsistencia += 1
+
+        # Series de gráficos
+        if suma_rangos_fila > 0:
+            self.tipos_counter[tipo or "Otros controles"] += suma_rangos_fila
+            self.prof_counter[profesional or "Sin profesional"] += suma_rangos_fila
+            for key, v in valores_rangos:
+                self.rangos_counter[key] += v
+
+    def resultado(self):
+        return self
+
+
+def _alerta_plazo(periodo):
+    """Cierre estimado: día 10 del mes siguiente."""
+    hoy = timezone.localdate()  # misma fecha que el ETag diario (rem/versiones.py)
+    if periodo.mes == 12:
+        cierre = date(periodo.anio + 1, 1, 10)
+    else:
+        cierre = date(periodo.anio, periodo.mes + 1, 10)
+
+    dias_restantes = (cierre - hoy).days
+    if dias_restantes < 0:
+        return f"El plazo estimado de consolidación para este período venció hace {abs(dias_restantes)} día(s)."
+    if dias_restantes <= 5:
+        return f"Quedan {dias_restantes} día(s) para el cierre estimado de consolidación del período."
+    return None
+
+
+def resumen_a01_seccion_a(acumulado: AcumuladorA01SeccionA, periodo=None) -> dict:
+    """
+    Indicadores y alertas a partir de lo acumulado:
+    total_controles, num_tipos_control, num_profesionales, rango_top,
+    rangos_chart, solo_estructura, alertas.
+    """
+    totales_rangos = acumulado.totales_rangos
+    alertas = []
+
+    # Rango con mayor valor
+    rango_top = None
+    max_val = 0
+    for key, label in RANGOS_A01_A:
+        if totales_rangos[key] > max_val:
+            max_val = totales_rangos[key]
+            rango_top = label
+    if max_val == 0:
+        rango_top = "Sin datos registrados"
+
+    # Alertas por estructura vacía o rangos sin registros
+    solo_estructura = (acumulado.total_controles == 0 and sum(totales_rangos.values()) == 0)
+    if solo_estructura:
+        alertas.append("REM A01 Sección A tiene solo estructura sin datos (todos los valores son 0).")
+    else:
+        for key, label in RANGOS_A01_A:
+            if totales_rangos[key] == 0:
+                alertas.append(f"No hay registros en el rango etario «{label}» en este período.")
+
+    if acumulado.filas_con_inconsistencia > 0:
+        alertas.append(
+            f"Se detectaron {acumulado.filas_con_inconsistencia} fila(s) donde el TOTAL no coincide "
+            f"con la suma de rangos etarios."
+        )
+
+    alerta_plazo = _alerta_plazo(periodo) if periodo is not None else None
+    if alerta_plazo:
+        alertas.insert(0, alerta_plazo)
+
+    return {
+        "total_controles": acumulado.total_controles,
+        "num_tipos_control": len(acumulado.tipos_control),
+        "num_profesionales": len(acumulado.profesionales),
+        "rango_top": rango_top,
+        "rangos_chart": [{"label": label, "value": totales_rangos[key]} for key, label in RANGOS_A01_A],
+        "solo_estructura": solo_estructura,
+        "alertas": alertas,
+    }
+
+
+def calcular_reporte_a01_seccion_a(registros_qs, periodo=None) -> dict:
+    """
+    Todo el reporte A01 - Sección A en una pasada:
+      {"resumen", "tipos_chart", "profesionales_chart", "rangos_chart"}
+    """
+    acumulado, = agregar_en_una_pasada(registros_qs, [AcumuladorA01SeccionA()])
+
+    return {
+        "resumen": resumen_a01_seccion_a(acumulado, periodo),
+        "tipos_chart": grafico_top(acumulado.tipos_counter),
+        "profesionales_chart": grafico_top(acumulado.prof_counter),
+        "rangos_chart": grafico_top(acumulado.rangos_counter, RANGOS_A01_A_DICT),
+    }
+
+
+def con_alerta_plazo(reporte: dict, periodo) -> dict:
+    """
+    El reporte de calcular_reporte_a01_seccion_a(qs) (sin período) con la
+    alerta de plazo al inicio de resumen["alertas"]. Esa alerta depende de
+    la fecha de hoy: se agrega en cada request, fuera de la caché. No
+    modifica 'reporte'.
+    """
+    alerta_plazo = _alerta_plazo(periodo)
+    if not alerta_plazo:
+        return reporte
+    resumen = dict(reporte["resumen"], alertas=[alerta_plazo] + reporte["resumen"]["alertas"])
+    return dict(reporte, resumen=resumen)
+
+
+def calcular_resumen_a01_seccion_a(registros_qs, periodo=None) -> dict:
+    """Solo los indicadores y alertas (misma pasada única)."""
+    return calcular_reporte_a01_seccion_a(registros_qs, periodo)["resumen"]
+
+
+# ============================================================
+# REPORTE GENÉRICO POR SECCIÓN (hecho_rem)
+# ============================================================
+def _hechos_seccion(periodo_id, definicion):
+    """Hechos de la sección en el período (índice periodo, seccion, columna)."""
+    dim_seccion = (
+        DimSeccion.objects
+        .filter(rem__codigo=definicion.hoja, codigo=definicion.seccion)
+        .only("pk")
+        .first()
+    )
+    if dim_seccion is None:
+        return None
+    return hechos_activos().filter(periodo_id=periodo_id, seccion=dim_seccion)
+
+
+def _filas_inconsistentes(hechos, regla) -> int:
+    """Filas (archivo, fila) donde TOTAL ≠ suma del grupo; el conteo lo hace la BD."""
+    cero = Value(Decimal("0"))
+    return (
+        hechos
+        .values("archivo_id", "fila")
+        .annotate(
+            total_fila=Coalesce(Sum("valor", filter=Q(columna__nombre=regla.columna_total)), cero),
+            suma_grupo=Coalesce(Sum("valor", filter=Q(columna__nombre__in=regla.columnas)), cero),
+        )
+        .exclude(total_fila=F("suma_grupo"))
+        .count()
+    )
+
+
+def calcular_reporte_seccion(periodo, hoja, seccion):
+    """
+    KPIs, gráficos y alertas de cualquier hoja/sección con agregación en
+    la BD. Retorna None si la sección no está en REM_STRUCTURES.
+
+      {"definicion", "total", "filas", "descriptivas": [...],
+       "grupos": [...], "totales": [...], "alertas": [...], "solo_estructura"}
+    """
+    definicion = definicion_reporte(hoja, seccion)
+    if definicion is None:
+        return None
+
+    periodo_id = getattr(periodo, "pk", periodo)
+    hechos = _hechos_seccion(periodo_id, definicion)
+
+    totales_columna = {}
+    descriptivas = []
+    filas = 0
+    inconsistencias = []
+
+    if hechos is not None:
+        # 1) SUM por columna
+        totales_columna = {
+            fila["columna__nombre"]: a_numero(fila["total"])
+            for fila in hechos.values("columna__nombre").annotate(total=Sum("valor"))
+        }
+
+        # 2) Filas con datos
+        filas = hechos.values("archivo_id", "fila").distinct().count()
+
+        # 3) Medida principal repartida por cada columna descriptiva
+        principales = definicion.medidas_principales
+        for columna in definicion.descriptivas:
+            por_valor = (
+                hechos
+                .annotate(valor_desc=KeyTextTransform(columna, "fila_descriptiva__valores"))
+                .values("valor_desc")
+                .annotate(total=Sum("valor", filter=Q(columna__nombre__in=principales)))
+            )
+            contador = Counter()
+            for fila in por_valor:
+                nombre = a_texto(fila["valor_desc"]) or "Sin dato"
+                contador[nombre] += a_numero(fila["total"])
+
+            descriptivas.append({
+                "columna": columna,
+                "etiqueta": definicion.etiquetas[columna],
+                "distintos": len([k for k in contador if k != "Sin dato"]),
+                "grafico": grafico_top(contador),
+            })
+
+        # 4) Reglas de consistencia
+        for regla in definicion.reglas:
+            n = _filas_inconsistentes(hechos, regla)
+            if n:
+                inconsistencias.append(regla.mensaje(n))
+
+    # Total de la sección: columna TOTAL o suma de todas las medidas
+    if definicion.columna_total:
+        total = totales_columna.get(definicion.columna_total, 0)
+    else:
+        total = sum(totales_columna.get(c, 0) for c in definicion.medidas)
+
+    grupos = []
+    alertas = []
+    for nombre, columnas in definicion.grupos.items():
+        contador = Counter({c: totales_columna.get(c, 0) for c in columnas})
+        sin_registros = [c for c in columnas if not contador[c]]
+        top = max(columnas, key=lambda c: contador[c])
+
+        grupos.append({
+            "nombre": nombre,
+            "top": definicion.etiquetas[top] if contador[top] else "Sin datos registrados",
+            "grafico": grafico_top(contador, definicion.etiquetas, max_items=len(columnas)),
+        })
+        if sin_registros and len(sin_registros) < len(columnas):
+            alertas.append(f"{nombre}: {len(sin_registros)} columna(s) sin registros en este período.")
+
+    solo_estructura = not any(totales_columna.values())
+    if solo_estructura:
+        alertas = [
+            f"REM {definicion.hoja} Sección {definicion.seccion} no tiene datos en este período "
+            f"(sin registros o todos los valores en 0)."
+        ]
+    alertas.extend(inconsistencias)
+
+    return {
+        "definicion": definicion,
+        "total": total,
+        "filas": filas,
+        "descriptivas": descriptivas,
+        "grupos": grupos,
+        "totales": [
+            {"columna": c, "etiqueta": definicion.etiquetas[c], "total": totales_columna.get(c, 0)}
+            for c in definicion.medidas
+        ],
+        "alertas": alertas,
+        "solo_estructura": solo_estructura,
+    }
+
+
+def reporte_seccion(periodo, hoja, seccion):
+    """calcular_reporte_seccion con caché por versión de datos del período."""
+    hoja = (hoja or "").strip().upper()
+    seccion = (seccion or "").strip().upper()
+    periodo_id = getattr(periodo, "pk", periodo)
+
+    return obtener(
+        "reporte_seccion",
+        clave_periodo("reporte_seccion", periodo_id, hoja, seccion),
+        lambda: calcular_reporte_seccion(periodo_id, hoja, seccion),
+        CACHE_REPORTE_SEGUNDOS,
+    )
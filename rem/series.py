@@ -0,0 +1,173 @@
+# rem/series.py
+"""
+Series de tiempo entre períodos (tendencias de 12 a 36 meses).
+
+Una medida de una hoja/sección (ej: A01-A "total"), opcionalmente
+separada por una columna descriptiva (ej: tipo_de_control), para cada
+período de un rango. Se calcula con UN GROUP BY sobre hecho_rem
+(índice seccion, columna, periodo), sin recorrer registros por período.
+
+La caché (rem/cache.py) se arma con el rango y la versión de datos de
+cada período del rango: si cambia un solo mes, la clave cambia.
+"""
+import re
+
+from django.db.models import Sum
+from django.db.models.fields.json import KeyTextTransform
+
+from .cache import clave_periodos, obtener
+from .definiciones import definicion_reporte
+from .estrella import hechos_activos
+from .models import DimSeccion
+from .periodos import periodos_activos
+from .reportes import a_numero, a_texto
+
+CACHE_SERIES_SEGUNDOS = 24 * 60 * 60
+
+# Límites para proteger al servidor
+MAXIMO_PERIODOS = 60
+PERIODOS_POR_DEFECTO = 12
+MAXIMO_SERIES = 50
+SERIES_POR_DEFECTO = 10
+
+SIN_DATO = "Sin dato"
+OTROS = "Otros"
+
+
+class ErrorSerie(Exception):
+    """Parámetros inválidos (se responde 400 con el mensaje)."""
+
+
+def leer_mes(texto: str):
+    """'2025-03' → (2025, 3); None si viene vacío."""
+    if not texto:
+        return None
+    coincide = re.fullmatch(r"(\d{4})-(\d{1,2})", texto.strip())
+    if not coincide or not 1 <= int(coincide.group(2)) <= 12:
+        raise ErrorSerie(f"Mes inválido: '{texto}' (formato AAAA-MM).")
+    return int(coincide.group(1)), int(coincide.group(2))
+
+
+def periodos_en_rango(desde=None, hasta=None) -> list:
+    """
+    Períodos activos entre 'desde' y 'hasta' ((anio, mes), inclusive),
+    del más antiguo al más reciente. Sin 'desde': los últimos
+    PERIODOS_POR_DEFECTO hasta 'hasta' (o hasta el último período).
+    """
+    qs = periodos_activos()
+    if hasta:
+        qs = qs.filter(anio__lt=hasta[0]) | qs.filter(anio=hasta[0], mes__lte=hasta[1])
+    if desde:
+        qs = qs.filter(anio__gt=desde[0]) | qs.filter(anio=desde[0], mes__gte=desde[1])
+
+    limite = MAXIMO_PERIODOS + 1 if desde else PERIODOS_POR_DEFECTO
+    periodos = list(qs.order_by("-anio", "-mes")[:limite])
+    if len(periodos) > MAXIMO_PERIODOS:
+        raise ErrorSerie(f"El rango supera el máximo de {MAXIMO_PERIODOS} períodos.")
+    return list(reversed(periodos))
+
+
+def _agrupar(hoja, seccion, medidas, por, periodos):
+    """
+    UN GROUP BY sobre hecho_rem: SUM(valor) por período
+    (y por valor de la columna descriptiva si se pide).
+    Retorna {(nombre_serie, periodo_id): total}.
+    """
+    dim_seccion = DimSeccion.objects.filter(rem__codigo=hoja, codigo=seccion).only("pk").first()
+    if dim_seccion is None or not periodos:
+        return {}
+
+    hechos = hechos_activos().filter(
+        seccion=dim_seccion,
+        columna__nombre__in=medidas,
+        periodo_id__in=[p.pk for p in periodos],
+    )
+
+    campos = ["periodo_id"]
+    if por:
+        hechos = hechos.annotate(valor_desc=KeyTextTransform(por, "fila_descriptiva__valores"))
+        campos.append("valor_desc")
+
+    totales = {}
+    for fila in hechos.values(*campos).annotate(total=Sum("valor")).order_by():
+        nombre = (a_texto(fila["valor_desc"]) or SIN_DATO) if por else "Total"
+        clave = (nombre, fila["periodo_id"])
+        totales[clave] = totales.get(clave, 0) + (fila["total"] or 0)
+    return totales
+
+
+def calcular_serie(hoja, seccion, medida=None, por=None, desde=None, hasta=None,
+                   max_series=SERIES_POR_DEFECTO) -> dict:
+    """
+    - medida: columna numérica de la sección; por defecto la medida
+      principal (TOTAL, o la suma del grupo que reparte el total).
+    - por: columna descriptiva para separar series (opcional).
+    - desde / hasta: (anio, mes).
+    - max_series: series con mayor total; el resto se suma en "Otros".
+
+    Retorna:
+      {"hoja", "seccion", "medida", "medidas", "por",
+       "periodos": [{"id", "etiqueta"}], "series": [{"nombre", "valores", "total"}]}
+    """
+    definicion = definicion_reporte(hoja, seccion)
+    if definicion is None:
+        raise ErrorSerie(f"REM {hoja} sección {seccion} no tiene estructura definida.")
+
+    if medida:
+        if medida not in definicion.medidas:
+            raise ErrorSerie(f"'{medida}' no es una columna numérica de {definicion.hoja}-{definicion.seccion}.")
+        medidas = [medida]
+    else:
+        medidas = definicion.medidas_principales
+
+    if por and por not in definicion.descriptivas:
+        raise ErrorSerie(f"'{por}' no es una columna descriptiva de {definicion.hoja}-{definicion.seccion}.")
+
+    max_series = max(1, min(int(max_series), MAXIMO_SERIES))
+    periodos = periodos_en_rango(desde, hasta)
+
+    clave = clave_periodos(
+        "serie", [p.pk for p in periodos],
+        definicion.hoja, definicion.seccion, ",".join(medidas), por or "", max_series,
+    )
+    return obtener(
+        "serie",
+        clave,
+        lambda: _calcular_serie(definicion, medida, medidas, por, max_series, periodos),
+        CACHE_SERIES_SEGUNDOS,
+    )
+
+
+def _calcular_serie(definicion, medida, medidas, por, max_series, periodos) -> dict:
+    totales = _agrupar(definicion.hoja, definicion.seccion, medidas, por, periodos)
+
+    nombres = {}
+    for (nombre, _), total in totales.items():
+        nombres[nombre] = nombres.get(nombre, 0) + total
+    ordenados = sorted(nombres, key=lambda n: (-nombres[n], n))
+
+    principales = ordenados[:max_series]
+    resto = set(ordenados[max_series:])
+
+    def valores_de(nombres_serie):
+        return [
+            a_numero(sum(totales.get((n, p.pk), 0) for n in nombres_serie))
+            for p in periodos
+        ]
+
+    series = [{"nombre": n, "valores": valores_de([n])} for n in principales]
+    if resto:
+        series.append({"nombre": OTROS, "valores": valores_de(resto)})
+    for serie in series:
+        serie["total"] = sum(serie["valores"])
+
+    resultado = {
+        "hoja": definicion.hoja,
+        "seccion": definicion.seccion,
+        "medida": medida or "",
+        "medidas": medidas,
+        "por": por or "",
+        "periodos": [{"id": p.pk, "etiqueta": f"{p.anio}-{p.mes:02d}"} for p in periodos],
+        "series": series,
+    }
+    return resultado
@@ -144,11 +144,14 @@ def obtener_tabla_bd(rem: str, seccion: str, estructuras: dict):
     return estructuras[rem][seccion]["tabla_bd"]
 
 
-def procesar_y_guardar(nombre_archivo: str):
+def procesar_y_guardar(nombre_archivo: str, progreso=None):
     """
     1. Corre el ETL sobre el Excel consolidado.
     2. Inserta cada fila en la tabla RAW correspondiente.
     3. Devuelve un resumen.
+
+    - progreso: ReporteProgreso opcional (rem/progreso.py) para publicar
+      el avance mientras corre (lo usa etl_guardar_raw.py).
     """
     ruta_excel = os.path.join(settings.MEDIA_ROOT, "rem_uploads", nombre_archivo)
 
@@ -156,7 +159,7 @@ def procesar_y_guardar(nombre_archivo: str):
         raise FileNotFoundError(f"No se encontró el archivo: {ruta_excel}")
 
     # 1) Ejecutar ETL (leer Excel + mapeo)
-    registros = procesar_archivo_con_mapeo(ruta_excel)
+    registros = procesar_archivo_con_mapeo(ruta_excel, progreso=progreso)
 
     # 2) Cargar estructura maestro (tablas y columnas reales)
     ruta_maestro = os.path.join(settings.BASE_DIR, "rem", "rem_structures.json")
@@ -164,6 +167,10 @@ def procesar_y_guardar(nombre_archivo: str):
         estructuras = json.load(f)
 
     resumen = {}
+    filas_insertadas = 0
+
+    if progreso:
+        progreso.etapa("guardado")
 
     # 3) Insertar cada registro
     for reg in registros:
@@ -188,5 +195,9 @@ def procesar_y_guardar(nombre_archivo: str):
         insertar_fila_raw(tabla, fila_sql)
 
         resumen[(rem, seccion)] = resumen.get((rem, seccion), 0) + 1
+        filas_insertadas += 1
+
+    if progreso:
+        progreso.terminar(filas_escritas=filas_insertadas)
 
     return registros, resumen
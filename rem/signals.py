@@ -0,0 +1,45 @@
+# rem/signals.py
+"""
+Señales que mantienen la versión de datos de cada período
+(rem/versiones.py), y lo que se invalida cuando esa versión cambia:
+exportaciones en disco. Las claves de la caché compartida ya llevan la
+versión (rem/cache.py), no hay que invalidarlas.
+
+RegistroREM solo escucha post_save: conectar post_delete obligaría a
+Django a borrar registro por registro (sin "fast delete") al reprocesar.
+Los borrados de registros ocurren siempre junto a un save del ArchivoREM
+o con una llamada explícita a incrementar_version.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .exportaciones import invalidar_periodo
+from .models import ArchivoREM, DimPeriodo, RegistroREM
+from .versiones import datos_periodo_modificados, incrementar_version
+
+
+@receiver(post_save, sender=ArchivoREM)
+@receiver(post_delete, sender=ArchivoREM)
+def archivo_rem_modificado(sender, instance, **kwargs):
+    incrementar_version(instance.periodo_id)
+
+
+@receiver(post_save, sender=RegistroREM)
+def registro_rem_modificado(sender, instance, **kwargs):
+    periodo_id = (
+        ArchivoREM.objects
+        .filter(pk=instance.archivo_id)
+        .values_list("periodo_id", flat=True)
+        .first()
+    )
+    incrementar_version(periodo_id)
+
+
+@receiver(post_save, sender=DimPeriodo)
+def periodo_modificado(sender, instance, **kwargs):
+    incrementar_version(instance.pk)
+
+
+@receiver(datos_periodo_modificados)
+def borrar_exportaciones_periodo(sender, periodo_id, **kwargs):
+    invalidar_periodo(periodo_id)
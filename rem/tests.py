@@ -1,3 +1,229 @@
-from django.test import TestCase
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+from django.db import DatabaseError, connection, transaction
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from .columnas import _descubrir_python, _descubrir_sql
+from .estrella import _a_decimal
+from .models import ArchivoREM, DimPeriodo, RegistroREM
+from .periodos import (
+    ESTADO_CARGADO_NO_PROCESADO,
+    ESTADO_COMPLETO,
+    ESTADO_PARCIAL,
+    ESTADO_SIN_ARCHIVOS,
+    calcular_estado_periodos,
+)
+from .pivote import _conjuntos, _pivote_python, _pivote_sql
+from .reportes import _alerta_plazo
+
+ES_POSTGRES = connection.vendor == "postgresql"
+
+
+# ============================================================
+# DATOS DE PRUEBA
+# ============================================================
+def asegurar_dim_periodo():
+    """
+    DimPeriodo es managed=False (la tabla la crea el ETL en cesfam_core):
+    en la BD de pruebas puede no existir, y entonces se crea aquí (queda
+    hasta que se destruye la BD de pruebas).
+    """
+    try:
+        with transaction.atomic():
+            DimPeriodo.objects.exists()
+    except DatabaseError:
+        with connection.schema_editor() as editor:
+            editor.create_model(DimPeriodo)
+
+
+def crear_periodo(id_periodo, anio, mes, descripcion=None):
+    return DimPeriodo.objects.create(
+        id_periodo=id_periodo,
+        anio=anio,
+        mes=mes,
+        descripcion=descripcion,
+        creado_en=timezone.now(),
+    )
+
+
+def crear_archivo(periodo, nombre, procesado=False, activo=True):
+    return ArchivoREM.objects.create(
+        nombre_original=nombre,
+        archivo=f"rem_uploads/{nombre}",
+        periodo=periodo,
+        procesado=procesado,
+        activo=activo,
+    )
+
+
+def crear_registros(archivo, hoja, seccion, filas):
+    return RegistroREM.objects.bulk_create([
+        RegistroREM(archivo=archivo, hoja=hoja, seccion=seccion, fila=i, datos=datos)
+        for i, datos in enumerate(filas, start=1)
+    ])
+
+
+class ConDimPeriodo(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Antes de super(): ahí se abre la transacción de la clase y corre setUpTestData
+        asegurar_dim_periodo()
+        super().setUpClass()
+
+
+# ============================================================
+# ESTADO DE PERÍODOS (rem/periodos.py)
+# ============================================================
+class EstadoPeriodosTests(ConDimPeriodo):
+    @classmethod
+    def setUpTestData(cls):
+        completo = crear_periodo(202501, 2025, 1)
+        crear_archivo(completo, "ene_1.xlsx", procesado=True)
+        crear_archivo(completo, "ene_2.xlsx", procesado=True)
+        crear_archivo(completo, "ene_inactivo.xlsx", activo=False)
+
+        parcial = crear_periodo(202502, 2025, 2)
+        crear_archivo(parcial, "feb_1.xlsx", procesado=True)
+        crear_archivo(parcial, "feb_2.xlsx")
+
+        cargado = crear_periodo(202503, 2025, 3)
+        crear_archivo(cargado, "mar_1.xlsx")
+
+        crear_periodo(202504, 2025, 4)
+        crear_periodo(202412, 2024, 12, descripcion="[INACTIVO]")
+
+    def test_una_consulta_para_todos_los_periodos(self):
+        with self.assertNumQueries(1):
+            estados = calcular_estado_periodos()
+
+        self.assertEqual(
+            [(e["periodo"].pk, e["estado"], e["total_archivos"], e["procesados"], e["porcentaje"]) for e in estados],
+            [
+                (202504, ESTADO_SIN_ARCHIVOS, 0, 0, 0),
+                (202503, ESTADO_CARGADO_NO_PROCESADO, 1, 0, 0),
+                (202502, ESTADO_PARCIAL, 2, 1, 50),
+                (202501, ESTADO_COMPLETO, 2, 2, 100),
+            ],
+        )
+
+
+# ============================================================
+# ESQUEMA ESTRELLA (rem/estrella.py)
+# ============================================================
+class ValorHechoTests(SimpleTestCase):
+    def test_numeros(self):
+        self.assertEqual(_a_decimal(3), Decimal(3))
+        self.assertEqual(_a_decimal(2.5), Decimal("2.5"))
+        self.assertEqual(_a_decimal(Decimal("-1.23456")), Decimal("-1.2346"))
+        self.assertEqual(_a_decimal(9_999_999_999_999_999), Decimal("9999999999999999"))
+
+    def test_no_numericos(self):
+        for valor in (None, True, "3", [1]):
+            with self.subTest(valor=valor):
+                self.assertIsNone(_a_decimal(valor))
+
+    def test_fuera_de_rango_de_hecho_rem(self):
+        # numeric(20, 4): NaN, infinito y |x| >= 1e16 (también tras redondear) no se cargan
+        for valor in (
+            float("nan"), float("inf"), Decimal("-Infinity"), Decimal("NaN"),
+            10 ** 16, -1e16, 1e300, Decimal("9999999999999999.99995"),
+        ):
+            with self.subTest(valor=valor):
+                self.assertIsNone(_a_decimal(valor))
+
+
+# ============================================================
+# DESCUBRIMIENTO DE COLUMNAS (rem/columnas.py)
+# ============================================================
+class DescubrirColumnasTests(ConDimPeriodo):
+    @classmethod
+    def setUpTestData(cls):
+        periodo = crear_periodo(202501, 2025, 1)
+        archivo = crear_archivo(periodo, "sin_estructura.xlsx", procesado=True)
+        crear_registros(archivo, "ZZ", "X", [
+            {"a": "glosa", "b": None, "c": 5},
+            {"b": 7, "c": "texto", "d": "otra"},
+            {"e": True},
+            {"a": 1, "f": None},
+        ])
+        cls.qs = RegistroREM.objects.filter(archivo=archivo, hoja="ZZ", seccion="X")
+
+    def test_python(self):
+        # Tipo según el primer valor no nulo, en orden de aparición; sin "f"
+        self.assertEqual(_descubrir_python(self.qs), (["a", "d"], ["c", "b", "e"]))
+
+    @skipUnless(ES_POSTGRES, "jsonb_each WITH ORDINALITY requiere PostgreSQL")
+    def test_sql_igual_a_python(self):
+        self.assertEqual(_descubrir_sql(self.qs), _descubrir_python(self.qs))
+
+
+# ============================================================
+# PIVOTE (rem/pivote.py)
+# ============================================================
+class PivoteTests(ConDimPeriodo):
+    FILAS = ["tipo_de_control"]
+    COLUMNAS = ["profesional"]
+    MEDIDAS = ["total", "rango_etario_menos_de_4_anos"]
+
+    @classmethod
+    def setUpTestData(cls):
+        enero = crear_periodo(202501, 2025, 1)
+        febrero = crear_periodo(202502, 2025, 2)
+        cls.periodos = [enero.pk, febrero.pk]
+
+        crear_registros(crear_archivo(enero, "ene.xlsx", procesado=True), "A01", "A", [
+            {"tipo_de_control": "Prenatal", "profesional": "Matrona", "total": 4, "rango_etario_menos_de_4_anos": 1},
+            {"tipo_de_control": "Prenatal", "profesional": "Médico", "total": 2.5},
+            {"tipo_de_control": "Postparto", "profesional": "Matrona", "total": "3", "rango_etario_menos_de_4_anos": None},
+            {"tipo_de_control": None, "profesional": "Matrona", "total": True},
+        ])
+        crear_registros(crear_archivo(febrero, "feb.xlsx", procesado=True), "A01", "A", [
+            {"tipo_de_control": "Prenatal", "profesional": "Matrona", "total": 6, "rango_etario_menos_de_4_anos": 2},
+            {"tipo_de_control": 7, "total": 1},
+        ])
+        crear_registros(crear_archivo(febrero, "feb_viejo.xlsx", activo=False), "A01", "A", [
+            {"tipo_de_control": "Prenatal", "profesional": "Matrona", "total": 100},
+        ])
+
+    def _grupos(self, calcular, solo_activos=True):
+        return calcular("A01", "A", self.FILAS, self.COLUMNAS, self.MEDIDAS, self.periodos, solo_activos)
+
+    def test_python(self):
+        resultados = self._grupos(_pivote_python)
+        self.assertEqual(set(resultados), set(_conjuntos(1, 1)))
+
+        celdas = resultados[(1, True)]
+        self.assertEqual(celdas[(("Prenatal",), ("Matrona",))], [Decimal(10), Decimal(3)])
+        self.assertEqual(celdas[(("Prenatal",), ("Médico",))], [Decimal("2.5"), Decimal(0)])
+        # Texto y booleanos no suman; dimensiones nulas o faltantes → ""
+        self.assertEqual(celdas[(("Postparto",), ("Matrona",))], [Decimal(0), Decimal(0)])
+        self.assertEqual(celdas[(("",), ("Matrona",))], [Decimal(0), Decimal(0)])
+        self.assertEqual(celdas[(("7",), ("",))], [Decimal(1), Decimal(0)])
+
+        self.assertEqual(resultados[(0, False)][((), None)], [Decimal("13.5"), Decimal(3)])
+
+    @skipUnless(ES_POSTGRES, "GROUPING SETS sobre jsonb requiere PostgreSQL")
+    def test_sql_igual_a_python(self):
+        for solo_activos in (True, False):
+            with self.subTest(solo_activos=solo_activos):
+                self.assertEqual(
+                    self._grupos(_pivote_sql, solo_activos),
+                    self._grupos(_pivote_python, solo_activos),
+                )
+
+
+# ============================================================
+# REPORTE A01 - SECCIÓN A (rem/reportes.py)
+# ============================================================
+class AlertaPlazoTests(SimpleTestCase):
+    def test_cuenta_dias_en_hora_local(self):
+        # 2025-02-08 02:00 UTC es todavía 2025-02-07 en Santiago: quedan 3 días para el 10
+        ahora = datetime(2025, 2, 8, 2, 0, tzinfo=dt_timezone.utc)
+        with mock.patch("django.utils.timezone.now", return_value=ahora):
+            alerta = _alerta_plazo(SimpleNamespace(anio=2025, mes=1))
+        self.assertEqual(alerta, "Quedan 3 día(s) para el cierre estimado de consolidación del período.")
 
-# Create your tests here.
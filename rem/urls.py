@@ -46,6 +46,15 @@ urlpatterns = [
     # ===== ARCHIVOS REM =====
     path('subir/', views.subir_excel, name='subir_excel'),             # /subir/
 
+    # Carga por partes (archivos grandes, reanudable)
+    path('cargas/', views.iniciar_carga_parcial, name='iniciar_carga_parcial'),
+    path('cargas/<uuid:id_carga>/', views.carga_parcial, name='carga_parcial'),
+    path(
+        'cargas/<uuid:id_carga>/finalizar/',
+        views.finalizar_carga_parcial,
+        name='finalizar_carga_parcial'
+    ),
+
     path('archivos/', views.lista_archivos, name='lista_archivos'),    # /archivos/
 
     path(
@@ -54,6 +63,17 @@ urlpatterns = [
         name='procesar_archivo_generico'
     ),
 
+    path(
+        'tareas/<int:tarea_id>/',
+        views.estado_tarea,
+        name='estado_tarea'
+    ),
+
+    path('progreso/<str:clave>/', views.progreso_json, name='progreso_json'),
+    path('progreso/<str:clave>/stream/', views.progreso_stream, name='progreso_stream'),
+
+    path('estado/cache/', views.estado_cache, name='estado_cache'),
+
     path(
         'archivo/<int:archivo_id>/registros/',
         views.ver_registros_archivo,
@@ -106,6 +126,11 @@ urlpatterns = [
         views.ver_detalle_rem,
         name='ver_detalle_rem'
     ),
+    path(
+        'periodos/<int:periodo_id>/rem/<str:hoja>/<str:seccion>/filas/',
+        views.filas_detalle_rem,
+        name='filas_detalle_rem'
+    ),
 
     # ===== REPORTES =====
     path("reportes/", views.reportes_home, name="reportes_home"),
@@ -114,6 +139,43 @@ urlpatterns = [
         views.reporte_a01_seccion_a,
         name="reporte_a01_seccion_a",
     ),
+    path(
+        "reportes/<int:periodo_id>/<str:hoja>/<str:seccion>/",
+        views.reporte_seccion_periodo,
+        name="reporte_seccion_periodo",
+    ),
+    path(
+        "reportes/series/<str:hoja>/<str:seccion>/",
+        views.serie_temporal,
+        name="serie_temporal",
+    ),
+    path(
+        "reportes/pivote/<str:hoja>/<str:seccion>/",
+        views.pivote_seccion,
+        name="pivote_seccion",
+    ),
+    path("reportes/consolidados/", views.lista_consolidados, name="lista_consolidados"),
+    path("reportes/consolidados/nuevo/", views.crear_consolidado_vista, name="crear_consolidado"),
+    path(
+        "reportes/consolidados/<int:id_consolidado>/",
+        views.ver_consolidado,
+        name="ver_consolidado",
+    ),
+    path(
+        "reportes/consolidados/<int:id_consolidado>/eliminar/",
+        views.eliminar_consolidado,
+        name="eliminar_consolidado",
+    ),
+    path(
+        "reportes/consolidados/<int:id_consolidado>/excel/",
+        views.exportar_consolidado_excel,
+        name="exportar_consolidado_excel",
+    ),
+    path(
+        "reportes/consolidados/<int:id_consolidado>/pdf/",
+        views.exportar_consolidado_pdf,
+        name="exportar_consolidado_pdf",
+    ),
     path(
     "periodos/<int:periodo_id>/reporte/a01/seccion-a/excel/",
     views.exportar_a01_seccion_a_excel,
@@ -124,5 +186,31 @@ urlpatterns = [
         views.exportar_a01_seccion_a_pdf,
          name="exportar_a01_seccion_a_pdf",
     ),
+    path(
+        "periodos/<int:periodo_id>/reporte/libro/",
+        views.descargar_libro_periodo,
+        name="descargar_libro_periodo",
+    ),
+    path(
+        "periodos/<int:periodo_id>/exportar/registros/<str:formato>/",
+        views.exportar_registros_periodo,
+        name="exportar_registros_periodo",
+    ),
+    path(
+        "periodos/<int:periodo_id>/reporte/libro/pdf/",
+        views.descargar_pdf_periodo,
+        name="descargar_pdf_periodo",
+    ),
+    # Debe ir después de las rutas A01 / sección A (mismo prefijo)
+    path(
+        "periodos/<int:periodo_id>/reporte/<str:hoja>/<str:seccion>/excel/",
+        views.exportar_seccion_excel,
+        name="exportar_seccion_excel",
+    ),
+    path(
+        "periodos/<int:periodo_id>/reporte/<str:hoja>/<str:seccion>/pdf/",
+        views.exportar_seccion_pdf,
+        name="exportar_seccion_pdf",
+    ),
     path("backups/", backup_view, name="backup_view"),
 ]
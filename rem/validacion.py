@@ -0,0 +1,124 @@
+# rem/validacion.py
+"""
+Validación rápida de estructura REM SIN parsear el Excel.
+
+Un .xlsx es un ZIP. Para saber qué hojas tiene basta leer
+xl/workbook.xml (unos pocos KB), sin cargar shared strings, estilos ni
+celdas como hace openpyxl.load_workbook. El parseo completo queda para
+el procesamiento (worker).
+
+Configuración (settings.py):
+- REM_HOJAS_REQUERIDAS       → hojas que deben existir (por defecto ["A01"])
+- REM_MARCADORES_REQUERIDOS  → textos que deben aparecer en el libro,
+  ej: ["SECCIÓN A"]. Se buscan en xl/sharedStrings.xml en streaming
+  (memoria constante) y solo si la lista no está vacía.
+"""
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+from django.conf import settings
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+def hojas_requeridas():
+    return list(getattr(settings, "REM_HOJAS_REQUERIDAS", ["A01"]))
+
+
+def marcadores_requeridos():
+    return list(getattr(settings, "REM_MARCADORES_REQUERIDOS", []))
+
+
+def _normalizar_marcador(texto: str) -> str:
+    return (texto or "").strip().upper().replace("SECCION", "SECCIÓN")
+
+
+def codigo_hoja(nombre: str) -> str:
+    """
+    Código REM de una hoja ("REM A01" → "A01"), con la misma regla que usa
+    el ETL (rem/etl.py). Retorna "" si el nombre no contiene un código.
+    """
+    m = re.search(r"A[0-9]+[A-Z]?", (nombre or "").strip().upper())
+    return m.group(0) if m else ""
+
+
+def leer_nombres_hojas(zf: zipfile.ZipFile) -> list:
+    """Nombres de hojas desde xl/workbook.xml (en el orden del libro)."""
+    nombres = []
+    with zf.open("xl/workbook.xml") as f:
+        for _evento, elem in iterparse(f):
+            if elem.tag == f"{NS_MAIN}sheet":
+                nombres.append(elem.get("name", ""))
+            elem.clear()
+    return nombres
+
+
+def buscar_marcadores(zf: zipfile.ZipFile, marcadores) -> set:
+    """
+    Retorna el subconjunto de 'marcadores' que aparece en sharedStrings.xml.
+    Se detiene apenas los encuentra todos.
+    """
+    pendientes = {_normalizar_marcador(m) for m in marcadores}
+    encontrados = set()
+
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return encontrados
+
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _evento, elem in iterparse(f):
+            if elem.tag == f"{NS_MAIN}t" and elem.text:
+                texto = _normalizar_marcador(elem.text)
+                for marcador in list(pendientes):
+                    if texto.startswith(marcador):
+                        pendientes.discard(marcador)
+                        encontrados.add(marcador)
+                if not pendientes:
+                    break
+            elem.clear()
+
+    return encontrados
+
+
+def validar_estructura_rem(archivo):
+    """
+    Valida un archivo subido (UploadedFile o ruta) como REM.
+
+    Retorna None si es válido, o un mensaje de error (sin el nombre del
+    archivo, para que la vista lo arme). El puntero del archivo queda al
+    inicio para poder guardarlo después.
+    """
+    try:
+        with zipfile.ZipFile(archivo) as zf:
+            presentes = set()
+            for nombre in leer_nombres_hojas(zf):
+                presentes.add(nombre.strip().upper())
+                presentes.add(codigo_hoja(nombre))
+            presentes.discard("")
+
+            faltantes = [
+                h for h in hojas_requeridas()
+                if (codigo_hoja(h) or h.strip().upper()) not in presentes
+            ]
+            if faltantes:
+                return f"no corresponde a un REM válido (falta hoja {', '.join(faltantes)})."
+
+            marcadores = marcadores_requeridos()
+            if marcadores:
+                encontrados = buscar_marcadores(zf, marcadores)
+                no_encontrados = [
+                    m for m in marcadores if _normalizar_marcador(m) not in encontrados
+                ]
+                if no_encontrados:
+                    return (
+                        "no corresponde a un REM válido "
+                        f"(no se encontró {', '.join(no_encontrados)})."
+                    )
+    except (zipfile.BadZipFile, KeyError, OSError, SyntaxError):
+        # SyntaxError cubre xml.etree.ElementTree.ParseError
+        return "no pudo ser leído y fue ignorado."
+    finally:
+        if hasattr(archivo, "seek"):
+            archivo.seek(0)
+
+    return None
@@ -0,0 +1,159 @@
+# rem/versiones.py
+"""
+Versión de los datos de cada período, para GET condicional.
+
+VersionDatosPeriodo.version sube cada vez que cambian los ArchivoREM o
+RegistroREM de un período:
+- Señales (rem/signals.py) para save/delete de ArchivoREM, RegistroREM y
+  DimPeriodo hechos con el ORM.
+- Llamadas explícitas a incrementar_version en los caminos en lote que
+  no emiten señales (bulk_create, COPY, INSERT ... SELECT).
+
+Las vistas de detalle, reportes y exportaciones se decoran con
+@condicional_periodo: emiten ETag y Last-Modified a partir de esa fila y
+responden 304 a If-None-Match / If-Modified-Since sin tocar registro_rem.
+Las que además muestran algo que depende de la fecha (ej: días para el
+cierre en reporte_a01_seccion_a) usan @condicional_periodo_diario.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max, Sum
+from django.dispatch import Signal
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .models import VersionDatosPeriodo
+
+
+# Se emite (al confirmar la transacción) cada vez que sube la versión de
+# un período; lo escuchan quienes guardan derivados fuera de la BD
+# (ej: exportaciones en disco, ver rem/signals.py). Argumento: periodo_id.
+datos_periodo_modificados = Signal()
+
+
+def incrementar_version(periodo_id):
+    """Marca como modificados los datos del período (un UPDATE)."""
+    if not periodo_id:
+        return
+
+    _subir_version(periodo_id)
+    transaction.on_commit(
+        lambda: datos_periodo_modificados.send(sender=VersionDatosPeriodo, periodo_id=periodo_id)
+    )
+
+
+def _subir_version(periodo_id):
+    ahora = timezone.now()
+    actualizados = (
+        VersionDatosPeriodo.objects
+        .filter(periodo_id=periodo_id)
+        .update(version=F("version") + 1, actualizado_en=ahora)
+    )
+    if not actualizados:
+        _, creada = VersionDatosPeriodo.objects.get_or_create(
+            periodo_id=periodo_id,
+            defaults={"version": 1, "actualizado_en": ahora},
+        )
+        if not creada:
+            # otro proceso la creó entre medio
+            _subir_version(periodo_id)
+
+
+def incrementar_versiones(periodo_ids):
+    for periodo_id in sorted({p for p in periodo_ids if p}):
+        incrementar_version(periodo_id)
+
+
+def version_periodo(periodo_id):
+    """Retorna (version, actualizado_en); (0, None) si nunca cambió."""
+    fila = (
+        VersionDatosPeriodo.objects
+        .filter(periodo_id=periodo_id)
+        .values_list("version", "actualizado_en")
+        .first()
+    )
+    return fila or (0, None)
+
+
+def generacion_datos() -> str:
+    """
+    Firma de las versiones de todos los períodos, en una consulta: la
+    suma de versiones sube con cada incrementar_version y la última
+    actualizado_en distingue un borrado de período de un estado anterior.
+    """
+    agregado = VersionDatosPeriodo.objects.aggregate(total=Sum("version"), ultima=Max("actualizado_en"))
+    ultima = int(agregado["ultima"].timestamp() * 1_000_000) if agregado["ultima"] else 0
+    return f"{agregado['total'] or 0}-{ultima}"
+
+
+def versiones_periodos(periodo_ids) -> dict:
+    """{periodo_id: version} de varios períodos en una consulta (0 si nunca cambió)."""
+    periodo_ids = list(periodo_ids)
+    versiones = dict.fromkeys(periodo_ids, 0)
+    versiones.update(
+        VersionDatosPeriodo.objects
+        .filter(periodo_id__in=periodo_ids)
+        .values_list("periodo_id", "version")
+    )
+    return versiones
+
+
+# ============================================================
+# GET CONDICIONAL
+# ============================================================
+def _version_en_request(request, periodo_id):
+    """etag_func y last_modified_func se llaman por separado: una sola consulta."""
+    versiones = request.__dict__.setdefault("_versiones_periodo", {})
+    if periodo_id not in versiones:
+        versiones[periodo_id] = version_periodo(periodo_id)
+    return versiones[periodo_id]
+
+
+def etag_periodo(request, periodo_id, *args, **kwargs):
+    version, _ = _version_en_request(request, periodo_id)
+    # El HTML cambia según el usuario (menú, permisos) y con cada despliegue
+    despliegue = getattr(settings, "REM_ETAG_DESPLIEGUE", "")
+    usuario = request.user.pk if request.user.is_authenticated else 0
+    return f'W/"rem-{periodo_id}-{version}-{usuario}-{despliegue}"'
+
+
+def ultima_modificacion_periodo(request, periodo_id, *args, **kwargs):
+    _, actualizado_en = _version_en_request(request, periodo_id)
+    return actualizado_en
+
+
+def etag_periodo_diario(request, periodo_id, *args, **kwargs):
+    """etag_periodo + fecha local de hoy: cambia a medianoche."""
+    etag = etag_periodo(request, periodo_id, *args, **kwargs)
+    return f'{etag[:-1]}-{timezone.localdate().isoformat()}"'
+
+
+def ultima_modificacion_periodo_diaria(request, periodo_id, *args, **kwargs):
+    """La más reciente entre el cambio de datos y el inicio del día local."""
+    inicio_dia = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    actualizado_en = ultima_modificacion_periodo(request, periodo_id, *args, **kwargs)
+    return max(actualizado_en, inicio_dia) if actualizado_en else inicio_dia
+
+
+def _condicional(vista, etag_func, last_modified_func):
+    vista = condition(etag_func=etag_func, last_modified_func=last_modified_func)(vista)
+    return cache_control(private=True, no_cache=True)(vista)
+
+
+def condicional_periodo(vista):
+    """
+    ETag / Last-Modified por versión del período. La vista decorada debe
+    recibir periodo_id. 'no-cache' obliga al navegador a revalidar siempre
+    (la respuesta barata es el 304); 'private' evita proxies compartidos.
+    """
+    return _condicional(vista, etag_periodo, ultima_modificacion_periodo)
+
+
+def condicional_periodo_diario(vista):
+    """
+    Como condicional_periodo, pero la respuesta vale solo por el día: para
+    vistas que muestran algo calculado con la fecha actual (ej: alerta de
+    plazo de cierre), que no debe quedar congelado en un 304.
+    """
+    return _condicional(vista, etag_periodo_diario, ultima_modificacion_periodo_diaria)
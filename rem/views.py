@@ -1,32 +1,75 @@
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from urllib.parse import urlencode
+from django.views.decorators.http import require_POST
 from django.core.paginator import Paginator
 from django.db import transaction
 from django.utils import timezone
-from datetime import date
-from collections import Counter, defaultdict
-import os
-from decimal import Decimal
+from collections import defaultdict
+import json
+import re
+import time
 from django.db.models import Count
 
-from io import BytesIO
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib import colors
 
 
 from django.contrib.auth.decorators import login_required
-from rem.decorators import admin_required
+from rem.decorators import admin_required, is_admin_user
 
 from openpyxl import Workbook
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Alignment, Font, Border, Side
 
-from .models import DimPeriodo, ArchivoREM, RegistroREM, AuditLog
-from .etl import procesar_archivo_con_mapeo
+from .models import (
+    DimPeriodo, ArchivoREM, RegistroREM, AuditLog, TareaREM, ProgresoREM, CargaParcial, ConsolidadoREM,
+)
+from .estrella import cargar_hechos_archivo
+from .ingesta import procesar_archivo_rem
+from .cola import encolar_libro_periodo, encolar_procesamiento
+from .progreso import clave_archivo, progreso_a_dict
+from .columnas import alcance_archivo, alcance_periodo, columnas_seccion
+from .paginacion import PaginadorKeyset, total_registros
+from .versiones import condicional_periodo, condicional_periodo_diario, incrementar_version
+from .cache import clave_global, clave_periodo, estadisticas, obtener
+from .periodos import calcular_estado_periodos, periodos_activos, resumen_estados
+from .rem_structures import bloques_header, pretty_col_name
+from .reportes import (
+    RANGOS_A01_A,
+    RANGOS_A01_A_DICT,
+    a_entero,
+    calcular_reporte_a01_seccion_a,
+    con_alerta_plazo,
+    filas_proyectadas,
+    reporte_seccion,
+)
+from .series import SERIES_POR_DEFECTO, ErrorSerie, calcular_serie, leer_mes
+from .pivote import ErrorPivote, calcular_pivote
+from .exportar import CONTENT_TYPE_XLSX, libro_seccion, respuesta_archivo
+from .exportar_pdf import CONTENT_TYPE_PDF, pdf_seccion
+from .exportaciones import exportacion
+from .exportar_registros import CONTENT_TYPE_GZIP, FORMATOS, nombre_archivo, volcado
+from .libro_periodo import generar_libro_periodo, libro_disponible
+from .consolidados import (
+    ErrorConsolidado,
+    crear_consolidado,
+    filas_consolidado,
+    refrescar_consolidado,
+    tabla_consolidado,
+)
+from .cargas import cargar_archivos, tamano_maximo_formulario
+from .cargas_parciales import (
+    ErrorCargaParcial,
+    cancelar_carga,
+    carga_a_dict,
+    finalizar_carga,
+    iniciar_carga,
+    recibir_bloque,
+    tamano_maximo as tamano_maximo_partes,
+)
 from rem.auditoria import registrar_auditoria
 
-from openpyxl import load_workbook
 from django.contrib import messages
 
 
@@ -45,26 +88,7 @@ except ImportError:
 # ============================================================
 # METADATOS: RANGOS / HEADERS ESPECIALES (REM A01 - SECCIÓN A)
 # ============================================================
-# RANGOS etarios usados para reportes, export Excel y export PDF.
-RANGOS_A01_A = [
-    ("rango_etario_menos_de_4_anos", "Menos de 4 años"),
-    ("rango_etario_5_9_anos", "5 - 9 años"),
-    ("rango_etario_10_14_anos", "10 - 14 años"),
-    ("rango_etario_15_19_anos", "15 - 19 años"),
-    ("rango_etario_20_24_anos", "20 - 24 años"),
-    ("rango_etario_25_29_anos", "25 - 29 años"),
-    ("rango_etario_30_34_anos", "30 - 34 años"),
-    ("rango_etario_35_39_anos", "35 - 39 años"),
-    ("rango_etario_40_44_anos", "40 - 44 años"),
-    ("rango_etario_45_49_anos", "45 - 49 años"),
-    ("rango_etario_50_54_anos", "50 - 54 años"),
-    ("rango_etario_55_59_anos", "55 - 59 años"),
-    ("rango_etario_60_64_anos", "60 - 64 años"),
-    ("rango_etario_65_69_anos", "65 - 69 años"),
-    ("rango_etario_70_74_anos", "70 - 74 años"),
-    ("rango_etario_75_79_anos", "75 - 79 años"),
-    ("rango_etario_80_y_mas_anos", "80 y más años"),
-]
+# RANGOS etarios (RANGOS_A01_A / RANGOS_A01_A_DICT) viven en rem/reportes.py
 
 # Nombres legibles para columnas especiales de A01 / Sección A
 # (Los rangos etarios se resuelven desde RANGOS_A01_A_DICT)
@@ -92,9 +116,6 @@ HEADERS_A01_A = {
     "adolescente_acude_a_control_mac_con_pareja": "Adolescente acude a control MAC con pareja",
 }
 
-# Dict rápido (key -> label) para resolver nombres de rangos etarios
-RANGOS_A01_A_DICT = {k: v for k, v in RANGOS_A01_A}
-
 # Nombres bonitos para mostrar en combos / títulos de REM
 REM_TITULOS_HOJA = {
     "A01": "REM-A01. CONTROLES DE SALUD",
@@ -130,8 +151,11 @@ def home(request):
     """
     Página principal del sistema.
     Normalmente aquí se muestran accesos rápidos a módulos (subir REM, periodos, reportes, auditoría, etc.).
+    La tarjeta de períodos muestra cuántos hay en cada estado de consolidación.
     """
-    return render(request, "home.html")
+    return render(request, "home.html", {
+        "resumen_periodos": resumen_estados(calcular_estado_periodos()),
+    })
 
 
 # ========================
@@ -147,11 +171,8 @@ def lista_periodos(request):
     Nota: tu sistema usa "borrado lógico" para períodos, por eso se marca [INACTIVO]
     en vez de eliminar registros.
     """
-    periodos_activos = (
-        DimPeriodo.objects
-        .exclude(descripcion__icontains='[INACTIVO]')
-        .order_by('-anio', '-mes')
-    )
+    # Activos con su estado de consolidación (una sola consulta)
+    periodos_activos = calcular_estado_periodos()
 
     periodos_inactivos = (
         DimPeriodo.objects
@@ -352,14 +373,16 @@ def subir_excel(request):
     """
     Sube uno o varios archivos REM (Excel) y los asocia a un DimPeriodo.
 
-    Validaciones:
+    Validaciones (en paralelo, ver rem/cargas.py):
     - extensión .xlsx
     - tamaño máximo 20 MB
-    - estructura mínima REM (existencia hoja A01)
-    - evita duplicados (mismo nombre + mismo período)
+    - estructura mínima REM (hojas requeridas, ver rem/validacion.py;
+      se lee solo xl/workbook.xml, sin parsear el libro)
+    - evita duplicados (mismo nombre o mismo contenido SHA-256 + mismo período)
 
     Resultado:
-    - solo archivos válidos se guardan
+    - solo archivos válidos se guardan (un solo INSERT para todo el lote)
+    - opcional: se encola el procesamiento de todos ellos
     - se informa al usuario mediante mensajes claros
     """
 
@@ -389,95 +412,164 @@ def subir_excel(request):
             messages.error(request, "El período seleccionado no existe.")
             return redirect('subir_excel')
 
-        archivos_guardados = 0
-
         # ==========================
-        # Procesamiento de archivos
+        # Procesamiento de archivos (en lote, ver rem/cargas.py)
         # ==========================
-        for archivo in archivos:
-
-            # 0) Evitar duplicados (mismo archivo + mismo período)
-            if ArchivoREM.objects.filter(
-                periodo=periodo,
-                nombre_original=archivo.name
-            ).exists():
-                messages.warning(
-                    request,
-                    f"El archivo '{archivo.name}' ya fue cargado previamente en este período."
-                )
-                continue
-
-            # 1) Validar extensión
-            extension = os.path.splitext(archivo.name)[1].lower()
-            if extension != '.xlsx':
-                messages.warning(
-                    request,
-                    f"El archivo '{archivo.name}' fue ignorado: formato no válido."
-                )
-                continue
+        encolar = (
+            _puede_encolar(request.user)
+            and request.POST.get("procesar_ahora") == "on"
+        )
+        resultado = cargar_archivos(request, archivos, periodo, encolar=encolar)
 
-            # 2) Validar tamaño máximo (20 MB)
-            if archivo.size > 20 * 1024 * 1024:
-                messages.warning(
-                    request,
-                    f"El archivo '{archivo.name}' fue ignorado: supera el tamaño máximo permitido."
-                )
-                continue
-
-            # 3) Validar estructura mínima REM (hoja A01)
-            try:
-                wb = load_workbook(archivo, read_only=True, data_only=True)
-            except Exception:
-                messages.warning(
-                    request,
-                    f"El archivo '{archivo.name}' no pudo ser leído y fue ignorado."
-                )
-                continue
+        # ==========================
+        # Resultado final
+        # ==========================
+        if not _informar_resultado_carga(request, resultado):
+            return redirect('subir_excel')
+        return redirect('lista_archivos')
 
-            if "A01" not in wb.sheetnames:
-                messages.warning(
-                    request,
-                    f"El archivo '{archivo.name}' no corresponde a un REM válido (falta hoja A01)."
-                )
-                continue
+    return render(request, 'subir_excel.html', {
+        "periodos": periodos,
+        "permite_encolar": _puede_encolar(request.user),
+        "tamano_maximo_mb": tamano_maximo_formulario() // (1024 * 1024),
+        "tamano_maximo_partes_mb": tamano_maximo_partes() // (1024 * 1024),
+    })
 
-            # IMPORTANTE: resetear puntero del archivo
-            archivo.seek(0)
 
-            # 4) Guardar archivo válido
-            nuevo = ArchivoREM.objects.create(
-                nombre_original=archivo.name,
-                archivo=archivo,
-                periodo=periodo
-            )
+def _puede_encolar(user) -> bool:
+    """
+    Encolar el procesamiento al subir equivale a procesar_archivo_generico,
+    que es solo para administradores.
+    """
+    return settings.REM_PROCESAMIENTO_EN_COLA and is_admin_user(user)
 
-            archivos_guardados += 1
 
-            registrar_auditoria(
-                request,
-                AuditLog.ACCION_UPLOAD,
-                f"Subió archivo REM '{nuevo.nombre_original}' "
-                f"para el período {periodo.anio}-{periodo.mes:02d}.",
-            )
+def _informar_resultado_carga(request, resultado) -> int:
+    """
+    Mensajes al usuario para el resultado de cargar_archivos.
+    Retorna la cantidad de archivos guardados.
+    """
+    for aviso in resultado["avisos"]:
+        messages.warning(request, aviso)
 
-        # ==========================
-        # Resultado final
-        # ==========================
-        if archivos_guardados == 0:
-            messages.error(
-                request,
-                "No se cargó ningún archivo válido. Revisa los mensajes de advertencia."
-            )
-            return redirect('subir_excel')
+    archivos_guardados = len(resultado["guardados"])
+    if archivos_guardados == 0:
+        messages.error(
+            request,
+            "No se cargó ningún archivo válido. Revisa los mensajes de advertencia."
+        )
+        return 0
 
-        messages.success(
+    messages.success(
+        request,
+        f"Se cargaron correctamente {archivos_guardados} archivo(s) REM."
+    )
+    if resultado["reutilizados"]:
+        messages.info(
             request,
-            f"Se cargaron correctamente {archivos_guardados} archivo(s) REM."
+            f"{len(resultado['reutilizados'])} archivo(s) ya habían sido procesados con "
+            "el mismo contenido: se reutilizaron sus resultados."
         )
-        return redirect('lista_archivos')
+    if resultado["tareas"]:
+        messages.info(
+            request,
+            f"{len(resultado['tareas'])} archivo(s) quedaron en cola para procesamiento."
+        )
+    return archivos_guardados
 
-    return render(request, 'subir_excel.html', {
-        "periodos": periodos,
+
+# ========================
+# CARGA POR PARTES (archivos grandes, reanudable; ver rem/cargas_parciales.py)
+# ========================
+def _error_carga(error: ErrorCargaParcial):
+    return JsonResponse({"error": error.mensaje, **error.datos}, status=error.status)
+
+
+def _carga_del_usuario(request, id_carga):
+    return get_object_or_404(CargaParcial, pk=id_carga, usuario=request.user)
+
+
+@login_required
+@require_POST
+def iniciar_carga_parcial(request):
+    """
+    Inicia una carga por partes.
+    Cuerpo JSON: {"nombre", "tamano", "periodo_id", "procesar_ahora"}
+    """
+    try:
+        datos = json.loads(request.body or b"{}")
+        tamano = int(datos.get("tamano") or 0)
+    except (ValueError, TypeError):
+        return JsonResponse({"error": "Solicitud inválida."}, status=400)
+
+    periodo = DimPeriodo.objects.filter(pk=datos.get("periodo_id")).first()
+    if periodo is None:
+        return JsonResponse({"error": "El período seleccionado no existe."}, status=400)
+
+    encolar = _puede_encolar(request.user) and bool(datos.get("procesar_ahora"))
+    try:
+        carga = iniciar_carga(request.user, periodo, datos.get("nombre"), tamano, encolar)
+    except ErrorCargaParcial as e:
+        return _error_carga(e)
+
+    return JsonResponse(carga_a_dict(carga), status=201)
+
+
+@login_required
+def carga_parcial(request, id_carga):
+    """
+    GET    → estado (bytes recibidos, para reanudar)
+    PUT    → bloque de bytes; ?offset=N indica dónde empieza
+    DELETE → cancelar
+    """
+    carga = _carga_del_usuario(request, id_carga)
+
+    if request.method == "GET":
+        return JsonResponse(carga_a_dict(carga))
+
+    if request.method == "DELETE":
+        try:
+            cancelar_carga(carga)
+        except ErrorCargaParcial as e:
+            return _error_carga(e)
+        return JsonResponse(carga_a_dict(carga))
+
+    if request.method != "PUT":
+        return JsonResponse({"error": "Método no permitido."}, status=405)
+
+    try:
+        offset = int(request.GET.get("offset", ""))
+        largo = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return JsonResponse({"error": "Falta el offset del bloque."}, status=400)
+
+    try:
+        carga = recibir_bloque(carga, offset, request, largo)
+    except ErrorCargaParcial as e:
+        return _error_carga(e)
+
+    return JsonResponse(carga_a_dict(carga))
+
+
+@login_required
+@require_POST
+def finalizar_carga_parcial(request, id_carga):
+    """
+    Valida el archivo completo y crea el ArchivoREM (mismo camino que
+    subir_excel). Deja los mensajes para la página a la que se redirige.
+    """
+    carga = _carga_del_usuario(request, id_carga)
+    try:
+        resultado = finalizar_carga(request, carga)
+    except ErrorCargaParcial as e:
+        return _error_carga(e)
+
+    guardados = _informar_resultado_carga(request, resultado)
+    return JsonResponse({
+        **carga_a_dict(carga),
+        "guardados": guardados,
+        "avisos": resultado["avisos"],
+        "redirigir": reverse("lista_archivos" if guardados else "subir_excel"),
     })
 
 
@@ -493,13 +585,19 @@ def lista_archivos(request):
         .filter(activo=True)
         .exclude(nombre_original__startswith="INGRESO MANUAL ")
         .select_related("periodo")
-        .order_by("-fecha_carga")   # campo real de orden
     )
 
     total_activos = archivos.count()
 
+    # Más recientes primero: id_archivo crece con fecha_carga
+    paginador = PaginadorKeyset(
+        archivos, "id_archivo", por_pagina=25, descendente=True, total=total_activos
+    )
+    page_obj = paginador.get_page(request.GET.get("cursor"))
+
     return render(request, "lista_archivos.html", {
-        "archivos": archivos,
+        "archivos": page_obj.object_list,
+        "page_obj": page_obj,
         "total_activos": total_activos,
     })
 
@@ -511,72 +609,33 @@ def lista_archivos(request):
 @admin_required
 def procesar_archivo_generico(request, archivo_id):
     """
-    Procesa un archivo REM completo:
-    1) Lee Excel con procesar_archivo_con_mapeo(ruta) -> lista de dicts
-    2) Borra registros previos de ese ArchivoREM (evita duplicados)
-    3) Inserta masivamente en RegistroREM (bulk_create)
-    4) Marca el archivo como procesado
-    5) Registra auditoría
-    6) Muestra un resumen por hoja/sección
+    Solicita el procesamiento de un archivo REM completo.
 
-    Nota:
-    - Se usa transaction.atomic() para asegurar consistencia al guardar.
+    - Con REM_PROCESAMIENTO_EN_COLA=True se encola una TareaREM
+      y se redirige a la página de estado; el parseo con openpyxl y la
+      escritura en BD los hace `manage.py rem_worker` fuera del request.
+    - Con False se procesa aquí mismo (ver procesar_archivo_rem) y se
+      muestra el resumen por hoja/sección.
     """
     archivo_rem = get_object_or_404(ArchivoREM, pk=archivo_id)
-    ruta = archivo_rem.archivo.path
 
-    # 1) Intentar procesar Excel -> lista de diccionarios
-    try:
-        registros_dict = procesar_archivo_con_mapeo(ruta)
-    except Exception as e:
-        return HttpResponse(
-            f"""
-            <h2>Error al procesar el archivo</h2>
-            <p><strong>{archivo_rem.nombre_original}</strong></p>
-            <p>Detalle técnico del error (para depuración):</p>
-            <pre>{str(e)}</pre>
-            <a href="/archivos/">⬅ Volver a archivos</a>
-            """,
-            status=500
-        )
+    if getattr(settings, "REM_PROCESAMIENTO_EN_COLA", False):
+        tarea = encolar_procesamiento(archivo_rem, request.user)
 
-    # 2) Borrar registros anteriores de este archivo (evita duplicados)
-    RegistroREM.objects.filter(archivo=archivo_rem).delete()
-
-    # 3) Convertir dicts en objetos RegistroREM
-    objetos = []
-    resumen_hoja_seccion = Counter()
-
-    for reg in registros_dict:
-        # Claves de control (no van dentro de "datos")
-        hoja = reg.pop("hoja", "")
-        seccion = reg.pop("seccion", "")
-        fila = reg.pop("fila", 0)
-
-        objetos.append(
-            RegistroREM(
-                archivo=archivo_rem,
-                hoja=hoja,
-                seccion=seccion,
-                fila=fila,
-                datos=reg,
-            )
+        registrar_auditoria(
+            request,
+            AuditLog.ACCION_PROCESAR,
+            f"Encoló procesamiento del archivo REM '{archivo_rem.nombre_original}' "
+            f"(tarea {tarea.id_tarea}).",
         )
+        return redirect("estado_tarea", tarea_id=tarea.id_tarea)
 
-        resumen_hoja_seccion[(hoja, seccion)] += 1
-
-    # 4) Guardar masivamente dentro de una transacción
     try:
-        with transaction.atomic():
-            if objetos:
-                RegistroREM.objects.bulk_create(objetos, batch_size=1000)
-
-            archivo_rem.procesado = True
-            archivo_rem.save(update_fields=["procesado"])
+        resumen = procesar_archivo_rem(archivo_rem)
     except Exception as e:
         return HttpResponse(
             f"""
-            <h2>Error al guardar los registros en la base de datos</h2>
+            <h2>Error al procesar el archivo</h2>
             <p><strong>{archivo_rem.nombre_original}</strong></p>
             <p>Detalle técnico del error (para depuración):</p>
             <pre>{str(e)}</pre>
@@ -589,30 +648,115 @@ def procesar_archivo_generico(request, archivo_id):
         request,
         AuditLog.ACCION_PROCESAR,
         f"Procesó archivo REM '{archivo_rem.nombre_original}' "
-        f"({len(objetos)} registros guardados en RegistroREM).",
+        f"({resumen['total_registros']} registros guardados en RegistroREM).",
     )
 
-    # 5) Preparar detalle para vista (resumen por hoja/sección)
-    detalle_listado = []
-    for (hoja, seccion), cantidad in sorted(resumen_hoja_seccion.items()):
-        detalle_listado.append({
-            "hoja": hoja,
-            "seccion": seccion,
-            "cantidad": cantidad,
-        })
-
-    # 6) Renderizar template de resultado
     return render(
         request,
         "resultado_procesar_archivo.html",
         {
             "archivo": archivo_rem,
-            "total_registros": len(objetos),
-            "detalle": detalle_listado,
+            "total_registros": resumen["total_registros"],
+            "detalle": resumen["detalle"],
         }
     )
 
 
+@login_required
+def estado_tarea(request, tarea_id):
+    """
+    Estado de una tarea de la cola:
+    - Pendiente / en proceso → página que se refresca sola
+    - Completada             → mismo resumen que el procesamiento inline
+    - Fallida                → detalle del error
+    """
+    tarea = get_object_or_404(
+        TareaREM.objects.select_related("archivo", "periodo"),
+        pk=tarea_id,
+    )
+
+    if tarea.estado == TareaREM.ESTADO_COMPLETADA and tarea.tipo == TareaREM.TIPO_LIBRO_PERIODO:
+        return redirect("descargar_libro_periodo", periodo_id=tarea.periodo_id)
+    if tarea.estado == TareaREM.ESTADO_COMPLETADA and tarea.tipo == TareaREM.TIPO_PDF_PERIODO:
+        return redirect("descargar_pdf_periodo", periodo_id=tarea.periodo_id)
+
+    if tarea.estado == TareaREM.ESTADO_COMPLETADA and tarea.archivo:
+        resumen = tarea.resultado or tarea.archivo.resumen_proceso or {}
+        return render(
+            request,
+            "resultado_procesar_archivo.html",
+            {
+                "archivo": tarea.archivo,
+                "total_registros": resumen.get("total_registros", 0),
+                "detalle": resumen.get("detalle", []),
+            }
+        )
+
+    return render(request, "estado_tarea.html", {
+        "tarea": tarea,
+        "clave_progreso": clave_archivo(tarea.archivo_id) if tarea.archivo_id else "",
+    })
+
+
+# ========================
+# PROGRESO EN VIVO (polling JSON + Server-Sent Events)
+# ========================
+# Duración máxima de una conexión SSE. Con workers síncronos de gunicorn
+# cada página abierta toma un worker mientras dure el stream: se corta a
+# los pocos segundos y el navegador (EventSource) reconecta solo tras
+# SSE_REINTENTO_MS, así que en la práctica es un sondeo corto.
+SSE_DURACION_MAXIMA = 4
+SSE_REINTENTO_MS = 2000
+
+
+def _progreso_dict(clave):
+    progreso = ProgresoREM.objects.filter(clave=clave).first()
+    if progreso is None:
+        return {"clave": clave, "estado": "SIN_DATOS"}
+    return progreso_a_dict(progreso)
+
+
+@login_required
+def progreso_json(request, clave):
+    """
+    Progreso actual de una ingesta (clave "archivo-<id>" o "cli-<nombre>").
+    Pensado para polling.
+    """
+    return JsonResponse(_progreso_dict(clave))
+
+
+@login_required
+def progreso_stream(request, clave):
+    """
+    Mismo progreso que progreso_json, pero como stream text/event-stream:
+    se envía un evento cada vez que cambia, y se cierra al terminar o a
+    los SSE_DURACION_MAXIMA segundos (el navegador reconecta).
+    """
+    def eventos():
+        yield f"retry: {SSE_REINTENTO_MS}\n\n"
+        ultimo = None
+        limite = time.monotonic() + SSE_DURACION_MAXIMA
+
+        while time.monotonic() < limite:
+            datos = _progreso_dict(clave)
+            marca = (datos.get("estado"), datos.get("actualizado_en"))
+
+            if marca != ultimo:
+                ultimo = marca
+                yield f"data: {json.dumps(datos)}\n\n"
+            else:
+                yield ": ping\n\n"
+
+            if datos["estado"] in (ProgresoREM.ESTADO_TERMINADO, ProgresoREM.ESTADO_ERROR):
+                break
+            time.sleep(1)
+
+    response = StreamingHttpResponse(eventos(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 # ---------------------------------------
 # Metadatos de secciones (título por hoja/sección)
 # ---------------------------------------
@@ -624,31 +768,6 @@ REM_TITULOS_SECCION = {
 }
 
 
-def pretty_col_name(col: str) -> str:
-    """
-    Convierte un nombre técnico (snake_case) a un label legible.
-
-    Caso especial:
-    - Si la columna sigue patrón "edad_X_anos_hombres/mujeres", lo transforma a:
-      "X años (Hombres/Mujeres)".
-    """
-    if col.startswith("edad_") and "anos_" in col:
-        resto = col[len("edad_"):]
-        partes = resto.split("_")
-        if "anos" in partes:
-            idx_anos = partes.index("anos")
-            rango = " ".join(partes[:idx_anos])
-            rango = rango.replace(" ", "–") if " " in rango and "y" not in rango else rango.replace(" ", " ")
-            sexo = partes[idx_anos + 1] if idx_anos + 1 < len(partes) else ""
-            texto = f"{rango} años ({sexo.capitalize()})"
-            texto = texto.replace("mas", "más")
-            return texto
-
-    texto = col.replace("_", " ")
-    texto = texto.replace("anos", "años")
-    return texto.capitalize()
-
-
 @login_required
 def ver_registros_archivo(request, archivo_id):
     """
@@ -714,52 +833,21 @@ def ver_registros_archivo(request, archivo_id):
     if seccion:
         qs = qs.filter(seccion=seccion)
 
-    qs = qs.order_by("id_registro")
-
-    # Paginación (50 filas por página)
-    paginator = Paginator(qs, 50)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    # Paginación por clave (50 filas por página, ver rem/paginacion.py).
+    # El total sale del resumen de la ingesta, sin COUNT(*).
+    paginador = PaginadorKeyset(
+        qs, "id_registro", por_pagina=50,
+        total=total_registros(archivo, hoja, seccion),
+    )
+    page_obj = paginador.get_page(request.GET.get("cursor"))
 
     # -----------------------
-    # 3) Estructura fija desde REM_STRUCTURES (si existe)
+    # 3) Columnas: estructura fija (REM_STRUCTURES) o descubiertas en la BD
+    #    (ver rem/columnas.py; quedan en caché hasta reprocesar)
     # -----------------------
-    hoja_key = (hoja or "").strip().upper()
-    seccion_key = (seccion or "").strip().upper()
-
-    estructura_hoja = REM_STRUCTURES.get(hoja_key) or {}
-    estructura = estructura_hoja.get(seccion_key) or {}
-
-    columnas_config = estructura.get("columnas")
-    num_desc_cols = estructura.get("num_desc_cols")
-    usa_estructura_fija = bool(columnas_config)
-
-    columnas_dim = []
-    columnas_num = []
-
-    if usa_estructura_fija:
-        # Si hay estructura fija, se usa tal cual
-        columnas = list(columnas_config)
-        if num_desc_cols is None:
-            num_desc_cols = 0
-    else:
-        # Descubrir columnas dinámicamente desde los datos
-        for reg in qs:
-            datos = reg.datos or {}
-            for key, value in datos.items():
-                if key in columnas_dim or key in columnas_num:
-                    continue
-                if value is None:
-                    continue
-
-                # Heurística: numérico vs descriptivo
-                if isinstance(value, (int, float, Decimal)):
-                    columnas_num.append(key)
-                else:
-                    columnas_dim.append(key)
-
-        columnas = columnas_dim + columnas_num
-        num_desc_cols = len(columnas_dim)
+    columnas, num_desc_cols, usa_estructura_fija = columnas_seccion(
+        qs, alcance_archivo(archivo), hoja, seccion
+    )
 
     # -----------------------
     # 4) Nombres "bonitos" de columnas
@@ -769,38 +857,7 @@ def ver_registros_archivo(request, archivo_id):
     # -----------------------
     # 5) Grupos para cabecera (simular Excel con encabezados agrupados)
     # -----------------------
-    def grupo_columna(nombre_campo: str) -> str:
-        n = (nombre_campo or "").lower()
-
-        if n.startswith("rango_etario_"):
-            return "Rango etario"
-        if n.startswith("sexo_"):
-            return "Sexo"
-        if n.startswith("identificacion_de_genero_"):
-            return "Identificación de género"
-        return ""
-
-    grupos_por_col = [grupo_columna(c) for c in columnas]
-    tiene_grupos = any(bool(g) for g in grupos_por_col)
-
-    bloques_header = []
-    if columnas:
-        if tiene_grupos:
-            grupo_actual = grupos_por_col[0]
-            span = 1
-            for g in grupos_por_col[1:]:
-                if g == grupo_actual:
-                    span += 1
-                else:
-                    bloques_header.append({"nombre": grupo_actual, "span": span})
-                    grupo_actual = g
-                    span = 1
-            bloques_header.append({"nombre": grupo_actual, "span": span})
-        else:
-            bloques_header.append({
-                "nombre": "Valores registrados",
-                "span": len(columnas),
-            })
+    bloques = bloques_header(columnas)
 
     # -----------------------
     # 6) Construir filas para la tabla (solo página actual)
@@ -840,8 +897,9 @@ def ver_registros_archivo(request, archivo_id):
         "titulo_seccion": titulo_seccion,
         "num_desc_cols": num_desc_cols,
         "usa_estructura_fija": usa_estructura_fija,
-        "bloques_header": bloques_header,
+        "bloques_header": bloques,
         "opciones_rem": opciones_rem,
+        "query_filtros": urlencode({"hoja": hoja, "seccion": seccion}),
     })
 
 
@@ -859,6 +917,8 @@ def desactivar_archivo(request, archivo_id):
         archivo.activo = False
         if "[ANULADO]" not in archivo.nombre_original:
             archivo.nombre_original = archivo.nombre_original + " [ANULADO]"
+        # post_save sube la versión del período (rem/signals.py): columnas,
+        # reportes y exportaciones en caché dejan de valer
         archivo.save(update_fields=["activo", "nombre_original"])
 
         registrar_auditoria(
@@ -1093,7 +1153,10 @@ def ingresar_registro_manual_periodo(request, periodo_id, hoja, seccion):
             )
 
         if registros_a_crear:
-            RegistroREM.objects.bulk_create(registros_a_crear)
+            with transaction.atomic():
+                RegistroREM.objects.bulk_create(registros_a_crear)
+                cargar_hechos_archivo(archivo_manual, registros_a_crear, reemplazar=False)
+                incrementar_version(archivo_manual.periodo_id)
 
             registrar_auditoria(
                 request,
@@ -1181,6 +1244,17 @@ def seleccionar_rem_periodo(request, periodo_id):
     """
     periodo = get_object_or_404(DimPeriodo, id_periodo=periodo_id)
 
+    # Solo depende de REM_STRUCTURES: se arma una vez (rem/cache.py)
+    rems = obtener("rems_periodo", "rem:rems_periodo", _rems_disponibles)
+
+    return render(
+        request,
+        "seleccionar_rem_periodo.html",
+        {"periodo": periodo, "rems": rems},
+    )
+
+
+def _rems_disponibles() -> list:
     rems = []
     for rem_key, rem_data in REM_STRUCTURES.items():
         if not isinstance(rem_data, dict):
@@ -1194,16 +1268,11 @@ def seleccionar_rem_periodo(request, periodo_id):
             "nombre": nombre_rem,
         })
 
-    rems = sorted(rems, key=lambda r: r["hoja"])
-
-    return render(
-        request,
-        "seleccionar_rem_periodo.html",
-        {"periodo": periodo, "rems": rems},
-    )
+    return sorted(rems, key=lambda r: r["hoja"])
 
 
 @login_required
+@condicional_periodo
 def ver_datos_rem_periodo(request, periodo_id):
     """
     Resumen por período:
@@ -1212,9 +1281,27 @@ def ver_datos_rem_periodo(request, periodo_id):
 
     Fuente:
     - RegistroREM filtrando por ArchivoREM.periodo
+    - Caché compartida por versión de datos del período (rem/cache.py)
     """
     periodo = get_object_or_404(DimPeriodo, id_periodo=periodo_id)
 
+    grupos = obtener(
+        "datos_periodo",
+        clave_periodo("datos_periodo", periodo.pk),
+        lambda: _grupos_datos_periodo(periodo),
+    )
+
+    return render(
+        request,
+        "ver_datos_rem_periodo.html",
+        {
+            "periodo": periodo,
+            "grupos": grupos,
+        }
+    )
+
+
+def _grupos_datos_periodo(periodo) -> list:
     resumen_qs = (
         RegistroREM.objects
         .filter(archivo__periodo=periodo)
@@ -1234,22 +1321,17 @@ def ver_datos_rem_periodo(request, periodo_id):
             "nombre": REM_TITULOS_HOJA.get(hoja, f"REM-{hoja}"),
             "secciones": secciones,
         })
-
-    return render(
-        request,
-        "ver_datos_rem_periodo.html",
-        {
-            "periodo": periodo,
-            "grupos": grupos,
-        }
-    )
+    return grupos
 
 
 @login_required
+@condicional_periodo
 def ver_detalle_rem(request, periodo_id, hoja, seccion):
     """
     Detalle por período + hoja + sección:
-    - Muestra tabla completa (sin paginar aquí)
+    - El servidor solo arma encabezados y metadatos (tamaño constante).
+    - Las filas las pide el navegador por ventanas a filas_detalle_rem
+      a medida que se hace scroll (tabla virtualizada).
     - Usa la misma lógica de columnas (estructura fija o dinámica)
 
     Nota:
@@ -1263,48 +1345,14 @@ def ver_detalle_rem(request, periodo_id, hoja, seccion):
     # -----------------------
     # 1) Query filtrada por período + hoja + sección
     # -----------------------
-    qs = (
-        RegistroREM.objects
-        .filter(archivo__periodo=periodo, hoja=hoja, seccion=seccion)
-        .order_by("id_registro")
-    )
+    qs = _registros_detalle(periodo, hoja, seccion)
 
     # -----------------------
-    # 2) Columnas por REM_STRUCTURES (si existe)
+    # 2) Columnas: estructura fija (REM_STRUCTURES) o descubiertas en la BD
     # -----------------------
-    hoja_key = hoja
-    seccion_key = seccion
-
-    estructura_hoja = REM_STRUCTURES.get(hoja_key) or {}
-    estructura = estructura_hoja.get(seccion_key) or {}
-
-    columnas_config = estructura.get("columnas")
-    num_desc_cols = estructura.get("num_desc_cols")
-    usa_estructura_fija = bool(columnas_config)
-
-    columnas_dim = []
-    columnas_num = []
-
-    if usa_estructura_fija:
-        columnas = list(columnas_config)
-        if num_desc_cols is None:
-            num_desc_cols = 0
-    else:
-        for reg in qs:
-            datos = reg.datos or {}
-            for key, value in datos.items():
-                if key in columnas_dim or key in columnas_num:
-                    continue
-                if value is None:
-                    continue
-
-                if isinstance(value, (int, float, Decimal)):
-                    columnas_num.append(key)
-                else:
-                    columnas_dim.append(key)
-
-        columnas = columnas_dim + columnas_num
-        num_desc_cols = len(columnas_dim)
+    columnas, num_desc_cols, _usa_estructura_fija = columnas_seccion(
+        qs, alcance_periodo(periodo.pk), hoja, seccion
+    )
 
     # -----------------------
     # 3) Encabezados legibles
@@ -1312,20 +1360,18 @@ def ver_detalle_rem(request, periodo_id, hoja, seccion):
     columnas_bonitas = [pretty_col_name(c) for c in columnas]
 
     # -----------------------
-    # 4) Filas tabla
+    # 4) Total de filas (desde el resumen de la ingesta)
     # -----------------------
-    filas_tabla = []
-    for reg in qs:
-        datos = reg.datos or {}
-        fila = {
-            "id": reg.id_registro,
-            "hoja": reg.hoja,
-            "seccion": reg.seccion,
-            "fila_excel": reg.fila,
-            "celdas": [datos.get(col) for col in columnas],
-            "es_total": False,
-        }
-        filas_tabla.append(fila)
+    total = total_registros(ArchivoREM.objects.filter(periodo=periodo), hoja, seccion)
+
+    # Cómo dibuja las celdas la tabla virtualizada (igual que las
+    # cabeceras especiales de A01/A y A02)
+    if hoja == "A01" and seccion == "A":
+        modo_celdas = "a01a"
+    elif hoja == "A02":
+        modo_celdas = "a02"
+    else:
+        modo_celdas = "generico"
 
     # -----------------------
     # 5) Títulos bonitos
@@ -1341,14 +1387,93 @@ def ver_detalle_rem(request, periodo_id, hoja, seccion):
         "hoja": hoja,
         "seccion": seccion,
         "columnas_bonitas": columnas_bonitas,
-        "filas_tabla": filas_tabla,
+        "total_filas": total,
         "num_desc_cols": num_desc_cols,
+        "modo_celdas": modo_celdas,
         "titulo_hoja": titulo_hoja,
         "titulo_seccion": titulo_seccion,
     }
     return render(request, "ver_detalle_rem.html", context)
 
 
+def _registros_detalle(periodo, hoja, seccion):
+    return RegistroREM.objects.filter(archivo__periodo=periodo, hoja=hoja, seccion=seccion)
+
+
+# Máximo de filas por ventana en filas_detalle_rem
+VENTANA_MAXIMA = 1000
+
+
+@login_required
+@condicional_periodo
+def filas_detalle_rem(request, periodo_id, hoja, seccion):
+    """
+    Ventana de filas (JSON) para la tabla virtualizada de ver_detalle_rem.
+
+    Parámetros GET:
+    - despues=<id_registro>  → filas siguientes a esa (paginación por clave;
+                               es el caso normal al hacer scroll hacia abajo)
+    - inicio=<n>             → desde la fila n (salto a una posición cualquiera)
+    - limite=<n>             → filas por ventana (por defecto 200)
+    - columnas=a,b,c         → proyección: solo esas claves de datos
+                               (se extraen en SQL, no se trae el JSON completo)
+
+    Respuesta:
+      {"total", "inicio", "columnas", "filas": [{"id", "celdas"}], "siguiente"}
+    """
+    periodo = get_object_or_404(DimPeriodo, id_periodo=periodo_id)
+    hoja = (hoja or "").strip().upper()
+    seccion = (seccion or "").strip().upper()
+
+    qs = _registros_detalle(periodo, hoja, seccion)
+    todas, _num_desc_cols, _usa_estructura_fija = columnas_seccion(
+        qs, alcance_periodo(periodo.pk), hoja, seccion
+    )
+
+    pedidas = [c for c in (request.GET.get("columnas") or "").split(",") if c]
+    if pedidas:
+        desconocidas = [c for c in pedidas if c not in todas]
+        if desconocidas:
+            return JsonResponse(
+                {"error": f"Columnas desconocidas: {', '.join(desconocidas)}"}, status=400
+            )
+        columnas = pedidas
+    else:
+        columnas = todas
+
+    try:
+        limite = min(max(int(request.GET.get("limite") or 200), 1), VENTANA_MAXIMA)
+        despues = request.GET.get("despues")
+        despues = int(despues) if despues else None
+        inicio = int(request.GET.get("inicio") or 0)
+    except ValueError:
+        return JsonResponse({"error": "Parámetros inválidos."}, status=400)
+
+    if despues is not None:
+        qs = qs.filter(id_registro__gt=despues)
+        inicio = None
+        desde = 0
+    else:
+        desde = max(inicio, 0)
+
+    filas = [
+        (id_registro, [datos[c] for c in columnas])
+        for id_registro, datos in filas_proyectadas(
+            qs, columnas, orden=("id_registro",), ventana=(desde, desde + limite + 1), con_id=True
+        )
+    ]
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+
+    return JsonResponse({
+        "total": total_registros(ArchivoREM.objects.filter(periodo=periodo), hoja, seccion),
+        "inicio": inicio,
+        "columnas": columnas,
+        "filas": [{"id": f[0], "celdas": f[1]} for f in filas],
+        "siguiente": filas[-1][0] if (filas and hay_mas) else None,
+    })
+
+
 @login_required
 def reportes_home(request):
     """
@@ -1366,67 +1491,26 @@ def reportes_home(request):
     - completo
     """
 
-    # ==============================
-    # 1) Obtener solo períodos activos
-    # ==============================
-    periodos = (
-        DimPeriodo.objects
-        .exclude(descripcion__icontains='[INACTIVO]')
-        .order_by("-anio", "-mes")
-    )
-
-    estado_periodos = []
+    # Una sola consulta agrupada (rem/periodos.py); en caché hasta que
+    # cambie cualquier período (clave global, rem/cache.py)
+    estado_periodos = obtener("reportes_home", clave_global("reportes_home"), calcular_estado_periodos)
 
-    # ==============================
-    # 2) Calcular estado por período
-    # ==============================
-    for p in periodos:
-        archivos_qs = ArchivoREM.objects.filter(periodo=p, activo=True)
-
-        total_archivos = archivos_qs.count()
-        procesados = archivos_qs.filter(procesado=True).count()
-
-        # -----------------------------
-        # Determinar estado del período
-        # -----------------------------
-        if total_archivos == 0:
-            estado = "sin_archivos"
-            porcentaje = 0
-
-        elif procesados == 0:
-            estado = "cargado_no_procesado"
-            porcentaje = 0
-
-        elif procesados < total_archivos:
-            estado = "parcial"
-            porcentaje = int((procesados / total_archivos) * 100)
-
-        else:
-            estado = "completo"
-            porcentaje = 100
-
-        estado_periodos.append({
-            "periodo": p,
-            "total_archivos": total_archivos,
-            "procesados": procesados,
-            "porcentaje": porcentaje,
-            "estado": estado,
-        })
-
-    # ==============================
-    # 3) Renderizar vista
-    # ==============================
     return render(request, "reportes_home.html", {
         "estado_periodos": estado_periodos,
     })
 
 
 @login_required
+@condicional_periodo_diario
 def reporte_a01_seccion_a(request, periodo_id):
     """
     Reporte específico: REM A01 - Sección A (por período)
     - Consulta registros procesados (archivos activos)
     - Calcula resumen y datos para gráficos (tipos / profesionales / rangos)
+      recorriendo los registros una sola vez
+    - Caché compartida por versión de datos del período (rem/cache.py),
+      solo de lo agregado: la alerta de plazo depende del día y se
+      calcula en cada request
     """
     periodo = get_object_or_404(DimPeriodo, pk=periodo_id)
 
@@ -1437,113 +1521,126 @@ def reporte_a01_seccion_a(request, periodo_id):
         seccion="A",
     )
 
-    # Resumen (KPIs + alertas)
-    resumen = calcular_resumen_a01_seccion_a(registros, periodo)
-
-    # Acumuladores para gráficos
-    tipos_counter = Counter()
-    prof_counter = Counter()
-    rangos_counter = Counter()
-
-    for r in registros:
-        d = r.datos or {}
+    # KPIs, alertas y gráficos en una sola pasada (rem/reportes.py)
+    reporte = obtener(
+        "reporte_a01_a",
+        clave_periodo("reporte_a01_a", periodo.pk),
+        lambda: calcular_reporte_a01_seccion_a(registros),
+    )
+    reporte = con_alerta_plazo(reporte, periodo)
 
-        # TOTAL REAL = suma de rangos etarios (no confía ciegamente en "total")
-        total_fila = 0
-        for k, v in d.items():
-            if k.startswith("rango_etario_"):
-                total_fila += _to_int(v)
+    return render(request, "reporte_a01_seccion_a.html", {
+        "periodo": periodo,
+        **reporte,
+    })
 
-        if total_fila <= 0:
-            continue
 
-        tipo = (d.get("tipo_de_control") or "").strip() or "Otros controles"
-        profesional = (d.get("profesional") or "").strip() or "Sin profesional"
-
-        tipos_counter[tipo] += total_fila
-        prof_counter[profesional] += total_fila
-
-        for k, v in d.items():
-            if k.startswith("rango_etario_"):
-                rangos_counter[k] += _to_int(v)
-
-    # Helper para armar "top N" con porcentajes
-    def build_chart(counter, labels_map=None, max_items=6):
-        items = [(k, v) for k, v in counter.items() if v > 0]
-        if not items:
-            return []
-
-        items.sort(key=lambda kv: kv[1], reverse=True)
-        items = items[:max_items]
-
-        total = sum(v for _, v in items) or 1
-        data = []
-        for key, valor in items:
-            nombre = labels_map.get(key, key) if labels_map else key
-            pct = round(valor * 100 / total)
-            data.append({
-                "nombre": nombre,
-                "valor": valor,
-                "porcentaje": pct,
-            })
-        return data
-
-    # Labels legibles para rangos
-    RANGO_LABELS = {
-        "rango_etario_menos_de_4_anos": "Menos de 4 años",
-        "rango_etario_5_9_anos": "5 - 9 años",
-        "rango_etario_10_14_anos": "10 - 14 años",
-        "rango_etario_15_19_anos": "15 - 19 años",
-        "rango_etario_20_24_anos": "20 - 24 años",
-        "rango_etario_25_29_anos": "25 - 29 años",
-        "rango_etario_30_34_anos": "30 - 34 años",
-        "rango_etario_35_39_anos": "35 - 39 años",
-        "rango_etario_40_44_anos": "40 - 44 años",
-        "rango_etario_45_49_anos": "45 - 49 años",
-        "rango_etario_50_54_anos": "50 - 54 años",
-        "rango_etario_55_59_anos": "55 - 59 años",
-        "rango_etario_60_64_anos": "60 - 64 años",
-        "rango_etario_65_69_anos": "65 - 69 años",
-        "rango_etario_70_74_anos": "70 - 74 años",
-        "rango_etario_75_79_anos": "75 - 79 años",
-        "rango_etario_80_y_mas_anos": "80 y más años",
-    }
+@login_required
+@condicional_periodo
+def reporte_seccion_periodo(request, periodo_id, hoja, seccion):
+    """
+    Reporte de cualquier hoja/sección REM para un período.
+    - La definición (descriptivas, medidas, grupos, reglas) sale de
+      REM_STRUCTURES (rem/definiciones.py), sin código por sección.
+    - KPIs y gráficos se agregan en la BD sobre hecho_rem y quedan en
+      caché por versión de datos del período (rem/reportes.py).
+    """
+    periodo = get_object_or_404(DimPeriodo, pk=periodo_id)
+    hoja = (hoja or "").strip().upper()
+    seccion = (seccion or "").strip().upper()
 
-    tipos_chart = build_chart(tipos_counter)
-    profesionales_chart = build_chart(prof_counter)
-    rangos_chart = build_chart(rangos_counter, RANGO_LABELS)
+    reporte = reporte_seccion(periodo, hoja, seccion)
+    if reporte is None:
+        return HttpResponse(f"REM {hoja} sección {seccion} no tiene estructura definida.", status=404)
 
-    return render(request, "reporte_a01_seccion_a.html", {
+    return render(request, "reporte_seccion.html", {
         "periodo": periodo,
-        "resumen": resumen,
-        "tipos_chart": tipos_chart,
-        "profesionales_chart": profesionales_chart,
-        "rangos_chart": rangos_chart,
+        "hoja": hoja,
+        "seccion": seccion,
+        "titulo_hoja": REM_TITULOS_HOJA.get(hoja, f"REM-{hoja}"),
+        "titulo_seccion": REM_TITULOS_SECCION.get((hoja, seccion), f"SECCIÓN {seccion}"),
+        "reporte": reporte,
     })
 
 
+@login_required
+def serie_temporal(request, hoja, seccion):
+    """
+    Serie de tiempo (JSON) de una medida de hoja/sección entre períodos.
+
+    Parámetros GET:
+    - medida=<columna>   → columna numérica (por defecto TOTAL / medida principal)
+    - por=<columna>      → columna descriptiva para separar series (opcional)
+    - desde=AAAA-MM, hasta=AAAA-MM → rango (por defecto los últimos 12 períodos)
+    - max_series=<n>     → series con mayor total; el resto va en "Otros"
+
+    Respuesta: {"hoja", "seccion", "medida", "medidas", "por", "periodos", "series"}
+    """
+    try:
+        serie = calcular_serie(
+            hoja=(hoja or "").strip().upper(),
+            seccion=(seccion or "").strip().upper(),
+            medida=request.GET.get("medida") or None,
+            por=request.GET.get("por") or None,
+            desde=leer_mes(request.GET.get("desde")),
+            hasta=leer_mes(request.GET.get("hasta")),
+            max_series=int(request.GET.get("max_series") or SERIES_POR_DEFECTO),
+        )
+    except ValueError:
+        return JsonResponse({"error": "Parámetros inválidos."}, status=400)
+    except ErrorSerie as error:
+        return JsonResponse({"error": str(error)}, status=400)
+
+    return JsonResponse(serie)
+
+
+@login_required
+def pivote_seccion(request, hoja, seccion):
+    """
+    Tabla dinámica (JSON) de una hoja/sección sobre RegistroREM.
+
+    Parámetros GET (listas separadas por coma):
+    - filas=tipo_de_control,profesional   → columnas descriptivas (filas)
+    - columnas=...                        → columnas descriptivas (eje horizontal)
+    - medidas=Rango etario,total          → columnas numéricas o grupos
+    - periodos=1,2,3                      → ids de período (obligatorio)
+    - inactivos=1                         → incluir archivos anulados
+
+    Respuesta: ver rem/pivote.py (calcular_pivote).
+    """
+    def lista(nombre):
+        return [v.strip() for v in request.GET.get(nombre, "").split(",") if v.strip()]
+
+    try:
+        pivote = calcular_pivote(
+            hoja=(hoja or "").strip().upper(),
+            seccion=(seccion or "").strip().upper(),
+            filas=lista("filas"),
+            columnas=lista("columnas"),
+            medidas=lista("medidas"),
+            periodos=[int(p) for p in lista("periodos")],
+            solo_activos=request.GET.get("inactivos") != "1",
+        )
+    except ValueError:
+        return JsonResponse({"error": "Parámetros inválidos."}, status=400)
+    except ErrorPivote as error:
+        return JsonResponse({"error": str(error)}, status=400)
+
+    return JsonResponse(pivote)
+
+
 # ========================
 # EXPORTAR (REM A01 - SECCIÓN A)
 # ========================
-@login_required
-@admin_required
-def exportar_a01_seccion_a_excel(request, periodo_id):
+def _libro_a01_seccion_a(filas):
     """
-    Exporta a Excel la tabla REM A01 - Sección A para un período.
+    Workbook de REM A01 - Sección A a partir de dicts "datos"
+    (RegistroREM.datos de un período o filas de un consolidado).
 
     Implementación:
     - Construye una cabecera de 2 filas con merges
     - Luego escribe datos desde fila 3, respetando el orden A..AF
     """
-    periodo = get_object_or_404(DimPeriodo, pk=periodo_id)
-
-    registros = RegistroREM.objects.filter(
-        archivo__periodo=periodo,
-        archivo__activo=True,
-        hoja="A01",
-        seccion="A",
-    ).order_by("id_registro")
-
     wb = Workbook()
     ws = wb.active
     ws.title = "REM A01 - Sección A"
@@ -1617,16 +1714,14 @@ def exportar_a01_seccion_a_excel(request, periodo_id):
 
     ws.merge_cells("AD1:AF1")  # Identificación de género
 
-    # Estilo cabecera
+    # Estilo cabecera (un solo objeto de estilo compartido por todas las celdas)
+    alineacion_cabecera = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    negrita = Font(bold=True)
     for row in (1, 2):
         for col_idx in range(1, 33):  # hasta AF aprox
             cell = ws.cell(row=row, column=col_idx)
-            cell.alignment = Alignment(
-                horizontal="center",
-                vertical="center",
-                wrap_text=True
-            )
-            cell.font = Font(bold=True)
+            cell.alignment = alineacion_cabecera
+            cell.font = negrita
             cell.border = border
 
     # Ancho columnas
@@ -1636,46 +1731,50 @@ def exportar_a01_seccion_a_excel(request, periodo_id):
     # --------------------------
     # 3) DATOS (DESDE FILA 3)
     # --------------------------
+    centrado = Alignment(horizontal="center", vertical="center")
     fila_excel = 3
-    for reg in registros:
-        d = reg.datos or {}
+    for d in filas:
+        d = d or {}
 
         # Orden A..AF (debe coincidir con la cabecera)
         valores = [
             d.get("tipo_de_control"),
             d.get("profesional"),
-            _to_int(d.get("total")),
+            a_entero(d.get("total")),
         ]
 
         for key, _etq in RANGOS_A01_A:
-            valores.append(_to_int(d.get(key)))
+            valores.append(a_entero(d.get(key)))
 
-        valores.append(_to_int(d.get("sexo_hombres")))
-        valores.append(_to_int(d.get("sexo_mujeres")))
+        valores.append(a_entero(d.get("sexo_hombres")))
+        valores.append(a_entero(d.get("sexo_mujeres")))
 
-        valores.append(_to_int(d.get("control_con_pareja_familiar_u_otro")))
-        valores.append(_to_int(d.get("control_de_diada_con_presencia_del_padre")))
-        valores.append(_to_int(d.get("espacios_amigables_adolescentes")))
-        valores.append(_to_int(d.get("nna_sename")))
-        valores.append(_to_int(d.get("nna_mejor_ninez")))
-        valores.append(_to_int(d.get("pueblos_originarios")))
-        valores.append(_to_int(d.get("migrantes")))
-        valores.append(_to_int(d.get("personas_con_discapacidad")))
+        valores.append(a_entero(d.get("control_con_pareja_familiar_u_otro")))
+        valores.append(a_entero(d.get("control_de_diada_con_presencia_del_padre")))
+        valores.append(a_entero(d.get("espacios_amigables_adolescentes")))
+        valores.append(a_entero(d.get("nna_sename")))
+        valores.append(a_entero(d.get("nna_mejor_ninez")))
+        valores.append(a_entero(d.get("pueblos_originarios")))
+        valores.append(a_entero(d.get("migrantes")))
+        valores.append(a_entero(d.get("personas_con_discapacidad")))
 
-        valores.append(_to_int(d.get("identificacion_de_genero_trans_masculino")))
-        valores.append(_to_int(d.get("identificacion_de_genero_trans_femenina")))
-        valores.append(_to_int(d.get("identificacion_de_genero_no_binarie")))
+        valores.append(a_entero(d.get("identificacion_de_genero_trans_masculino")))
+        valores.append(a_entero(d.get("identificacion_de_genero_trans_femenina")))
+        valores.append(a_entero(d.get("identificacion_de_genero_no_binarie")))
 
-        valores.append(_to_int(d.get("adolescente_acude_a_control_mac_con_pareja")))
+        valores.append(a_entero(d.get("adolescente_acude_a_control_mac_con_pareja")))
 
         for col_idx, valor in enumerate(valores, start=1):
             cell = ws.cell(row=fila_excel, column=col_idx, value=valor)
             cell.border = border
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.alignment = centrado
 
         fila_excel += 1
 
-    filename = f"rem_a01_seccion_a_{periodo.anio}_{periodo.mes:02d}.xlsx"
+    return wb
+
+
+def _respuesta_excel(wb, filename):
     response = HttpResponse(
         content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
@@ -1684,15 +1783,68 @@ def exportar_a01_seccion_a_excel(request, periodo_id):
     return response
 
 
+def _columnas_estructura(hoja, seccion):
+    """(columnas, num_desc_cols) de REM_STRUCTURES para hoja/sección."""
+    rem_hoja = (
+        REM_STRUCTURES.get(hoja)
+        or REM_STRUCTURES.get(hoja.lower())
+        or {}
+    )
+
+    if "secciones" in rem_hoja and isinstance(rem_hoja["secciones"], dict):
+        secciones_dict = rem_hoja["secciones"]
+        seccion_data = secciones_dict.get(seccion) or secciones_dict.get(seccion.lower()) or {}
+    else:
+        seccion_data = rem_hoja.get(seccion) or rem_hoja.get(seccion.lower()) or {}
+
+    return seccion_data.get("columnas") or [], seccion_data.get("num_desc_cols", 2)
+
+
+def _encabezados_pdf(columnas) -> list:
+    """Rótulos de columnas para PDF: los especiales de A01-A o pretty_col_name."""
+    return [
+        HEADERS_A01_A.get(col) or RANGOS_A01_A_DICT.get(col) or pretty_col_name(col)
+        for col in columnas
+    ]
+
+
+@login_required
+@admin_required
+@condicional_periodo
+def exportar_a01_seccion_a_excel(request, periodo_id):
+    """
+    Exporta a Excel la tabla REM A01 - Sección A para un período
+    (cabecera de 2 filas con merges, ver _libro_a01_seccion_a).
+    Se guarda en la caché de exportaciones por versión del período.
+    """
+    periodo = get_object_or_404(DimPeriodo, pk=periodo_id)
+
+    registros = RegistroREM.objects.filter(
+        archivo__periodo=periodo,
+        archivo__activo=True,
+        hoja="A01",
+        seccion="A",
+    ).order_by("id_registro")
+
+    def escribir(archivo):
+        _libro_a01_seccion_a(registros.values_list("datos", flat=True).iterator()).save(archivo)
+
+    filename = f"rem_a01_seccion_a_{periodo.anio}_{periodo.mes:02d}.xlsx"
+    archivo = exportacion("excel_a01a", periodo.pk, "A01", "A", escribir)
+    return respuesta_archivo(archivo, filename, CONTENT_TYPE_XLSX)
+
+
 @login_required
 @admin_required
+@condicional_periodo
 def exportar_a01_seccion_a_pdf(request, periodo_id):
     """
     Exporta a PDF la tabla REM A01 - Sección A para un período.
 
-    - Usa ReportLab
+    - Usa ReportLab, por páginas (rem/exportar_pdf.py)
     - Columnas se toman desde REM_STRUCTURES , para mantener consistencia
-    - Repite la fila de headers en cada página (repeatRows=1)
+    - Repite la fila de headers en cada página
+    - Se guarda en la caché de exportaciones por versión del período
     """
     periodo = get_object_or_404(DimPeriodo, pk=periodo_id)
 
@@ -1703,269 +1855,307 @@ def exportar_a01_seccion_a_pdf(request, periodo_id):
         seccion="A",
     ).order_by("id_registro")
 
-    # -----------------------
-    # 1) Columnas desde REM_STRUCTURES
-    # -----------------------
-    rem_a01 = (
-        REM_STRUCTURES.get("A01")
-        or REM_STRUCTURES.get("a01")
-        or {}
-    )
-
-    if "secciones" in rem_a01 and isinstance(rem_a01["secciones"], dict):
-        secciones_dict = rem_a01["secciones"]
-        seccion_data = secciones_dict.get("A") or secciones_dict.get("a") or {}
-    else:
-        seccion_data = rem_a01.get("A") or rem_a01.get("a") or {}
-
-    columnas = seccion_data.get("columnas") or []
-    num_desc_cols = seccion_data.get("num_desc_cols", 2)
+    columnas, num_desc_cols = _columnas_estructura("A01", "A")
 
     # Fallback si no hay estructura
     if not columnas:
         columnas = ["tipo_de_control", "profesional", "total"] + [k for k, _ in RANGOS_A01_A]
         num_desc_cols = 2
 
-    # -----------------------
-    # 2) Encabezados legibles
-    # -----------------------
-    headers = []
-    for col in columnas:
-        if col in HEADERS_A01_A:
-            headers.append(HEADERS_A01_A[col])
-        elif col in RANGOS_A01_A_DICT:
-            headers.append(RANGOS_A01_A_DICT[col])
-        else:
-            nombre = col.replace("_", " ").replace("anos", "años")
-            headers.append(nombre.capitalize())
+    def escribir(archivo):
+        pdf_seccion(
+            "REM A01 – SECCIÓN A",
+            columnas,
+            num_desc_cols,
+            registros.values_list("datos", flat=True).iterator(),
+            encabezados=_encabezados_pdf(columnas),
+            destino=archivo,
+        )
 
-    data = [headers]
+    filename = f"rem_a01_seccion_a_{periodo.anio}_{periodo.mes:02d}.pdf"
+    archivo = exportacion("pdf_a01a", periodo.pk, "A01", "A", escribir)
+    return respuesta_archivo(archivo, filename, CONTENT_TYPE_PDF)
 
-    # -----------------------
-    # 3) Filas
-    # -----------------------
-    for r in registros:
-        d = r.datos or {}
-        fila = []
-        for idx, col in enumerate(columnas):
-            valor = d.get(col, "")
-
-            # Primeras columnas descriptivas como texto; el resto a int
-            if idx < num_desc_cols:
-                fila.append(valor or "")
-            else:
-                fila.append(_to_int(valor))
-        data.append(fila)
 
-    if len(data) == 1:
-        data.append(["Sin datos para este período"] + [""] * (len(headers) - 1))
+@login_required
+@admin_required
+@condicional_periodo
+def exportar_seccion_excel(request, periodo_id, hoja, seccion):
+    """
+    Exporta a Excel cualquier hoja/sección de un período (rem/exportar.py):
+    - Cabecera de dos filas con los grupos de REM_STRUCTURES
+    - openpyxl write-only + estilos con nombre; las filas se leen con
+      .iterator() proyectando solo las columnas de la sección
+    - El archivo se arma en disco y se envía por bloques (streaming); queda
+      en la caché de exportaciones hasta que cambie la versión del período
+    """
+    periodo = get_object_or_404(DimPeriodo, pk=periodo_id)
+    hoja = (hoja or "").strip().upper()
+    seccion = (seccion or "").strip().upper()
 
-    # -----------------------
-    # 4) Generar el PDF
-    # -----------------------
-    buffer = BytesIO()
-    page_size = landscape(A4)
-    page_width, page_height = page_size
-    left_margin = 15
-    right_margin = 15
-    available_width = page_width - left_margin - right_margin
-
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=page_size,
-        leftMargin=left_margin,
-        rightMargin=right_margin,
-        topMargin=20,
-        bottomMargin=20,
+    qs = _registros_detalle(periodo, hoja, seccion).filter(archivo__activo=True)
+    columnas, num_desc_cols, _usa_estructura_fija = columnas_seccion(
+        qs, alcance_periodo(periodo.pk, solo_activos=True), hoja, seccion
     )
+    if not columnas:
+        return HttpResponse(f"REM {hoja} sección {seccion} no tiene datos en este período.", status=404)
+
+    def escribir(archivo):
+        libro_seccion(
+            f"REM {hoja} - Sección {seccion}",
+            columnas,
+            num_desc_cols,
+            filas_proyectadas(qs, columnas, orden=("id_registro",)),
+            destino=archivo,
+        )
 
-    num_cols = len(headers)
-
-    # Anchos: las 3 primeras columnas más anchas, resto se reparte
-    ancho_tipo = 110
-    ancho_prof = 70
-    ancho_total = 45
-
-    ancho_restante = available_width - (ancho_tipo + ancho_prof + ancho_total)
-    num_restantes = max(num_cols - 3, 1)
-    ancho_otros = max(ancho_restante / num_restantes, 20)
-
-    col_widths = []
-    for idx in range(num_cols):
-        if idx == 0:
-            col_widths.append(ancho_tipo)
-        elif idx == 1:
-            col_widths.append(ancho_prof)
-        elif idx == 2:
-            col_widths.append(ancho_total)
-        else:
-            col_widths.append(ancho_otros)
+    filename = f"rem_{hoja.lower()}_seccion_{seccion.lower()}_{periodo.anio}_{periodo.mes:02d}.xlsx"
+    archivo = exportacion("excel", periodo.pk, hoja, seccion, escribir)
+    return respuesta_archivo(archivo, filename, CONTENT_TYPE_XLSX)
 
-    table = Table(data, colWidths=col_widths, repeatRows=1)
 
-    style = TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e5e7eb")),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-        ("ALIGN", (0, 0), (-1, 0), "CENTER"),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+@login_required
+@admin_required
+@condicional_periodo
+def exportar_seccion_pdf(request, periodo_id, hoja, seccion):
+    """
+    Exporta a PDF cualquier hoja/sección de un período (rem/exportar_pdf.py):
+    tablas de una página con la cabecera repetida, anchos calculados una
+    vez; queda en la caché de exportaciones como el Excel.
+    """
+    periodo = get_object_or_404(DimPeriodo, pk=periodo_id)
+    hoja = (hoja or "").strip().upper()
+    seccion = (seccion or "").strip().upper()
+
+    qs = _registros_detalle(periodo, hoja, seccion).filter(archivo__activo=True)
+    columnas, num_desc_cols, _usa_estructura_fija = columnas_seccion(
+        qs, alcance_periodo(periodo.pk, solo_activos=True), hoja, seccion
+    )
+    if not columnas:
+        return HttpResponse(f"REM {hoja} sección {seccion} no tiene datos en este período.", status=404)
+
+    def escribir(archivo):
+        pdf_seccion(
+            f"REM {hoja} – SECCIÓN {seccion} – {periodo.mes:02d}/{periodo.anio}",
+            columnas,
+            num_desc_cols,
+            filas_proyectadas(qs, columnas, orden=("id_registro",)),
+            encabezados=_encabezados_pdf(columnas),
+            destino=archivo,
+        )
 
-        ("FONTSIZE", (0, 0), (-1, -1), 6),
-        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("ALIGN", (num_desc_cols, 1), (-1, -1), "RIGHT"),
-        ("ROWBACKGROUNDS", (0, 1), (-1, -1),
-         [colors.white, colors.HexColor("#fffce8")]),
-    ])
+    filename = f"rem_{hoja.lower()}_seccion_{seccion.lower()}_{periodo.anio}_{periodo.mes:02d}.pdf"
+    archivo = exportacion("pdf", periodo.pk, hoja, seccion, escribir)
+    return respuesta_archivo(archivo, filename, CONTENT_TYPE_PDF)
 
-    table.setStyle(style)
 
-    elements = [table]
-    doc.build(elements)
+@login_required
+@admin_required
+@condicional_periodo
+def exportar_registros_periodo(request, periodo_id, formato):
+    """
+    Volcado de los registros del período en CSV o JSON Lines
+    (rem/exportar_registros.py), en streaming desde un cursor.
+    GET: hoja=A01 (opcional), gzip=1 (opcional).
+    """
+    periodo = get_object_or_404(DimPeriodo, pk=periodo_id)
+    if formato not in FORMATOS:
+        return HttpResponse(f"Formato no soportado: {formato}", status=404)
 
-    pdf = buffer.getvalue()
-    buffer.close()
+    hoja = (request.GET.get("hoja") or "").strip().upper() or None
+    comprimido = request.GET.get("gzip") == "1"
 
-    filename = f"rem_a01_seccion_a_{periodo.anio}_{periodo.mes:02d}.pdf"
-    response = HttpResponse(content_type="application/pdf")
+    response = StreamingHttpResponse(
+        volcado(formato, [periodo.pk], hoja, gzip=comprimido),
+        content_type=CONTENT_TYPE_GZIP if comprimido else FORMATOS[formato],
+    )
+    filename = nombre_archivo(formato, f"{periodo.anio}_{periodo.mes:02d}", hoja, comprimido)
     response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    response.write(pdf)
     return response
 
 
-# ============================================================
-# HELPERS
-# ============================================================
-def _to_int(valor):
-    """
-    Normaliza valores numéricos que pueden venir como:
-    - None
-    - int/float
-    - string ("", "-", "12", "12,0", "12.0")
+@login_required
+@admin_required
+def estado_cache(request):
+    """Aciertos / fallos de la caché compartida por espacio (rem/cache.py), en el proceso que responde."""
+    return JsonResponse(estadisticas())
+
+
+# formato del libro completo → (tipo de tarea, extensión, content type)
+LIBROS_PERIODO = {
+    "libro": (TareaREM.TIPO_LIBRO_PERIODO, "xlsx", CONTENT_TYPE_XLSX),
+    "libro_pdf": (TareaREM.TIPO_PDF_PERIODO, "pdf", CONTENT_TYPE_PDF),
+}
+
 
-    Retorna siempre int (o 0 si no es convertible).
+def _descargar_libro(request, periodo_id, formato):
     """
-    if valor is None:
-        return 0
-    if isinstance(valor, (int, float)):
-        return int(valor)
-    if isinstance(valor, str):
-        valor = valor.strip()
-        if not valor or valor == "-":
-            return 0
+    Libro completo del período en el formato pedido.
+    - Si ya existe el de la versión actual de los datos, se envía desde disco.
+    - Si no, se encola su generación (rem_worker) y se muestra el estado de
+      la tarea; al completarse, esa página vuelve aquí y se descarga.
+    - Con REM_PROCESAMIENTO_EN_COLA=False se genera dentro del request.
+    """
+    tipo, extension, content_type = LIBROS_PERIODO[formato]
+    periodo = get_object_or_404(DimPeriodo, pk=periodo_id)
+    filename = f"rem_periodo_{periodo.anio}_{periodo.mes:02d}.{extension}"
+
+    ruta = libro_disponible(periodo.pk, formato)
+    if ruta is None and not getattr(settings, "REM_PROCESAMIENTO_EN_COLA", False):
+        generar_libro_periodo(periodo, formato)
+        ruta = libro_disponible(periodo.pk, formato)
+
+    if ruta is not None:
         try:
-            return int(valor)
-        except ValueError:
-            try:
-                return int(float(valor.replace(",", ".")))
-            except ValueError:
-                return 0
-    return 0
-
-
-def calcular_resumen_a01_seccion_a(registros_qs, periodo=None):
-    """
-    Calcula indicadores y alertas para el reporte REM A01 - Sección A.
-
-    Salidas:
-    - total_controles
-    - num_tipos_control
-    - num_profesionales
-    - rango_top
-    - rangos_chart (lista label/value)
-    - solo_estructura (si todo viene en 0)
-    - alertas (mensajes para UI)
-    """
-    total_controles = 0
-    tipos_control = set()
-    profesionales = set()
-    totales_rangos = {key: 0 for key, _ in RANGOS_A01_A}
-    alertas = []
-    filas_con_inconsistencia = 0
-
-    for reg in registros_qs:
-        datos = reg.datos or {}
+            archivo = open(ruta, "rb")
+        except FileNotFoundError:
+            pass  # desalojado o invalidado entre medio: se genera de nuevo
+        else:
+            return respuesta_archivo(archivo, filename, content_type)
 
-        # Total declarado (puede no calzar con rangos)
-        total_fila = _to_int(datos.get("total", 0))
-        total_controles += total_fila
-
-        tc = (datos.get("tipo_de_control") or "").strip()
-        if tc:
-            tipos_control.add(tc)
-
-        prof = (datos.get("profesional") or "").strip()
-        if prof:
-            profesionales.add(prof)
-
-        # Suma rangos para detectar inconsistencias
-        suma_rangos_fila = 0
-        for key, _ in RANGOS_A01_A:
-            v = _to_int(datos.get(key, 0))
-            totales_rangos[key] += v
-            suma_rangos_fila += v
-
-        # Si hay actividad, validar consistencia total vs suma rangos
-        if total_fila > 0 or suma_rangos_fila > 0:
-            if total_fila != suma_rangos_fila:
-                filas_con_inconsistencia += 1
-
-    # Rango con mayor valor
-    rango_top = None
-    max_val = 0
-    for key, label in RANGOS_A01_A:
-        val = totales_rangos[key]
-        if val > max_val:
-            max_val = val
-            rango_top = label
-    if max_val == 0:
-        rango_top = "Sin datos registrados"
-
-    # Alertas por estructura vacía o rangos sin registros
-    suma_todos_rangos = sum(totales_rangos.values())
-    solo_estructura = (total_controles == 0 and suma_todos_rangos == 0)
-    if solo_estructura:
-        alertas.append("REM A01 Sección A tiene solo estructura sin datos (todos los valores son 0).")
-    else:
-        for key, label in RANGOS_A01_A:
-            if totales_rangos[key] == 0:
-                alertas.append(f"No hay registros en el rango etario «{label}» en este período.")
-
-    # Inconsistencias detectadas
-    if filas_con_inconsistencia > 0:
-        alertas.append(
-            f"Se detectaron {filas_con_inconsistencia} fila(s) donde el TOTAL no coincide con la suma de rangos etarios."
+    tarea = encolar_libro_periodo(periodo, request.user, tipo)
+    return redirect("estado_tarea", tarea_id=tarea.id_tarea)
+
+
+@login_required
+@admin_required
+def descargar_libro_periodo(request, periodo_id):
+    """Libro Excel con todas las hojas y secciones del período."""
+    return _descargar_libro(request, periodo_id, "libro")
+
+
+@login_required
+@admin_required
+def descargar_pdf_periodo(request, periodo_id):
+    """PDF con todas las secciones del período (una tras otra, por páginas)."""
+    return _descargar_libro(request, periodo_id, "libro_pdf")
+
+
+# ========================
+# CONSOLIDADOS MULTI-MES (ENE-FEB, SEMESTRAL, ANUAL)
+# ========================
+@login_required
+def lista_consolidados(request):
+    """
+    Lista de consolidados y formulario para crear uno (solo admin):
+    nombre + hoja/sección + períodos a sumar (rem/consolidados.py).
+    """
+    consolidados = ConsolidadoREM.objects.prefetch_related("periodos").select_related("creado_por")
+
+    secciones = [
+        {"valor": f"{hoja}|{seccion}", "etiqueta": f"{hoja} - Sección {seccion}"}
+        for hoja in sorted(REM_STRUCTURES)
+        for seccion in sorted(REM_STRUCTURES[hoja])
+    ]
+
+    return render(request, "lista_consolidados.html", {
+        "consolidados": consolidados,
+        "periodos": periodos_activos().order_by("-anio", "-mes"),
+        "secciones": secciones,
+        "es_admin": is_admin_user(request.user),
+    })
+
+
+@login_required
+@admin_required
+@require_POST
+def crear_consolidado_vista(request):
+    hoja, _, seccion = (request.POST.get("hoja_seccion") or "").partition("|")
+    periodos = list(DimPeriodo.objects.filter(
+        pk__in=[p for p in request.POST.getlist("periodos") if p.isdigit()]
+    ))
+    try:
+        consolidado = crear_consolidado(
+            request.POST.get("nombre"), hoja, seccion, periodos, usuario=request.user
         )
+    except ErrorConsolidado as error:
+        messages.error(request, str(error))
+        return redirect("lista_consolidados")
 
-    # Alerta de plazo (cierre estimado: día 10 del mes siguiente)
-    alerta_plazo = None
-    if periodo is not None:
-        hoy = timezone.now().date()
-        anio = periodo.anio
-        mes = periodo.mes
-        if mes == 12:
-            cierre = date(anio + 1, 1, 10)
-        else:
-            cierre = date(anio, mes + 1, 10)
-        dias_restantes = (cierre - hoy).days
-        if dias_restantes < 0:
-            alerta_plazo = f"El plazo estimado de consolidación para este período venció hace {abs(dias_restantes)} día(s)."
-        elif dias_restantes <= 5:
-            alerta_plazo = f"Quedan {dias_restantes} día(s) para el cierre estimado de consolidación del período."
-
-    if alerta_plazo:
-        alertas.insert(0, alerta_plazo)
-
-    # Datos para gráfico de rangos
-    rangos_chart = []
-    for key, label in RANGOS_A01_A:
-        rangos_chart.append({"label": label, "value": totales_rangos[key]})
-
-    return {
-        "total_controles": total_controles,
-        "num_tipos_control": len(tipos_control),
-        "num_profesionales": len(profesionales),
-        "rango_top": rango_top,
-        "rangos_chart": rangos_chart,
-        "solo_estructura": solo_estructura,
-        "alertas": alertas,
-    }
+    registrar_auditoria(
+        request,
+        AuditLog.ACCION_OTRA,
+        f"Creó consolidado '{consolidado.nombre}' ({consolidado.hoja}-{consolidado.seccion}, "
+        f"{len(periodos)} períodos).",
+    )
+    messages.success(request, f"Consolidado '{consolidado.nombre}' creado.")
+    return redirect("ver_consolidado", id_consolidado=consolidado.pk)
+
+
+def _consolidado_al_dia(id_consolidado):
+    consolidado = get_object_or_404(ConsolidadoREM, pk=id_consolidado)
+    # Solo recalcula los meses cuya versión de datos cambió
+    refrescar_consolidado(consolidado)
+    consolidado.refresh_from_db()
+    return consolidado
+
+
+def _nombre_archivo_consolidado(consolidado, extension):
+    nombre = re.sub(r"[^A-Za-z0-9]+", "_", consolidado.nombre).strip("_").lower()
+    return f"rem_{consolidado.hoja.lower()}_seccion_{consolidado.seccion.lower()}_{nombre}.{extension}"
+
+
+@login_required
+def ver_consolidado(request, id_consolidado):
+    consolidado = _consolidado_al_dia(id_consolidado)
+    tabla = tabla_consolidado(consolidado)
+
+    return render(request, "ver_consolidado.html", {
+        "consolidado": consolidado,
+        "periodos": consolidado.periodos.order_by("anio", "mes"),
+        "titulo_hoja": REM_TITULOS_HOJA.get(consolidado.hoja, f"REM-{consolidado.hoja}"),
+        "titulo_seccion": REM_TITULOS_SECCION.get(
+            (consolidado.hoja, consolidado.seccion), f"SECCIÓN {consolidado.seccion}"
+        ),
+        "columnas_bonitas": [pretty_col_name(c) for c in tabla["descriptivas"] + tabla["medidas"]],
+        "num_desc_cols": len(tabla["descriptivas"]),
+        "tabla": tabla,
+        "es_admin": is_admin_user(request.user),
+    })
+
+
+@login_required
+@admin_required
+@require_POST
+def eliminar_consolidado(request, id_consolidado):
+    consolidado = get_object_or_404(ConsolidadoREM, pk=id_consolidado)
+    nombre = consolidado.nombre
+    consolidado.delete()
+
+    registrar_auditoria(request, AuditLog.ACCION_OTRA, f"Eliminó consolidado '{nombre}'.")
+    messages.success(request, f"Consolidado '{nombre}' eliminado.")
+    return redirect("lista_consolidados")
+
+
+@login_required
+@admin_required
+def exportar_consolidado_excel(request, id_consolidado):
+    """Mismo Excel que un período (A01-A con su cabecera especial)."""
+    consolidado = _consolidado_al_dia(id_consolidado)
+    filas = filas_consolidado(consolidado)
+
+    filename = _nombre_archivo_consolidado(consolidado, "xlsx")
+    if (consolidado.hoja, consolidado.seccion) == ("A01", "A"):
+        return _respuesta_excel(_libro_a01_seccion_a(filas), filename)
+
+    columnas, num_desc_cols = _columnas_estructura(consolidado.hoja, consolidado.seccion)
+    archivo = libro_seccion(
+        f"REM {consolidado.hoja} - Sección {consolidado.seccion}", columnas, num_desc_cols, filas
+    )
+    return respuesta_archivo(archivo, filename, CONTENT_TYPE_XLSX)
+
+
+@login_required
+@admin_required
+def exportar_consolidado_pdf(request, id_consolidado):
+    consolidado = _consolidado_al_dia(id_consolidado)
+    columnas, num_desc_cols = _columnas_estructura(consolidado.hoja, consolidado.seccion)
+
+    archivo = pdf_seccion(
+        f"{consolidado.nombre} – REM {consolidado.hoja} – SECCIÓN {consolidado.seccion}",
+        columnas,
+        num_desc_cols,
+        filas_consolidado(consolidado),
+        encabezados=_encabezados_pdf(columnas),
+    )
+    return respuesta_archivo(archivo, _nombre_archivo_consolidado(consolidado, "pdf"), CONTENT_TYPE_PDF)